@@ -2,19 +2,32 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
 
-from ..viral_crew import get_agent_system
+from ..viral_crew import close_social_tools, get_agent_system, startup_report, warm_imports
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # crewai takes seconds to import; do it off the event loop while the app starts serving
+    warming = asyncio.ensure_future(asyncio.to_thread(warm_imports))
+    yield
+    await asyncio.gather(warming, return_exceptions=True)
+    # The social tools share one connection pool per process; close it with the app.
+    await close_social_tools()
 
 
 app = FastAPI(
     title="ViralForge Agents API",
     version="1.0.0",
     description="HTTP interface for running CrewAI-powered ViralForge workflows.",
+    lifespan=lifespan,
 )
 
 
@@ -90,6 +103,12 @@ async def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/agents/startup", response_model=dict)
+async def startup() -> Dict[str, Any]:
+    """Import and construction times so far; tools, agents and crews are built on first use."""
+    return startup_report()
+
+
 @app.post("/agents/trend-discovery", response_model=TrendDiscoveryResponse)
 async def trend_discovery(request: TrendDiscoveryRequest) -> TrendDiscoveryResponse:
     agent_system = get_agent_system()
@@ -112,6 +131,7 @@ async def trend_discovery(request: TrendDiscoveryRequest) -> TrendDiscoveryRespo
             "timestamp": result.get("timestamp"),
             "platforms": result.get("platforms"),
             "niches": result.get("niches"),
+            "tool_cache": result.get("tool_cache"),
         },
     )
 
@@ -134,7 +154,11 @@ async def content_creation(request: ContentCreationRequest) -> ContentCreationRe
         success=True,
         content_created=_count_items(content),
         content=content,
-        metadata={"content_type": request.content_type, "timestamp": result.get("timestamp")},
+        metadata={
+            "content_type": request.content_type,
+            "timestamp": result.get("timestamp"),
+            "tool_cache": result.get("tool_cache"),
+        },
     )
 
 
@@ -177,5 +201,6 @@ async def full_pipeline(request: FullPipelineRequest) -> FullPipelineResponse:
         metadata={
             "user_id": request.user_id,
             "timestamp": result.get("timestamp"),
+            "tool_cache": result.get("tool_cache"),
         },
     )
@@ -0,0 +1,84 @@
+"""Concurrent crew runs per second against a stand-in LLM.
+
+    python benchmarks/throughput.py [--runs 40] [--concurrency 1,4,16] [--latency 0.2]
+
+The stand-in answers every prompt after ``--latency`` seconds, so the numbers measure how
+well discovery, creation and pipeline runs overlap in one process (crew construction,
+kickoff and the agents' LLM waits), not the LLM. No API keys or network are needed.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List
+import argparse, asyncio, contextlib, os, statistics, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crewai import BaseLLM
+
+from viral_crew import ViralForgeAgentSystem
+
+
+class StandInLLM(BaseLLM):
+    """Answers every prompt with a canned final answer after ``latency`` seconds."""
+
+    latency: float = 0.2
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None) -> str:
+        time.sleep(self.latency)
+        return "Thought: I now know the final answer\nFinal Answer: stand-in result"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+
+def _workloads(system: ViralForgeAgentSystem) -> Dict[str, Callable[[int], Awaitable[Dict[str, Any]]]]:
+    return {
+        "discover_trends": lambda i: system.discover_trends(["youtube"], [f"niche {i}"]),
+        "create_viral_content": lambda i: system.create_viral_content({"trend": f"trend {i}"}),
+        "run_full_pipeline": lambda i: system.run_full_pipeline(f"user-{i}", {"niche": f"niche {i}"}),
+    }
+
+
+async def _measure(call: Callable[[int], Awaitable[Dict[str, Any]]], runs: int, concurrency: int) -> Dict[str, float]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            result = await call(i)
+            latencies.append(time.perf_counter() - t0)
+            errors += result["status"] != "success"
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    elapsed = time.perf_counter() - t0
+    return {"runs_per_s": runs / elapsed, "p50": statistics.median(latencies), "errors": errors}
+
+
+async def run(runs: int, levels: List[int], latency: float) -> None:
+    system = ViralForgeAgentSystem(llm=StandInLLM(model="stand-in", latency=latency))
+    system.crews  # tools, agents and crews are built on first use; keep that out of the numbers
+    # kickoff_async runs each crew in a worker thread; leave room for the largest level
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max(levels) + 4))
+    print(f"{'workload':<22}{'concurrency':>12}{'runs/s':>10}{'p50 s':>10}{'errors':>8}")
+    for name, call in _workloads(system).items():
+        for level in levels:
+            with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # verbose agents
+                r = await _measure(call, runs, level)
+            print(f"{name:<22}{level:>12}{r['runs_per_s']:>10.2f}{r['p50']:>10.2f}{r['errors']:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=40, help="runs per workload and concurrency level")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per stand-in LLM call")
+    args = parser.parse_args()
+    asyncio.run(run(args.runs, [int(c) for c in args.concurrency.split(",")], args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,8 @@ print("🧪 Testing CrewAI Agent Initialization...\n")
 
 try:
     print("1. Importing viral_crew module...")
-    from viral_crew import get_agent_system
-    print("   ✅ Import successful\n")
+    from viral_crew import get_agent_system, startup_report
+    print(f"   ✅ Import successful ({startup_report()['imports']['viral_crew'] * 1000:.0f} ms)\n")
     
     print("2. Checking knowledge files...")
     knowledge_dir = Path(__file__).parent.parent.parent / 'knowledge'
@@ -15,52 +15,203 @@ Agent Roles:
 - PerformanceTracker: Monitors and analyzes results
 """
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import os
+import sys
 import asyncio
-from typing import Dict, List, Any, Optional
+import importlib
+import importlib.util
+import threading
+from contextlib import contextmanager
+from functools import cached_property
+from types import ModuleType
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, NamedTuple, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from crewai import Agent, Task, Crew, Process, LLM
-from crewai.knowledge.source.string_knowledge_source import StringKnowledgeSource
-from crewai_tools import (
-    ScrapeWebsiteTool, VisionTool, FileWriterTool, CSVSearchTool, 
-    DallETool, CodeInterpreterTool, PGSearchTool, RagTool,
-    ZapierActionTool, FirecrawlCrawlWebsiteTool, TavilySearchTool
-)
+if TYPE_CHECKING:
+    from crewai import Agent, BaseLLM, Crew, Task
+    from crewai.knowledge.source.string_knowledge_source import StringKnowledgeSource
+
+# crewai alone takes seconds to import, and crewai_tools more; both are imported on first
+# use so that importing this module (API startup, test runs) stays cheap.
+IMPORT_TIMES: Dict[str, float] = {}
+
+# Custom social media tools. Loaded from the file rather than by putting crew-social-tools
+# on sys.path, where its app/ and benchmarks/ packages would shadow this service's own.
+_CREW_TOOLS_MODULE = Path(__file__).parent.parent / 'crew-social-tools' / 'crewai_integration.py'
+# Held for every lazy import: the API's warm-up thread and a request may import at once
+_import_lock = threading.Lock()
+
+
+def _load_crew_tools() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("crewai_integration", _CREW_TOOLS_MODULE)
+    module = importlib.util.module_from_spec(spec)
+    # Registered first: pydantic resolves the tools' models through sys.modules
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[spec.name]
+        raise
+    return module
+
+
+def _import(name: str) -> ModuleType:
+    """Import a heavy dependency on first use, recording how long that took."""
+    # Locked even when present: a module is in sys.modules while it is still executing
+    with _import_lock:
+        module = sys.modules.get(name)
+        if module is None:
+            started = time.perf_counter()
+            module = _load_crew_tools() if name == "crewai_integration" else importlib.import_module(name)
+            IMPORT_TIMES[name] = time.perf_counter() - started
+    return module
 
-# Import custom social media tools
-from pathlib import Path
-import importlib.util
 
-# Load crewai_integration module without modifying sys.path
-_crew_tools_path = Path(__file__).parent.parent / 'crew-social-tools' / 'crewai_integration.py'
-_spec = importlib.util.spec_from_file_location("crewai_integration", _crew_tools_path)
-_crewai_integration = importlib.util.module_from_spec(_spec)
-_spec.loader.exec_module(_crewai_integration)
-get_crew_social_tools = _crewai_integration.get_crew_social_tools
+def warm_imports() -> None:
+    """Import crewai and the social tools now, so the first request doesn't wait on them."""
+    _import("crewai")
+    _import("crewai_integration")
+
+
+def __getattr__(name: str) -> Any:
+    # get_crew_social_tools and ToolMemo load crewai_integration on first use
+    if name in ("get_crew_social_tools", "ToolMemo"):
+        return getattr(_import("crewai_integration"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def memoized_tools(memo: Any = None):
+    """``crewai_integration.memoized``: share identical social tool calls within a run."""
+    return _import("crewai_integration").memoized(memo)
+
+
+async def close_social_tools() -> None:
+    """Close the social tools' shared connection pool, if they were ever used."""
+    module = sys.modules.get("crewai_integration")
+    if module is not None:
+        await module.aclose_clients()
 
 # Storage will be injected from TypeScript side when needed
 # No need to import here as this causes module errors
 
 
+class _built(cached_property):
+    """``cached_property`` built under the instance's ``_build_lock``.
+
+    Threads starting runs at once then share one build instead of each making their own.
+    """
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with instance._build_lock:
+            return super().__get__(instance, owner)
+
+
+class CrewTemplate(NamedTuple):
+    """A workflow's agents and crew settings; a fresh ``Crew`` is built from it for every run.
+
+    Crews and agents hold per-run state (the crew's tasks, each agent's executor while it
+    works), so runs sharing one would overwrite each other. Agents are copied per run with
+    ``Agent.copy()``: each copy gets its own shallow copy of the template agent's LLM and
+    shares its tools.
+    """
+    agents: Tuple[str, ...]
+    process: str = "sequential"
+    max_rpm: int = 30
+
+    def staff(self, agents: Dict[str, "Agent"]) -> Dict[str, "Agent"]:
+        """Copies of this workflow's agents for one run."""
+        return {key: agents[key].copy() for key in self.agents}
+
+    def build(self, agents: Dict[str, "Agent"], tasks: List["Task"]) -> "Crew":
+        return _import("crewai").Crew(
+            agents=list(agents.values()),
+            tasks=tasks,
+            process=self.process,
+            verbose=True,
+            memory=False,  # Disable memory to avoid embeddings requirement
+            max_rpm=self.max_rpm
+        )
+
+
 class ViralForgeAgentSystem:
     """
     Main orchestrator for the ViralForge multi-agent system.
     Manages specialized agents for viral content discovery, creation, and optimization.
     """
     
-    def __init__(self):
-        """Initialize the multi-agent system with specialized crews."""
-        self.llm = self._setup_llm()
-        self.knowledge = self._setup_knowledge()
-        self.tools = self._setup_tools()
-        self.agents = self._create_agents()
-        self.crews = self._create_crews()
-        
-    def _setup_llm(self) -> LLM:
+    def __init__(self, llm: Optional["BaseLLM"] = None):
+        """Initialize the multi-agent system.
+
+        The LLM, knowledge, tools, agents and crews are each built on first use;
+        ``timings`` records how long each took.
+
+        Args:
+            llm: LLM for all agents; defaults to Grok via OpenRouter
+        """
+        started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        # Reentrant: building the agents builds the LLM and tools first
+        self._build_lock = threading.RLock()
+        self._llm = llm
+        # Identical social tool calls are answered once per run; with SOCIAL_TOOLS_MEMO_TTL
+        # set, results are also shared across runs for that many seconds.
+        memo_ttl = os.getenv("SOCIAL_TOOLS_MEMO_TTL")
+        self._memo_ttl = float(memo_ttl) if memo_ttl else None
+        self.timings["init"] = time.perf_counter() - started
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        yield
+        self.timings[name] = time.perf_counter() - started
+
+    @_built
+    def tool_memo(self) -> Any:
+        """The ``ToolMemo`` shared across runs, or None; built by the first run that needs it."""
+        return _import("crewai_integration").ToolMemo(ttl=self._memo_ttl) if self._memo_ttl else None
+
+    @_built
+    def llm(self) -> "BaseLLM":
+        with self._timed("llm"):
+            return self._llm or self._setup_llm()
+
+    @_built
+    def knowledge(self) -> List["StringKnowledgeSource"]:
+        with self._timed("knowledge"):
+            return self._setup_knowledge()
+
+    @_built
+    def tools(self) -> Dict[str, Any]:
+        with self._timed("tools"):
+            return self._setup_tools()
+
+    @_built
+    def agents(self) -> Dict[str, "Agent"]:
+        # Built together: each is cheap once crewai is imported, and the pipeline needs all.
+        self._prepare("llm", "tools")
+        with self._timed("agents"):
+            return self._create_agents()
+
+    @_built
+    def crews(self) -> Dict[str, CrewTemplate]:
+        self._prepare("agents")
+        with self._timed("crews"):
+            return self._create_crews()
+
+    def _prepare(self, *names: str) -> None:
+        """Build these properties now, so a dependent's timing covers only its own work."""
+        for name in names:
+            getattr(self, name)
+
+    def _setup_llm(self) -> "BaseLLM":
         """Configure the LLM for all agents using OpenRouter."""
-        return LLM(
+        return _import("crewai").LLM(
             model="openrouter/x-ai/grok-4-fast",  # Using Grok-4-fast via OpenRouter (free tier)
             api_key=os.getenv("OPENROUTER_API_KEY"),
             base_url="https://openrouter.ai/api/v1",
@@ -68,12 +219,13 @@ class ViralForgeAgentSystem:
             max_tokens=4000
         )
     
-    def _setup_knowledge(self) -> List[StringKnowledgeSource]:
+    def _setup_knowledge(self) -> List["StringKnowledgeSource"]:
         """Set up persistent knowledge storage for agents."""
         # Get knowledge directory relative to this script
         script_dir = Path(__file__).parent.parent.parent
         knowledge_dir = script_dir / 'knowledge'
         
+        StringKnowledgeSource = _import("crewai.knowledge.source.string_knowledge_source").StringKnowledgeSource
         knowledge_sources = []
         knowledge_files = [
             'viral_patterns.md',
@@ -95,10 +247,13 @@ class ViralForgeAgentSystem:
     def _setup_tools(self) -> Dict[str, Any]:
         """Initialize all tools needed by agents."""
         # Get custom social media tools
-        social_tools = get_crew_social_tools(
-            base_url=os.getenv("CREW_TOOLS_URL", "http://localhost:8001")
+        social_tools = _import("crewai_integration").get_crew_social_tools(
+            base_url=os.getenv("CREW_TOOLS_URL", "http://localhost:8001"),
+            uds=os.getenv("CREW_TOOLS_UDS") or None,
         )
         
+        crewai_tools = _import("crewai_tools")
+        
         return {
             # Custom Social Media Discovery Tools (from crew-social-tools)
             "twitter_search": social_tools["twitter"],
@@ -109,7 +264,7 @@ class ViralForgeAgentSystem:
             "social_aggregator": social_tools["aggregator"],
             
             # Other Discovery Tools
-            "web_scraper": ScrapeWebsiteTool(),
+            "web_scraper": crewai_tools.ScrapeWebsiteTool(),
             # Note: Advanced search tools disabled - require API keys
             # "advanced_search": TavilySearchTool(api_key=os.getenv("TAVILY_API_KEY")),
             # "web_crawler": FirecrawlCrawlWebsiteTool(api_key=os.getenv("FIRECRAWL_API_KEY")),
@@ -122,7 +277,7 @@ class ViralForgeAgentSystem:
 
             # Content Creation Tools
             # "image_generator": DallETool(api_key=os.getenv("OPENAI_API_KEY")),
-            "file_writer": FileWriterTool(),
+            "file_writer": crewai_tools.FileWriterTool(),
 
             # Database & Storage
             # "db_query": PGSearchTool(db_uri=os.getenv("DATABASE_URL")),
@@ -131,9 +286,10 @@ class ViralForgeAgentSystem:
             # "zapier": ZapierActionTool(api_key=os.getenv("ZAPIER_NLA_API_KEY")),
         }
     
-    def _create_agents(self) -> Dict[str, Agent]:
+    def _create_agents(self) -> Dict[str, "Agent"]:
         """Create specialized agents with distinct roles and capabilities."""
         
+        Agent = _import("crewai").Agent
         agents = {}
         
         # 1. TrendScout Agent - Discovers viral opportunities
@@ -240,52 +396,19 @@ class ViralForgeAgentSystem:
         
         return agents
     
-    def _create_crews(self) -> Dict[str, Crew]:
-        """Create specialized crews for different workflows."""
+    def _create_crews(self) -> Dict[str, CrewTemplate]:
+        """Create templates for the crews of each workflow; runs build their own crew."""
         
-        crews = {}
-        
-        # 1. Discovery Crew - Find trending opportunities
-        crews["discovery"] = Crew(
-            agents=[self.agents["trend_scout"], self.agents["content_analyzer"]],
-            tasks=[],  # Tasks will be created dynamically
-            process=Process.sequential,
-            verbose=True,
-            memory=False,  # Disable memory to avoid embeddings requirement
-            max_rpm=30
-        )
-
-        # 2. Creation Crew - Generate viral content
-        crews["creation"] = Crew(
-            agents=[self.agents["content_creator"], self.agents["content_analyzer"]],
-            tasks=[],
-            process=Process.sequential,
-            verbose=True,
-            memory=False,
-            max_rpm=30
-        )
-
-        # 3. Publication Crew - Distribute and optimize
-        crews["publication"] = Crew(
-            agents=[self.agents["publish_manager"], self.agents["performance_tracker"]],
-            tasks=[],
-            process=Process.sequential,
-            verbose=True,
-            memory=False,
-            max_rpm=30
-        )
-
-        # 4. Full Pipeline Crew - End-to-end viral content pipeline
-        crews["full_pipeline"] = Crew(
-            agents=list(self.agents.values()),
-            tasks=[],
-            process=Process.sequential,
-            verbose=True,
-            memory=False,
-            max_rpm=30
-        )
-        
-        return crews
+        return {
+            # 1. Discovery Crew - Find trending opportunities
+            "discovery": CrewTemplate(agents=("trend_scout", "content_analyzer")),
+            # 2. Creation Crew - Generate viral content
+            "creation": CrewTemplate(agents=("content_creator", "content_analyzer")),
+            # 3. Publication Crew - Distribute and optimize
+            "publication": CrewTemplate(agents=("publish_manager", "performance_tracker")),
+            # 4. Full Pipeline Crew - End-to-end viral content pipeline
+            "full_pipeline": CrewTemplate(agents=tuple(self.agents)),
+        }
     
     async def discover_trends(self, platforms: List[str] = None, niches: List[str] = None) -> Dict[str, Any]:
         """
@@ -301,6 +424,9 @@ class ViralForgeAgentSystem:
         
         platforms = platforms or ['youtube', 'tiktok', 'instagram']
         niches = niches or ['general']
+        Task = _import("crewai").Task
+        template = self.crews["discovery"]
+        agents = template.staff(self.agents)
         
         # Create discovery tasks
         discovery_task = Task(
@@ -317,7 +443,7 @@ class ViralForgeAgentSystem:
             
             Focus on content with high engagement rates and viral potential.
             """,
-            agent=self.agents["trend_scout"],
+            agent=agents["trend_scout"],
             expected_output="Comprehensive trend analysis report with specific opportunities"
         )
         
@@ -332,22 +458,22 @@ class ViralForgeAgentSystem:
             
             Provide data-driven recommendations for content strategy.
             """,
-            agent=self.agents["content_analyzer"],
+            agent=agents["content_analyzer"],
             expected_output="Detailed analysis report with actionable recommendations",
             context=[discovery_task]
         )
         
-        # Set tasks and execute
-        self.crews["discovery"].tasks = [discovery_task, analysis_task]
-        
         try:
-            result = await self.crews["discovery"].kickoff_async()
+            crew = template.build(agents, [discovery_task, analysis_task])
+            with memoized_tools(self.tool_memo) as memo:
+                result = await crew.kickoff_async()
             return {
                 "status": "success",
                 "trends": result.raw,
                 "timestamp": datetime.now().isoformat(),
                 "platforms": platforms,
-                "niches": niches
+                "niches": niches,
+                "tool_cache": memo.stats()
             }
         except Exception as e:
             return {
@@ -367,6 +493,9 @@ class ViralForgeAgentSystem:
         Returns:
             Dictionary containing created content and metadata
         """
+        Task = _import("crewai").Task
+        template = self.crews["creation"]
+        agents = template.staff(self.agents)
         
         creation_task = Task(
             description=f"""
@@ -382,7 +511,7 @@ class ViralForgeAgentSystem:
             
             Ensure the content is original while leveraging proven viral patterns.
             """,
-            agent=self.agents["content_creator"],
+            agent=agents["content_creator"],
             expected_output=f"Complete {content_type} content package with optimization details"
         )
         
@@ -395,21 +524,21 @@ class ViralForgeAgentSystem:
             4. Predict viral potential score
             5. Recommend distribution strategy
             """,
-            agent=self.agents["content_analyzer"],
+            agent=agents["content_analyzer"],
             expected_output="Content optimization report with viral potential assessment",
             context=[creation_task]
         )
         
-        # Set tasks and execute
-        self.crews["creation"].tasks = [creation_task, optimization_task]
-        
         try:
-            result = await self.crews["creation"].kickoff_async()
+            crew = template.build(agents, [creation_task, optimization_task])
+            with memoized_tools(self.tool_memo) as memo:
+                result = await crew.kickoff_async()
             return {
                 "status": "success",
                 "content": result.raw,
                 "content_type": content_type,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "tool_cache": memo.stats()
             }
         except Exception as e:
             return {
@@ -429,6 +558,9 @@ class ViralForgeAgentSystem:
         Returns:
             Complete pipeline execution results
         """
+        Task = _import("crewai").Task
+        template = self.crews["full_pipeline"]
+        agents = template.staff(self.agents)
         
         pipeline_tasks = [
             # 1. Trend Discovery
@@ -439,7 +571,7 @@ class ViralForgeAgentSystem:
                 
                 Focus on trends that align with the user's niche and audience.
                 """,
-                agent=self.agents["trend_scout"],
+                agent=agents["trend_scout"],
                 expected_output="Personalized trend opportunities report"
             ),
             
@@ -449,7 +581,7 @@ class ViralForgeAgentSystem:
                 Analyze discovered trends and user's historical performance to identify
                 the most promising content opportunities and optimization strategies.
                 """,
-                agent=self.agents["content_analyzer"],
+                agent=agents["content_analyzer"],
                 expected_output="Strategic content recommendations with performance predictions"
             ),
             
@@ -459,7 +591,7 @@ class ViralForgeAgentSystem:
                 Create optimized viral content based on trend analysis and performance insights.
                 Generate multiple content variations for A/B testing.
                 """,
-                agent=self.agents["content_creator"], 
+                agent=agents["content_creator"], 
                 expected_output="Complete content package with variations"
             ),
             
@@ -469,7 +601,7 @@ class ViralForgeAgentSystem:
                 Create optimized publication schedule and distribution strategy.
                 Set up cross-platform posting and engagement monitoring.
                 """,
-                agent=self.agents["publish_manager"],
+                agent=agents["publish_manager"],
                 expected_output="Publication schedule and distribution plan"
             ),
             
@@ -479,7 +611,7 @@ class ViralForgeAgentSystem:
                 Set up comprehensive performance tracking and monitoring for the campaign.
                 Define success metrics and optimization triggers.
                 """,
-                agent=self.agents["performance_tracker"],
+                agent=agents["performance_tracker"],
                 expected_output="Performance monitoring and optimization framework"
             )
         ]
@@ -488,10 +620,10 @@ class ViralForgeAgentSystem:
         for i in range(1, len(pipeline_tasks)):
             pipeline_tasks[i].context = pipeline_tasks[:i]
         
-        self.crews["full_pipeline"].tasks = pipeline_tasks
-        
         try:
-            result = await self.crews["full_pipeline"].kickoff_async()
+            crew = template.build(agents, pipeline_tasks)
+            with memoized_tools(self.tool_memo) as memo:
+                result = await crew.kickoff_async()
             
             # Store results in database
             await self._store_pipeline_results(user_id, result, campaign_config)
@@ -501,7 +633,8 @@ class ViralForgeAgentSystem:
                 "pipeline_result": result.raw,
                 "user_id": user_id,
                 "campaign_config": campaign_config,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "tool_cache": memo.stats()
             }
             
         except Exception as e:
@@ -530,3 +663,17 @@ def get_agent_system() -> ViralForgeAgentSystem:
     if viral_agent_system is None:
         viral_agent_system = ViralForgeAgentSystem()
     return viral_agent_system
+
+
+def startup_report() -> Dict[str, Any]:
+    """Seconds spent on imports and on building the global agent system, so far.
+
+    Only what has been needed yet appears: a fresh process shows just this module's import.
+    """
+    report: Dict[str, Any] = {"imports": dict(IMPORT_TIMES)}
+    if viral_agent_system is not None:
+        report["system"] = dict(viral_agent_system.timings)
+    return report
+
+
+IMPORT_TIMES["viral_crew"] = time.perf_counter() - _IMPORT_STARTED
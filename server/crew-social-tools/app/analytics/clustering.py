@@ -0,0 +1,270 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Sequence, Set, Tuple
+from collections import Counter
+import hashlib, math, threading, time
+import numpy as np
+from ..common.schemas import UnifiedItem, TopicCluster
+from ..common.config import settings
+from .heavy_hitters import extract
+
+_REPRESENTATIVES = 20
+_TERMS_KEPT = 100
+_TEXT_CHARS = 280
+_CENTROID_TERMS = 1024
+
+# A batch of TF-IDF rows in CSR layout: (indptr, indices, data).
+_Rows = Tuple[np.ndarray, np.ndarray, np.ndarray]
+# A centroid as its non-zero dimensions and their weights.
+_Centroid = Tuple[np.ndarray, np.ndarray]
+
+
+def _bucket(term: str, dim: int) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=4).digest(), "little") % dim
+
+
+class _Cluster:
+    def __init__(self, cid: int, buckets: int):
+        self.id = cid
+        self.size = 0
+        self.weight = 0.0
+        self.last_seen = 0.0
+        self.terms: Counter = Counter()
+        self.reps: List[Tuple[float, UnifiedItem]] = []
+        self.epoch = np.full(buckets, -1, dtype=np.int64)
+        self.items = np.zeros(buckets, dtype=np.int64)
+        self.engagement = np.zeros(buckets, dtype=np.float64)
+
+    def observe(self, epoch: int, engagement: float) -> None:
+        slot = epoch % self.epoch.shape[0]
+        if self.epoch[slot] != epoch:
+            self.epoch[slot] = epoch
+            self.items[slot] = 0
+            self.engagement[slot] = 0.0
+        self.items[slot] += 1
+        self.engagement[slot] += engagement
+
+    def window(self, first: int, last: int) -> Tuple[int, float]:
+        mask = (self.epoch >= first) & (self.epoch <= last)
+        return int(self.items[mask].sum()), float(self.engagement[mask].sum())
+
+
+class TopicClusterer:
+    """Online topic clustering over hashed TF-IDF vectors with mini-batch centroid updates.
+
+    Tokens are hashed into a fixed number of dimensions and weighted by an IDF estimated from
+    everything seen so far. Documents and centroids are kept sparse: a batch only ever touches
+    the dimensions its own tokens hash to, and a centroid keeps its ``_CENTROID_TERMS``
+    heaviest dimensions. Each batch is assigned to its nearest centroid by cosine similarity;
+    documents below ``threshold`` seed a new cluster (recycling the stalest one when full).
+    Centroids move by the mini-batch mean with a capped learning count, so topics keep drifting
+    with the conversation instead of freezing. Per-cluster time buckets track item counts and
+    engagement so growth can be compared across windows of up to ``max_window_minutes``.
+    """
+
+    def __init__(self, dim: int = 1 << 14, max_clusters: int = 128, threshold: float = 0.25,
+                 bucket_seconds: int = 900, buckets: int = 192, max_weight: float = 500.0):
+        self.dim = dim
+        self.threshold = threshold
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.max_weight = max_weight
+        self._centroids: List[Optional[_Centroid]] = [None] * max_clusters
+        self._clusters: List[Optional[_Cluster]] = [None] * max_clusters
+        self._df = np.zeros(dim, dtype=np.int64)
+        self._docs = 0
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def max_window_minutes(self) -> int:
+        # Growth compares a window with the one before it, so the ring holds two.
+        return max(1, self.buckets // 2 * self.bucket_seconds // 60)
+
+    def _vectorize(self, token_lists: Sequence[List[str]]) -> _Rows:
+        lengths = [len(tokens) for tokens in token_lists]
+        cols = np.fromiter((_bucket(t, self.dim) for tokens in token_lists for t in tokens),
+                           dtype=np.int64, count=sum(lengths))
+        cells, tf = np.unique(np.repeat(np.arange(len(lengths)), lengths) * self.dim + cols, return_counts=True)
+        rows, indices = np.divmod(cells, self.dim)
+        self._df += np.bincount(indices, minlength=self.dim)
+        self._docs += len(lengths)
+        idf = np.log((self._docs + 1) / (self._df[indices] + 1)) + 1.0
+        data = ((1.0 + np.log(tf)) * idf).astype(np.float32)
+        indptr = np.searchsorted(rows, np.arange(len(lengths) + 1))
+        norms = np.sqrt(np.add.reduceat(data * data, indptr[:-1]))
+        return indptr, indices, data / np.repeat(norms, np.diff(indptr))
+
+    def _similarities(self, X: _Rows) -> np.ndarray:
+        """Cosine similarity of every row to every slot, (rows, slots); -1 for empty slots."""
+        indptr, indices, data = X
+        cols, local = np.unique(indices, return_inverse=True)
+        # Centroids restricted to the dimensions this batch uses.
+        C = np.zeros((len(self._clusters), cols.shape[0]), dtype=np.float32)
+        for slot, centroid in enumerate(self._centroids):
+            if centroid is None or self._clusters[slot] is None:
+                continue
+            idx, val = centroid
+            pos = np.minimum(np.searchsorted(cols, idx), cols.shape[0] - 1)
+            hit = cols[pos] == idx
+            C[slot, pos[hit]] = val[hit]
+        sims = np.add.reduceat(C[:, local] * data, indptr[:-1], axis=1).T
+        sims[:, [c is None for c in self._clusters]] = -1.0
+        return sims
+
+    @staticmethod
+    def _gram(X: _Rows, rows: np.ndarray) -> np.ndarray:
+        """Pairwise cosine similarity of the given rows, densified over their own dimensions."""
+        indptr, indices, data = X
+        owner = np.repeat(np.arange(indptr.shape[0] - 1), np.diff(indptr))
+        pick = np.isin(owner, rows)
+        cols, local = np.unique(indices[pick], return_inverse=True)
+        D = np.zeros((rows.shape[0], cols.shape[0]), dtype=np.float32)
+        D[np.searchsorted(rows, owner[pick]), local] = data[pick]
+        return D @ D.T
+
+    def _move(self, slot: int, idx: np.ndarray, val: np.ndarray, m: float, weight: float) -> None:
+        # centroid + (sum(members) - m * centroid) / weight, then unit length again.
+        c_idx, c_val = self._centroids[slot]
+        cells, inverse = np.unique(np.concatenate([c_idx, idx]), return_inverse=True)
+        vals = np.bincount(inverse, weights=np.concatenate([c_val * (1.0 - m / weight), val / weight]))
+        if cells.shape[0] > _CENTROID_TERMS:
+            keep = np.sort(np.argpartition(vals, -_CENTROID_TERMS)[-_CENTROID_TERMS:])
+            cells, vals = cells[keep], vals[keep]
+        norm = np.linalg.norm(vals)
+        self._centroids[slot] = (cells, (vals / norm if norm > 0 else vals).astype(np.float32))
+
+    def _free_slot(self, taken: Set[int]) -> Optional[int]:
+        """An empty slot, else the stalest cluster not in ``taken``; None if every one is."""
+        for i, c in enumerate(self._clusters):
+            if c is None:
+                return i
+        stale = [i for i in range(len(self._clusters)) if i not in taken]
+        return min(stale, key=lambda i: self._clusters[i].last_seen) if stale else None
+
+    def _seed(self, X: _Rows, row: int, now: float, slot: int) -> None:
+        indptr, indices, data = X
+        self._clusters[slot] = _Cluster(self._next_id, self.buckets)
+        self._clusters[slot].last_seen = now
+        self._next_id += 1
+        span = slice(indptr[row], indptr[row + 1])
+        self._centroids[slot] = (indices[span].copy(), data[span].copy())
+
+    def add(self, items: Sequence[UnifiedItem], ts: Optional[float] = None) -> int:
+        """Cluster a batch; returns the number of items assigned."""
+        now = time.time() if ts is None else ts
+        docs = []
+        for item in items:
+            tags, words = extract(item)
+            tokens = words + ["#" + t for t in tags]
+            if tokens:
+                docs.append((item, tokens))
+        if not docs:
+            return 0
+        epoch = int(now // self.bucket_seconds)
+        with self._lock:
+            X = self._vectorize([tokens for _, tokens in docs])
+            sims = self._similarities(X)
+            assign = sims.argmax(axis=1)
+            best = sims[np.arange(len(docs)), assign]
+
+            # Documents that fit no existing topic seed new clusters one at a time, so
+            # similar newcomers in the same batch land together. They were already below
+            # the threshold for every existing centroid, so only this batch's seeds (whose
+            # centroids are the seeding documents) need comparing. Clusters this batch
+            # matches or seeds are never recycled for a later seed of the same batch.
+            taken = set(np.unique(assign[best >= self.threshold]).tolist())
+            low = np.flatnonzero(best < self.threshold)
+            if low.size:
+                gram = self._gram(X, low)
+                seed_rows: List[int] = []
+                seed_slots: List[int] = []
+                for k, i in enumerate(low):
+                    if seed_rows:
+                        s = gram[k, seed_rows]
+                        j = int(s.argmax())
+                        if s[j] >= self.threshold:
+                            assign[i], best[i] = seed_slots[j], s[j]
+                            continue
+                    slot = self._free_slot(taken)
+                    if slot is None:
+                        # Every slot holds a topic of this batch; join the closest of them.
+                        scores = sims[i].copy()
+                        scores[seed_slots] = gram[k, seed_rows]
+                        assign[i] = int(scores.argmax())
+                        best[i] = scores[assign[i]]
+                        continue
+                    self._seed(X, i, now, slot)
+                    assign[i], best[i] = slot, 1.0
+                    taken.add(slot)
+                    seed_rows.append(k)
+                    seed_slots.append(slot)
+
+            indptr, indices, data = X
+            owner = assign[np.repeat(np.arange(len(docs)), np.diff(indptr))]
+            for slot in np.unique(assign):
+                members = np.flatnonzero(assign == slot)
+                cluster = self._clusters[slot]
+                m = float(members.shape[0])
+                cluster.weight = min(cluster.weight + m, self.max_weight)
+                entries = owner == slot
+                self._move(slot, indices[entries], data[entries], m, cluster.weight)
+                cluster.size += int(m)
+                cluster.last_seen = now
+                for i in members:
+                    item, tokens = docs[i]
+                    cluster.terms.update(tokens)
+                    cluster.observe(epoch, item.score if item.score is not None else 0.0)
+                    rep = item.model_copy(update={"text": (item.text or "")[:_TEXT_CHARS] or None})
+                    cluster.reps.append((float(best[i]), rep))
+                if len(cluster.terms) > 2 * _TERMS_KEPT:
+                    cluster.terms = Counter(dict(cluster.terms.most_common(_TERMS_KEPT)))
+                if len(cluster.reps) > _REPRESENTATIVES:
+                    cluster.reps.sort(key=lambda r: r[0], reverse=True)
+                    del cluster.reps[_REPRESENTATIVES:]
+        return len(docs)
+
+    def top(self, window_minutes: int = 60, limit: int = 10, min_items: int = 2,
+            representatives: int = 3, order_by: str = "emerging",
+            now: Optional[float] = None) -> List[TopicCluster]:
+        """Clusters ranked by growth of engagement versus the preceding window."""
+        if window_minutes > self.max_window_minutes:
+            raise ValueError(f"window_minutes must be at most {self.max_window_minutes}")
+        epoch = int((time.time() if now is None else now) // self.bucket_seconds)
+        span = max(1, -(-window_minutes * 60 // self.bucket_seconds))
+        out: List[Tuple[float, TopicCluster]] = []
+        with self._lock:
+            for cluster in self._clusters:
+                if cluster is None:
+                    continue
+                recent, engagement = cluster.window(epoch - span + 1, epoch)
+                if recent < min_items:
+                    continue
+                previous, prev_engagement = cluster.window(epoch - 2 * span + 1, epoch - span)
+                growth = (recent + 1) / (previous + 1)
+                engagement_growth = (engagement + 1.0) / (prev_engagement + 1.0)
+                key = cluster.size if order_by == "size" else engagement_growth * math.log1p(recent)
+                reps = sorted(cluster.reps, key=lambda r: r[0], reverse=True)[:representatives]
+                out.append((key, TopicCluster(
+                    id=cluster.id,
+                    size=cluster.size,
+                    terms=[t for t, _ in cluster.terms.most_common(8)],
+                    recent_items=recent,
+                    previous_items=previous,
+                    growth=round(growth, 3),
+                    engagement=round(engagement, 2),
+                    engagement_growth=round(engagement_growth, 3),
+                    representatives=[r for _, r in reps],
+                )))
+        out.sort(key=lambda kv: kv[0], reverse=True)
+        return [c for _, c in out[:limit]]
+
+
+topic_clusterer = TopicClusterer(max_clusters=settings.cluster_max_topics, threshold=settings.cluster_threshold)
+
+
+class ClusterArgs(BaseModel):
+    window_minutes: int = Field(default=60, ge=1, le=topic_clusterer.max_window_minutes)
+    min_items: int = Field(default=2, ge=1)
+    representatives: int = Field(default=3, ge=0, le=_REPRESENTATIVES)
+    order_by: Literal["emerging", "size"] = "emerging"
+    limit: int = Field(default=10, ge=1, le=100)
@@ -0,0 +1,229 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib, re, threading, time
+import numpy as np
+from ..common.schemas import UnifiedItem, TrendingTerm
+from ..common.config import settings
+from .snapshots import item_key
+
+TermKind = Literal["hashtag", "keyword"]
+
+_HASHTAG_RE = re.compile(r"(?<![\w#])#(\w{2,64})", re.UNICODE)
+_WORD_RE = re.compile(r"(?<![#@\w])[^\W\d_][\w']{2,31}", re.UNICODE)
+_URL_RE = re.compile(r"https?://\S+")
+_STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further get got had
+has have having he her here hers him his how i if in into is it its just like me more most my no nor
+not now of off on once only or other our out over own same she should so some such than that the
+their them then there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your yours new one via amp rt http https www
+com video videos watch follow subscribe lol omg dont don't can't im i'm it's that's you're
+""".split())
+
+ANY = "*"
+
+
+def extract(item: UnifiedItem) -> Tuple[List[str], List[str]]:
+    """Return (hashtags, keywords) for an item, lowercased and de-duplicated."""
+    text = _URL_RE.sub(" ", " ".join(t for t in (item.title, item.text) if t))
+    tags = list(dict.fromkeys(t.lower() for t in _HASHTAG_RE.findall(text)))
+    words = list(dict.fromkeys(
+        w for w in (m.lower().strip("'") for m in _WORD_RE.findall(text))
+        if len(w) >= 3 and w not in _STOPWORDS
+    ))
+    return tags, words
+
+
+@lru_cache(maxsize=65536)
+def _term_hash(term: str) -> Tuple[int, int]:
+    d = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(d[:4], "little"), int.from_bytes(d[4:], "little") | 1
+
+
+def _cms_index(terms: List[str], depth: int, width: int) -> np.ndarray:
+    """Sketch column per (term, row), shape (n, depth), via double hashing of one digest."""
+    h = np.array([_term_hash(t) for t in terms], dtype=np.uint64).reshape(-1, 2)
+    return ((h[:, :1] + np.arange(depth, dtype=np.uint64) * h[:, 1:]) % np.uint64(width)).astype(np.intp)
+
+
+class _Stream:
+    """Count-min sketch and heavy-hitter candidates per time bucket for one (source, region)."""
+
+    def __init__(self, buckets: int, depth: int, width: int, candidates: int):
+        self.cms = np.zeros((buckets, depth, width), dtype=np.int32)
+        self.epoch = np.full(buckets, -1, dtype=np.int64)
+        self.cands: List[Dict[str, int]] = [dict() for _ in range(buckets)]
+        self.capacity = candidates
+        self.version = 0
+        self.memo: Dict[tuple, List[TrendingTerm]] = {}
+
+    def _slot(self, epoch: int) -> int:
+        slot = epoch % self.epoch.shape[0]
+        if self.epoch[slot] != epoch:
+            self.cms[slot] = 0
+            self.cands[slot].clear()
+            self.epoch[slot] = epoch
+        return slot
+
+    def add(self, epoch: int, terms: List[str], idx: np.ndarray) -> None:
+        slot = self._slot(epoch)
+        self.version += 1
+        self.memo.clear()
+        table = self.cms[slot]
+        rows = np.broadcast_to(np.arange(table.shape[0]), idx.shape)
+        np.add.at(table, (rows, idx), 1)
+        est = table[rows, idx].min(axis=1)
+        cands = self.cands[slot]
+        for term, count in zip(terms, est.tolist()):
+            cands[term] = count
+        if len(cands) > self.capacity:
+            keep = sorted(cands.items(), key=lambda kv: kv[1], reverse=True)[: self.capacity // 2]
+            self.cands[slot] = dict(keep)
+
+    def window(self, first: int, last: int) -> Tuple[np.ndarray, set]:
+        """Summed sketch and candidate union for epochs in [first, last]."""
+        slots = np.flatnonzero((self.epoch >= first) & (self.epoch <= last))
+        table = self.cms[slots].sum(axis=0) if slots.shape[0] else np.zeros(self.cms.shape[1:], dtype=np.int64)
+        cands = set()
+        for s in slots:
+            cands.update(self.cands[s])
+        return table, cands
+
+
+class HeavyHitters:
+    """Sliding-window hashtag/keyword heavy hitters in fixed memory.
+
+    Every stream (kind, source, region) holds a ring of time buckets, each with a count-min
+    sketch and a bounded candidate set. Aggregate streams for ``*`` source/region are updated
+    alongside the specific ones, so any query reads exactly one stream and never touches
+    stored items. The number of streams is capped; the least recently updated is evicted.
+
+    A window is compared with the one before it, so the ring must hold two of them:
+    windows up to ``max_window_minutes`` (half the ring) are answered.
+    """
+
+    def __init__(self, bucket_seconds: int = 300, buckets: int = 24, depth: int = 4,
+                 width: int = 1024, candidates: int = 256, max_streams: int = 64):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self._shape = (buckets, depth, width, candidates)
+        self._streams: "OrderedDict[Tuple[str, str, str], _Stream]" = OrderedDict()
+        self._max_streams = max_streams
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_window_minutes(self) -> int:
+        return max(1, self.buckets // 2 * self.bucket_seconds // 60)
+
+    def _stream(self, key: Tuple[str, str, str], create: bool) -> Optional[_Stream]:
+        stream = self._streams.get(key)
+        if stream is None and create:
+            if len(self._streams) >= self._max_streams:
+                self._streams.popitem(last=False)
+            stream = self._streams[key] = _Stream(*self._shape)
+        if stream is not None and create:
+            self._streams.move_to_end(key)
+        return stream
+
+    def _first_sighting(self, key: Optional[str], epoch: int) -> bool:
+        # An item re-scanned within the ring span is not counted again.
+        if key is None:
+            return True
+        last = self._seen.get(key)
+        if last is not None and epoch - last < self.buckets:
+            return False
+        self._seen[key] = epoch
+        self._seen.move_to_end(key)
+        while len(self._seen) > 200_000:
+            self._seen.popitem(last=False)
+        return True
+
+    def add(self, items: Iterable[UnifiedItem], region: Optional[str] = None, ts: Optional[float] = None) -> None:
+        epoch = int((time.time() if ts is None else ts) // self.bucket_seconds)
+        batches: Dict[Tuple[str, str, str], List[str]] = {}
+        reg = (region or ANY).lower()
+        with self._lock:
+            for item in items:
+                if not self._first_sighting(item_key(item), epoch):
+                    continue
+                tags, words = extract(item)
+                for kind, terms in (("hashtag", tags), ("keyword", words)):
+                    if not terms:
+                        continue
+                    for src in {item.source, ANY}:
+                        for r in {reg, ANY}:
+                            batches.setdefault((kind, src, r), []).extend(terms)
+            if not batches:
+                return
+            # Each term feeds up to four streams; hash it once.
+            uniq = list({t for terms in batches.values() for t in terms})
+            pos = {t: i for i, t in enumerate(uniq)}
+            index = _cms_index(uniq, self._shape[1], self._shape[2])
+            for key, terms in batches.items():
+                self._stream(key, create=True).add(epoch, terms, index[[pos[t] for t in terms]])
+
+    def top(self, kind: TermKind = "hashtag", source: Optional[str] = None, region: Optional[str] = None,
+            window_minutes: int = 60, limit: int = 20, order_by: str = "count",
+            now: Optional[float] = None) -> List[TrendingTerm]:
+        """Top terms in the trailing window, with the preceding window's count for comparison."""
+        if window_minutes > self.max_window_minutes:
+            raise ValueError(f"window_minutes must be at most {self.max_window_minutes}")
+        epoch = int((time.time() if now is None else now) // self.bucket_seconds)
+        span = max(1, -(-window_minutes * 60 // self.bucket_seconds))
+        key = (kind, source or ANY, (region or ANY).lower())
+        with self._lock:
+            stream = self._stream(key, create=False)
+            if stream is None:
+                return []
+            # Repeated queries between ingests are answered from the per-stream memo.
+            memo_key = (epoch, span, order_by, limit)
+            cached = stream.memo.get(memo_key)
+            if cached is not None:
+                return cached
+            version = stream.version
+            cur, cands = stream.window(epoch - span + 1, epoch)
+            prev, _ = stream.window(epoch - 2 * span + 1, epoch - span)
+        if not cands:
+            return []
+        terms = list(cands)
+        depth, width = cur.shape
+        idx = _cms_index(terms, depth, width)
+        rows = np.broadcast_to(np.arange(depth), idx.shape)
+        count = cur[rows, idx].min(axis=1)
+        previous = prev[rows, idx].min(axis=1)
+        surge = (count + 1) / (previous + 1)
+        score = count if order_by == "count" else surge
+        order = np.lexsort((-count, -score))
+        out: List[TrendingTerm] = []
+        for i in order:
+            if count[i] == 0:
+                continue
+            out.append(TrendingTerm(term=terms[i], count=int(count[i]), previous=int(previous[i]),
+                                    surge=round(float(surge[i]), 3)))
+            if len(out) >= limit:
+                break
+        with self._lock:
+            if stream.version == version:
+                stream.memo[memo_key] = out
+        return out
+
+
+heavy_hitters = HeavyHitters(
+    bucket_seconds=settings.trending_bucket_seconds,
+    buckets=settings.trending_buckets,
+    max_streams=settings.trending_max_streams,
+)
+
+
+class TrendingTermsArgs(BaseModel):
+    kind: TermKind = "hashtag"
+    source: Optional[str] = None
+    region: Optional[str] = None
+    # Bounded by the ring; raise TRENDING_BUCKETS or TRENDING_BUCKET_SECONDS for longer windows
+    window_minutes: int = Field(default=60, ge=1, le=heavy_hitters.max_window_minutes)
+    order_by: Literal["count", "surge"] = "count"
+    limit: int = Field(default=20, ge=1, le=200)
@@ -0,0 +1,144 @@
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
+import threading, warnings
+import numpy as np
+from ..common.schemas import UnifiedItem
+from ..common.config import settings
+
+RankMode = Literal["source", "viral"]
+
+# Feature columns: log reach, log weighted engagement, engagement rate.
+FEATURES = ("reach", "engagement", "rate")
+_WEIGHTS = np.array([0.25, 0.5, 0.25])
+# Comments and reposts signal more intent than a like, so they count for more.
+_COMMENT_WEIGHT = 2.0
+_SHARE_WEIGHT = 3.0
+_MAD_SCALE = 1.4826  # makes MAD a consistent estimator of the standard deviation
+
+
+def features(items: Sequence[UnifiedItem]) -> np.ndarray:
+    """Extract an (n, 3) feature matrix; missing metrics become NaN."""
+    raw = np.full((len(items), 5), np.nan)
+    for i, item in enumerate(items):
+        m = item.metrics
+        if m is None:
+            continue
+        raw[i] = (
+            m.views if m.views is not None else (m.playCount if m.playCount is not None else np.nan),
+            np.nan if m.likes is None else m.likes,
+            np.nan if m.comments is None else m.comments,
+            np.nan if m.shares is None else m.shares,
+            np.nan if m.retweets is None else m.retweets,
+        )
+    reach, likes, comments, shares, retweets = raw[:, 0], raw[:, 1], raw[:, 2], raw[:, 3], raw[:, 4]
+    parts = np.column_stack([likes, _COMMENT_WEIGHT * comments, _SHARE_WEIGHT * shares, _SHARE_WEIGHT * retweets])
+    has_engagement = ~np.all(np.isnan(parts), axis=1)
+    engagement = np.where(has_engagement, np.nansum(parts, axis=1), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(reach > 0, engagement / reach, np.nan)
+    return np.column_stack([np.log1p(np.clip(reach, 0, None)), np.log1p(np.clip(engagement, 0, None)), rate])
+
+
+def _robust(window: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Column-wise median and MAD, ignoring NaN (all-NaN columns stay NaN)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        median = np.nanmedian(window, axis=0)
+        mad = np.nanmedian(np.abs(window - median), axis=0)
+    return median, mad
+
+
+class _SourceWindow:
+    """Fixed-size ring buffer of recent feature rows for one source."""
+
+    def __init__(self, capacity: int):
+        self.rows = np.full((capacity, len(FEATURES)), np.nan)
+        self.pos = 0
+        self.filled = 0
+
+    def push(self, batch: np.ndarray) -> None:
+        cap = self.rows.shape[0]
+        batch = batch[-cap:]
+        n = batch.shape[0]
+        idx = (self.pos + np.arange(n)) % cap
+        self.rows[idx] = batch
+        self.pos = (self.pos + n) % cap
+        self.filled = min(cap, self.filled + n)
+
+    def stats(self) -> Tuple[np.ndarray, np.ndarray]:
+        return _robust(self.rows[:self.filled])
+
+
+class ViralScorer:
+    """Cross-platform viral score from per-source rolling robust statistics.
+
+    Each source keeps a window of its most recent feature rows. A batch is scored by the
+    robust z-score of each feature against its own source's median/MAD, so a Reddit post
+    and a TikTok video are compared by how unusual they are on their platform rather than
+    by raw counts. The weighted z-score is squashed to 0-100.
+    """
+
+    def __init__(self, window: int = 2048):
+        self._window = window
+        self._sources: Dict[str, _SourceWindow] = {}
+        self._lock = threading.Lock()
+
+    def score(self, items: Sequence[UnifiedItem], update: bool = True) -> np.ndarray:
+        """Return one score per item (NaN where an item has no metrics)."""
+        if not items:
+            return np.empty(0)
+        feats = features(items)
+        sources = np.array([item.source for item in items])
+        z = np.full(feats.shape, np.nan)
+        with self._lock:
+            for source in np.unique(sources):
+                rows = np.flatnonzero(sources == source)
+                win = self._sources.get(source)
+                if win is None:
+                    win = self._sources[source] = _SourceWindow(self._window)
+                if update:
+                    win.push(feats[rows])
+                # A source seen for the first time without updating is judged against itself.
+                median, mad = win.stats() if win.filled else _robust(feats[rows])
+                scale = _MAD_SCALE * np.where(np.isnan(mad) | (mad == 0), 1.0, mad)
+                z[rows] = (feats[rows] - median) / scale
+        return _combine(z)
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            out = {}
+            for source, win in self._sources.items():
+                median, mad = win.stats()
+                out[source] = {
+                    "samples": win.filled,
+                    "median": dict(zip(FEATURES, np.nan_to_num(median).tolist())),
+                    "mad": dict(zip(FEATURES, np.nan_to_num(mad).tolist())),
+                }
+            return out
+
+
+def _combine(z: np.ndarray) -> np.ndarray:
+    present = ~np.isnan(z)
+    weights = np.where(present, _WEIGHTS, 0.0)
+    total = weights.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        combined = np.where(total > 0, (np.where(present, z, 0.0) * weights).sum(axis=1) / total, np.nan)
+    return 100.0 / (1.0 + np.exp(-np.clip(combined, -50, 50)))
+
+
+def score_items(items: List[UnifiedItem], scorer: Optional[ViralScorer] = None, update: bool = True) -> List[UnifiedItem]:
+    """Attach ``score`` to each item in place and return the list."""
+    scores = (scorer or viral_scorer).score(items, update=update)
+    for item, s in zip(items, scores):
+        item.score = None if np.isnan(s) else round(float(s), 2)
+    return items
+
+
+def rank_items(items: List[UnifiedItem], mode: RankMode = "viral") -> List[UnifiedItem]:
+    """Order items by viral score (unscored last); ``source`` keeps upstream order."""
+    if mode == "source":
+        return items
+    scores = np.array([-1.0 if item.score is None else item.score for item in items])
+    return [items[i] for i in np.argsort(-scores, kind="stable")]
+
+
+viral_scorer = ViralScorer(settings.score_window)
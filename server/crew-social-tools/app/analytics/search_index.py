@@ -0,0 +1,140 @@
+from pydantic import BaseModel, Field
+from typing import Iterable, List, Literal, Optional
+import os, re, sqlite3, threading, time
+from ..common.schemas import UnifiedItem
+from ..common.config import settings
+from .snapshots import item_key
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    rowid INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT,
+    text TEXT,
+    author TEXT,
+    ingested_at REAL NOT NULL,
+    item_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_source_ingested ON items(source, ingested_at);
+CREATE INDEX IF NOT EXISTS items_ingested ON items(ingested_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    title, text, author, content='items', content_rowid='rowid',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts(rowid, title, text, author) VALUES (new.rowid, new.title, new.text, new.author);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, title, text, author) VALUES ('delete', old.rowid, old.title, old.text, old.author);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, title, text, author) VALUES ('delete', old.rowid, old.title, old.text, old.author);
+    INSERT INTO items_fts(rowid, title, text, author) VALUES (new.rowid, new.title, new.text, new.author);
+END;
+"""
+
+# bm25() column weights for (title, text, author).
+_BM25_WEIGHTS = (3.0, 1.0, 2.0)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_PRUNE_EVERY = 500
+
+
+class LocalSearchArgs(BaseModel):
+    query: str = Field(min_length=1)
+    sources: Optional[List[str]] = None
+    since_hours: Optional[float] = Field(default=None, gt=0)
+    match: Literal["all", "any"] = "all"
+    limit: int = Field(default=20, ge=1, le=200)
+
+
+def _fts_query(text: str, match: str) -> Optional[str]:
+    # Quote every token so user input can never be parsed as FTS5 syntax.
+    tokens = ['"%s"' % t for t in _TOKEN_RE.findall(text)]
+    if not tokens:
+        return None
+    return (" OR " if match == "any" else " ").join(tokens)
+
+
+class SearchIndex:
+    """Incremental SQLite FTS5 index over ingested items, ranked by BM25.
+
+    Items are upserted by ``source:id`` so re-scans refresh metrics without duplicating
+    postings. Rows older than the retention period are pruned periodically during ingest.
+    """
+
+    def __init__(self, path: str = ":memory:", retention_hours: float = 168.0):
+        self._path = path
+        self._pid: Optional[int] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._retention = retention_hours * 3600.0
+        self._lock = threading.Lock()
+        self._since_prune = 0
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # A connection must not cross fork(); each process opens its own on first use,
+        # so pre-forked workers share the file or, for ":memory:", keep private indexes.
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._pid = os.getpid()
+        return self._db
+
+    def add(self, items: Iterable[UnifiedItem], ts: Optional[float] = None) -> int:
+        ts = time.time() if ts is None else ts
+        rows = []
+        for item in items:
+            key = item_key(item)
+            if key is None or not (item.title or item.text or item.author):
+                continue
+            rows.append((key, item.source, item.title, item.text, item.author, ts, item.model_dump_json()))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO items(key, source, title, text, author, ingested_at, item_json) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET title=excluded.title, text=excluded.text, "
+                    "author=excluded.author, ingested_at=excluded.ingested_at, item_json=excluded.item_json",
+                    rows,
+                )
+                self._since_prune += len(rows)
+                if self._since_prune >= _PRUNE_EVERY:
+                    self._conn.execute("DELETE FROM items WHERE ingested_at < ?", (ts - self._retention,))
+                    self._since_prune = 0
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def search(self, args: LocalSearchArgs, now: Optional[float] = None) -> List[UnifiedItem]:
+        fts = _fts_query(args.query, args.match)
+        if fts is None:
+            return []
+        sql = ("SELECT items.item_json FROM items_fts JOIN items ON items.rowid = items_fts.rowid "
+               "WHERE items_fts MATCH ?")
+        params: list = [fts]
+        if args.sources:
+            sql += " AND items.source IN (%s)" % ",".join("?" * len(args.sources))
+            params.extend(args.sources)
+        if args.since_hours:
+            sql += " AND items.ingested_at >= ?"
+            params.append((time.time() if now is None else now) - args.since_hours * 3600.0)
+        sql += " ORDER BY bm25(items_fts, %s, %s, %s) LIMIT ?" % _BM25_WEIGHTS
+        params.append(args.limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [UnifiedItem.model_validate_json(r[0]) for r in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+
+search_index = SearchIndex(settings.search_index_path, settings.search_index_retention_hours)
@@ -0,0 +1,396 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+import fcntl, json, os, shutil, threading, time, uuid
+import numpy as np
+from ..common.schemas import UnifiedItem
+from ..common.config import settings
+
+# Tracked engagement columns. TikTok reports views as playCount, so it is folded into "views".
+METRICS = ("views", "likes", "comments")
+
+_INITIAL_CAPACITY = 4096
+# On-disk column files: item number (int32), timestamp and one per metric (float64).
+_FILES = (("item", np.int32), ("ts", np.float64)) + tuple((name, np.float64) for name in METRICS)
+
+
+def item_key(item: UnifiedItem) -> Optional[str]:
+    ref = item.id or item.url
+    if not ref:
+        return None
+    return f"{item.source}:{ref}"
+
+
+def _legacy_meta(key: str) -> dict:
+    return {"source": key.split(":", 1)[0], "id": None, "url": None, "title": None}
+
+
+def _append_rows(path: Path, item: np.ndarray, ts: np.ndarray, values: np.ndarray) -> None:
+    for (name, dtype), column in zip(_FILES, [item, ts] + list(values)):
+        with open(path / f"{name}.bin", "ab") as f:
+            column.astype(dtype).tofile(f)
+
+
+def _read_segment(path: Path) -> Tuple[Dict[int, Tuple[str, dict]], np.ndarray, np.ndarray, np.ndarray]:
+    """Entries by item number, and the (item, ts, values) rows of one segment.
+
+    A crash mid-append can leave a torn key line or columns of different lengths; only
+    complete rows whose item number is known are returned.
+    """
+    entries: Dict[int, Tuple[str, dict]] = {}
+    if (path / "keys.jsonl").exists():
+        for line in (path / "keys.jsonl").read_text(encoding="utf-8").splitlines():
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[rec["i"]] = (rec["key"], rec["meta"])
+    elif (path / "keys.txt").exists():  # layout before segments: keys only
+        keys = (path / "keys.txt").read_text(encoding="utf-8").splitlines()
+        entries = {i: (k, _legacy_meta(k)) for i, k in enumerate(keys)}
+    cols = [np.fromfile(path / f"{name}.bin", dtype=dtype) if (path / f"{name}.bin").exists() else np.empty(0, dtype)
+            for name, dtype in _FILES]
+    n = min(c.shape[0] for c in cols)
+    item, ts, values = cols[0][:n], cols[1][:n], np.vstack([c[:n] for c in cols[2:]])
+    ok = np.isin(item, np.fromiter(entries, dtype=np.int32, count=len(entries)))
+    return entries, item[ok], ts[ok], values[:, ok]
+
+
+def _write_segment(root: Path, entries: Dict[int, Tuple[str, dict]], item: np.ndarray, ts: np.ndarray,
+                   values: np.ndarray) -> Path:
+    """Write a complete segment; it only appears under its final name once fully written."""
+    tmp = root / f".new-{uuid.uuid4().hex}"
+    tmp.mkdir()
+    with open(tmp / "keys.jsonl", "w", encoding="utf-8") as f:
+        for local, (key, meta) in entries.items():
+            f.write(json.dumps({"i": local, "key": key, "meta": meta}) + "\n")
+    _append_rows(tmp, item, ts, values)
+    path = root / _segment_name()
+    tmp.rename(path)
+    return path
+
+
+def _segment_name() -> str:
+    # Sorts by creation time, so on reload later metadata for a key wins.
+    return f"{time.time_ns():020d}-{os.getpid()}"
+
+
+def _is_live(path: Path) -> bool:
+    """True while a process holds the segment's writer lock."""
+    try:
+        with open(path / "writer.lock", "r") as f:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except FileNotFoundError:
+        return False
+    except BlockingIOError:
+        return True
+    return False
+
+
+class _Segment:
+    """The files one process appends to: ``keys.jsonl`` plus a raw binary file per column.
+
+    Item numbers in ``item.bin`` are local to the segment and mapped to keys by
+    ``keys.jsonl``; a later line for the same number carries updated metadata. The writer
+    holds ``writer.lock`` for as long as it may append, so other processes never compact a
+    live segment. Each process writes its own segment, so pre-forked workers never
+    interleave rows or item numbers.
+    """
+
+    def __init__(self, root: Path):
+        tmp = root / f".new-{uuid.uuid4().hex}"
+        tmp.mkdir()
+        self._lock = open(tmp / "writer.lock", "w")
+        fcntl.flock(self._lock, fcntl.LOCK_EX)
+        self.path = root / _segment_name()
+        tmp.rename(self.path)
+        self.pid = os.getpid()
+        self.opened = time.time()
+        self._local: Dict[int, int] = {}
+        self._meta: Dict[int, dict] = {}
+        self._next = 0
+
+    def append(self, keys: List[str], meta: List[dict], item: np.ndarray, ts: np.ndarray, values: np.ndarray) -> None:
+        lines = []
+        for idx in np.unique(item).tolist():
+            if idx not in self._local:
+                self._local[idx] = self._next
+                self._next += 1
+            elif self._meta[idx] == meta[idx]:
+                continue
+            self._meta[idx] = meta[idx]
+            lines.append(json.dumps({"i": self._local[idx], "key": keys[idx], "meta": meta[idx]}) + "\n")
+        if lines:
+            with open(self.path / "keys.jsonl", "a", encoding="utf-8") as f:
+                f.writelines(lines)
+        local = np.fromiter((self._local[i] for i in item.tolist()), dtype=np.int32, count=item.shape[0])
+        _append_rows(self.path, local, ts, values)
+
+    def renumber(self, remap: np.ndarray) -> None:
+        """Follow the store renumbering its items (-1: forgotten; numbered anew if seen again)."""
+        self._local = {int(remap[i]): n for i, n in self._local.items() if remap[i] >= 0}
+        self._meta = {int(remap[i]): m for i, m in self._meta.items() if remap[i] >= 0}
+
+    def close(self) -> None:
+        self._lock.close()
+
+
+def _metric_row(item: UnifiedItem) -> Tuple[float, float, float]:
+    m = item.metrics
+    if m is None:
+        return (np.nan, np.nan, np.nan)
+    views = m.views if m.views is not None else m.playCount
+    return tuple(np.nan if v is None else float(v) for v in (views, m.likes, m.comments))
+
+
+class SnapshotStore:
+    """Append-only columnar store of engagement snapshots.
+
+    Every scan of an item appends one row (item index, timestamp, views, likes, comments).
+    Columns are contiguous NumPy arrays written with non-decreasing timestamps, so a time
+    window is located by binary search and handed to the velocity engine as one slice.
+
+    When ``directory`` is set, each process also appends its rows to its own segment under
+    ``directory/segments`` (see ``_Segment``), starting a new one every quarter of the
+    retention period. On startup every segment is reloaded, and segments no longer being
+    written are merged into one with rows past retention dropped.
+
+    Items are numbered densely. Whenever expired rows are dropped, items none of the
+    remaining rows refer to are forgotten and the rest renumbered, so memory follows the
+    retained rows rather than every item ever seen.
+    """
+
+    def __init__(self, directory: Optional[str] = None, retention_hours: float = 72.0):
+        self._lock = threading.Lock()
+        self._retention = retention_hours * 3600.0
+        self._size = 0
+        self._item = np.empty(_INITIAL_CAPACITY, dtype=np.int32)
+        self._ts = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+        self._values = np.empty((len(METRICS), _INITIAL_CAPACITY), dtype=np.float64)
+        self._index: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._meta: List[dict] = []
+        self._dir = Path(directory) if directory else None
+        self._segment: Optional[_Segment] = None
+        if self._dir is not None:
+            (self._dir / "segments").mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def item_count(self) -> int:
+        return len(self._keys)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._ts.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._item = np.resize(self._item, capacity)
+        self._ts = np.resize(self._ts, capacity)
+        values = np.empty((len(METRICS), capacity), dtype=np.float64)
+        values[:, :self._size] = self._values[:, :self._size]
+        self._values = values
+
+    def _intern(self, key: str, item: UnifiedItem) -> int:
+        idx = self._index.get(key)
+        meta = {"source": item.source, "id": item.id, "url": item.url, "title": item.title or (item.text or "")[:120] or None}
+        if idx is None:
+            idx = len(self._keys)
+            self._index[key] = idx
+            self._keys.append(key)
+            self._meta.append(meta)
+        else:
+            self._meta[idx] = meta
+        return idx
+
+    def record(self, items: Iterable[UnifiedItem], ts: Optional[float] = None) -> int:
+        """Append one snapshot row per keyed item; returns the number of rows written."""
+        with self._lock:
+            ts = time.time() if ts is None else max(ts, self._ts[self._size - 1] if self._size else ts)
+            keyed = [(key, item) for key, item in ((item_key(item), item) for item in items) if key is not None]
+            if not keyed:
+                return 0
+            # Both may renumber items, so they run before this batch is interned.
+            writer = self._writer(time.time()) if self._dir is not None else None
+            if self._size + len(keyed) > self._ts.shape[0]:
+                self._compact(ts - self._retention)
+            batch = np.array([(self._intern(key, item),) + _metric_row(item) for key, item in keyed], dtype=np.float64)
+            start, end = self._size, self._size + len(keyed)
+            self._grow(end)
+            self._item[start:end] = batch[:, 0].astype(np.int32)
+            self._ts[start:end] = ts
+            self._values[:, start:end] = batch[:, 1:].T
+            self._size = end
+            if writer is not None:
+                writer.append(self._keys, self._meta, self._item[start:end], self._ts[start:end],
+                              self._values[:, start:end])
+            return len(keyed)
+
+    def _writer(self, now: float) -> _Segment:
+        segment = self._segment
+        if segment is not None and segment.pid == os.getpid() and now - segment.opened < self._retention / 4:
+            return segment
+        if segment is not None and segment.pid == os.getpid():
+            # Rotate: the finished segment can now be merged and trimmed to retention,
+            # and the rows in memory with it.
+            segment.close()
+            self._compact(now - self._retention)
+            self._compact_files(now - self._retention)
+        # After fork() the parent's segment is not ours to append to.
+        self._segment = _Segment(self._dir / "segments")
+        return self._segment
+
+    def _segment_paths(self) -> List[Path]:
+        paths = sorted(p for p in (self._dir / "segments").iterdir() if p.is_dir() and not p.name.startswith("."))
+        if (self._dir / "keys.txt").exists():
+            paths.insert(0, self._dir)
+        return paths
+
+    def _load(self) -> None:
+        cutoff = time.time() - self._retention
+        parts = []
+        for path in self._segment_paths():
+            entries, item, ts, values = _read_segment(path)
+            remap = np.zeros(max(entries, default=0) + 1, dtype=np.int32)
+            for local, (key, meta) in entries.items():
+                idx = self._index.get(key)
+                if idx is None:
+                    idx = self._index[key] = len(self._keys)
+                    self._keys.append(key)
+                    self._meta.append(meta)
+                else:
+                    self._meta[idx] = meta
+                remap[local] = idx
+            keep = ts >= cutoff
+            parts.append((remap[item[keep]], ts[keep], values[:, keep]))
+        if parts:
+            item = np.concatenate([p[0] for p in parts])
+            ts = np.concatenate([p[1] for p in parts])
+            values = np.concatenate([p[2] for p in parts], axis=1)
+            # Segments were written concurrently; restore one timestamp order.
+            order = np.argsort(ts, kind="stable")
+            n = order.shape[0]
+            self._grow(max(n, _INITIAL_CAPACITY))
+            self._item[:n] = item[order]
+            self._ts[:n] = ts[order]
+            self._values[:, :n] = values[:, order]
+            self._size = n
+        self._forget_unused()
+        self._compact_files(cutoff)
+
+    def _compact_files(self, cutoff: float) -> int:
+        """Merge segments no process is writing into one, dropping rows older than ``cutoff``.
+
+        Returns the number of segments replaced. Skipped while another process compacts.
+        """
+        with open(self._dir / "compact.lock", "w") as guard:
+            try:
+                fcntl.flock(guard, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+            done = [p for p in self._segment_paths() if not _is_live(p)]
+            if not done:
+                return 0
+            entries: Dict[str, Tuple[int, dict]] = {}
+            parts = []
+            expired = False
+            for path in done:
+                seg_entries, item, ts, values = _read_segment(path)
+                remap = np.zeros(max(seg_entries, default=0) + 1, dtype=np.int32)
+                for local, (key, meta) in seg_entries.items():
+                    number = entries[key][0] if key in entries else len(entries)
+                    entries[key] = (number, meta)
+                    remap[local] = number
+                keep = ts >= cutoff
+                expired = expired or not keep.all()
+                parts.append((remap[item[keep]], ts[keep], values[:, keep]))
+            if len(done) == 1 and not expired and done[0] != self._dir:
+                return 0
+            item = np.concatenate([p[0] for p in parts])
+            ts = np.concatenate([p[1] for p in parts])
+            values = np.concatenate([p[2] for p in parts], axis=1)
+            if item.shape[0]:
+                order = np.argsort(ts, kind="stable")
+                used = set(np.unique(item).tolist())
+                _write_segment(self._dir / "segments",
+                               {number: (key, meta) for key, (number, meta) in entries.items() if number in used},
+                               item[order], ts[order], values[:, order])
+            for path in done:
+                if path == self._dir:
+                    for name in ["keys.txt"] + [f"{name}.bin" for name, _ in _FILES]:
+                        (path / name).unlink(missing_ok=True)
+                else:
+                    shutil.rmtree(path, ignore_errors=True)
+            return len(done)
+
+    def close(self) -> None:
+        """Release this process's segment; it can then be merged by the next compaction."""
+        with self._lock:
+            if self._segment is not None and self._segment.pid == os.getpid():
+                self._segment.close()
+            self._segment = None
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Drop in-memory rows older than the retention period; returns rows removed."""
+        cutoff = (time.time() if now is None else now) - self._retention
+        with self._lock:
+            return self._compact(cutoff)
+
+    def _compact(self, cutoff: float) -> int:
+        # Timestamps are non-decreasing, so expired rows form a prefix.
+        start = int(np.searchsorted(self._ts[:self._size], cutoff, side="left"))
+        if start:
+            n = self._size - start
+            self._item[:n] = self._item[start:self._size]
+            self._ts[:n] = self._ts[start:self._size]
+            self._values[:, :n] = self._values[:, start:self._size]
+            self._size = n
+            self._forget_unused()
+        return start
+
+    def _forget_unused(self) -> None:
+        """Drop the keys and metadata of items no retained row refers to; renumber the rest."""
+        live = np.unique(self._item[:self._size])
+        if live.shape[0] == len(self._keys):
+            return
+        remap = np.full(len(self._keys), -1, dtype=np.int32)
+        remap[live] = np.arange(live.shape[0], dtype=np.int32)
+        self._item[:self._size] = remap[self._item[:self._size]]
+        self._keys = [self._keys[i] for i in live.tolist()]
+        self._meta = [self._meta[i] for i in live.tolist()]
+        self._index = {key: i for i, key in enumerate(self._keys)}
+        if self._segment is not None:
+            self._segment.renumber(remap)
+
+    def columns(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return copies of (item, ts, values) for rows with ts >= since, in append order."""
+        with self._lock:
+            return self._columns(since)
+
+    def _columns(self, since: Optional[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n = self._size
+        start = 0
+        if since is not None and n:
+            start = int(np.searchsorted(self._ts[:n], since, side="left"))
+        return self._item[start:n].copy(), self._ts[start:n].copy(), self._values[:, start:n].copy()
+
+    def window(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[dict]]:
+        """``columns`` plus the metadata of every item, numbered as those rows are.
+
+        Compaction renumbers items, so callers reading metadata for the rows use this
+        rather than ``columns`` followed by ``meta``.
+        """
+        with self._lock:
+            return self._columns(since) + (list(self._meta),)
+
+    def key(self, idx: int) -> str:
+        return self._keys[idx]
+
+    def meta(self, idx: int) -> dict:
+        return self._meta[idx]
+
+
+snapshot_store = SnapshotStore(settings.snapshot_dir, settings.snapshot_retention_hours)
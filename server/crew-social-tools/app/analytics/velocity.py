@@ -0,0 +1,118 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, NamedTuple, Optional
+import time
+import numpy as np
+from .snapshots import SnapshotStore, METRICS
+from ..common.schemas import RisingItem
+
+
+class RisingArgs(BaseModel):
+    metric: Literal["views", "likes", "comments"] = "views"
+    window_minutes: int = Field(default=60, ge=1, le=7 * 24 * 60)
+    source: Optional[str] = None
+    order_by: Literal["velocity", "acceleration"] = "velocity"
+    min_samples: int = Field(default=2, ge=2, le=1000)
+    limit: int = Field(default=25, ge=1, le=500)
+
+
+class VelocityResult(NamedTuple):
+    """Per-item kinematics as parallel NumPy arrays, one entry per item."""
+    item: np.ndarray          # item indices into the snapshot store
+    samples: np.ndarray       # number of snapshots inside the window
+    latest: np.ndarray        # last observed value
+    velocity: np.ndarray      # units per hour, first-to-last within the window
+    acceleration: np.ndarray  # units per hour^2, NaN when fewer than three snapshots
+
+
+def _group_bounds(keys: np.ndarray):
+    """Start/end (inclusive) offsets of runs of equal values in a sorted array."""
+    n = keys.shape[0]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    return starts, ends
+
+
+def compute(item: np.ndarray, ts: np.ndarray, values: np.ndarray) -> VelocityResult:
+    """Vectorized velocity and acceleration for every item present in the given rows.
+
+    Velocity is the slope between the first and last snapshot of each item. Acceleration is
+    the change between the first and last segment slopes divided by the time between their
+    midpoints, so it needs at least three snapshots.
+    """
+    ok = ~np.isnan(values)
+    item, ts, values = item[ok], ts[ok], values[ok]
+    empty = np.empty(0)
+    if item.shape[0] == 0:
+        return VelocityResult(item=empty.astype(np.int32), samples=empty.astype(np.int64),
+                              latest=empty, velocity=empty, acceleration=empty)
+
+    order = np.lexsort((ts, item))
+    item, ts, values = item[order], ts[order], values[order]
+    hours = ts / 3600.0
+
+    starts, ends = _group_bounds(item)
+    span = hours[ends] - hours[starts]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        velocity = np.where(span > 0, (values[ends] - values[starts]) / span, 0.0)
+
+    # Per-segment slopes between consecutive snapshots of the same item.
+    seg_dt = np.diff(hours)
+    valid = (item[1:] == item[:-1]) & (seg_dt > 0)
+    seg_item = item[1:][valid]
+    seg_mid = ((hours[1:] + hours[:-1]) / 2.0)[valid]
+    seg_v = np.diff(values)[valid] / seg_dt[valid]
+
+    acceleration = np.full(starts.shape[0], np.nan)
+    if seg_item.shape[0]:
+        s_starts, s_ends = _group_bounds(seg_item)
+        gap = seg_mid[s_ends] - seg_mid[s_starts]
+        has = gap > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            acc = (seg_v[s_ends] - seg_v[s_starts]) / gap
+        slot = np.searchsorted(item[starts], seg_item[s_starts])
+        acceleration[slot[has]] = acc[has]
+
+    return VelocityResult(
+        item=item[starts],
+        samples=ends - starts + 1,
+        latest=values[ends],
+        velocity=velocity,
+        acceleration=acceleration,
+    )
+
+
+def rising(store: SnapshotStore, args: RisingArgs, now: Optional[float] = None) -> List[RisingItem]:
+    """Items whose chosen metric is growing fastest over the trailing window."""
+    now = time.time() if now is None else now
+    item, ts, values, metas = store.window(since=now - args.window_minutes * 60)
+    if args.source:
+        mask = np.fromiter((m["source"] == args.source for m in metas), dtype=bool, count=len(metas))
+        keep = mask[item]
+        item, ts, values = item[keep], ts[keep], values[:, keep]
+
+    res = compute(item, ts, values[METRICS.index(args.metric)])
+    eligible = np.flatnonzero(res.samples >= args.min_samples)
+    score = res.velocity if args.order_by == "velocity" else np.nan_to_num(res.acceleration, nan=-np.inf)
+    k = min(args.limit, eligible.shape[0])
+    if k == 0:
+        return []
+    # argpartition keeps the top-k selection linear before sorting just those k.
+    top = eligible[np.argpartition(-score[eligible], k - 1)[:k]]
+    top = top[np.argsort(-score[top], kind="stable")]
+
+    out: List[RisingItem] = []
+    for i in top:
+        meta = metas[int(res.item[i])]
+        acc = res.acceleration[i]
+        out.append(RisingItem(
+            source=meta["source"],
+            id=meta["id"],
+            url=meta["url"],
+            title=meta["title"],
+            metric=args.metric,
+            latest=float(res.latest[i]),
+            velocity=float(res.velocity[i]),
+            acceleration=None if np.isnan(acc) else float(acc),
+            samples=int(res.samples[i]),
+        ))
+    return out
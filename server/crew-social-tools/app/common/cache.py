@@ -0,0 +1,106 @@
+from typing import Any, Callable, Hashable, Optional, Tuple
+from collections import OrderedDict
+import threading, time
+from .executor import run_io
+from .shared_state import StateBackend
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self._data: "OrderedDict[Hashable, Tuple[float, float, Any]]" = OrderedDict()
+        self._max = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= now:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._data[key] = (now, now + (self._ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max:
+                self._data.popitem(last=False)
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """Seconds since the entry was stored, or None if absent or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= now:
+                return None
+            return now - entry[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+    # Coroutine forms, for callers on the event loop; in-process they never block.
+    async def aget(self, key: Hashable) -> Optional[Any]:
+        return self.get(key)
+
+    async def aput(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self.put(key, value, ttl)
+
+    async def aage(self, key: Hashable) -> Optional[float]:
+        return self.age(key)
+
+
+class SharedTTLCache:
+    """TTLCache interface over a ``StateBackend`` so every worker process sees one cache.
+
+    Values cross process boundaries as text, via ``dumps``/``loads``. Eviction is by age
+    rather than LRU order. The coroutine forms run the store's blocking calls on the I/O
+    executor.
+    """
+
+    def __init__(self, backend: StateBackend, dumps: Callable[[Any], str], loads: Callable[[str], Any],
+                 max_entries: int = 1024, ttl: float = 300.0):
+        self._backend = backend
+        self._dumps = dumps
+        self._loads = loads
+        self._max = max_entries
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._backend.cache_get(key, time.time())
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._loads(entry[1])
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._backend.cache_put(key, self._dumps(value), time.time(), self._ttl if ttl is None else ttl, self._max)
+
+    def age(self, key: str) -> Optional[float]:
+        now = time.time()
+        entry = self._backend.cache_get(key, now)
+        return None if entry is None else now - entry[0]
+
+    def stats(self) -> dict:
+        return {"entries": self._backend.cache_size(), "hits": self.hits, "misses": self.misses, "shared": True}
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await run_io(self.get, key)
+
+    async def aput(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await run_io(self.put, key, value, ttl)
+
+    async def aage(self, key: str) -> Optional[float]:
+        return await run_io(self.age, key)
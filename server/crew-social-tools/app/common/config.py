@@ -1,15 +1,50 @@
 from pydantic_settings import BaseSettings
 from pydantic import AnyUrl
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     searxng_url: str = "http://localhost:8080"
+    searxng_concurrency: int = 4
     proxy_pool: Optional[str] = None
     reddit_client_id: Optional[str] = None
     reddit_client_secret: Optional[str] = None
     reddit_user_agent: str = "crew-social-tools/1.0"
     instaloader_session_file: Optional[str] = None
     jwt_public_keys_url: Optional[str] = None
+    snapshot_dir: Optional[str] = None
+    snapshot_retention_hours: float = 72.0
+    score_window: int = 2048
+    trending_bucket_seconds: int = 300
+    trending_buckets: int = 24
+    trending_max_streams: int = 64
+    search_index_path: str = ":memory:"
+    search_index_retention_hours: float = 168.0
+    cluster_max_topics: int = 128
+    cluster_threshold: float = 0.25
+    cache_ttl_seconds: float = 300.0
+    cache_max_entries: int = 1024
+    shared_state: Optional[str] = None  # sqlite:///path or module:factory; see common/shared_state.py
+    shared_lease_seconds: float = 120.0
+    shared_poll_seconds: float = 0.2
+    rate_limit_default: float = 60.0  # upstream requests per minute
+    rate_limits: Dict[str, float] = {
+        "twitter": 30, "instagram": 10, "tiktok": 10, "youtube": 30,
+        "reddit": 60, "ddg": 20, "searxng": 60,
+    }
+    prewarm_enabled: bool = True
+    prewarm_interval_seconds: float = 60.0
+    prewarm_top_n: int = 5
+    prewarm_half_life_seconds: float = 3600.0
+    prewarm_seeds: Optional[str] = None  # JSON list of {"tool": ..., "args": {...}}
+    executor_workers: int = 8
+    disconnect_poll_seconds: float = 0.25
+    job_ttl_seconds: float = 3600.0
+    job_workers_per_source: int = 1
+    job_max_concurrency: int = 4
+    job_queue_size: int = 100
+    hedge_primary: str = "ddg"
+    hedge_secondary: str = "searxng"
+    hedge_default_delay: float = 1.0  # seconds before the secondary fires, until the primary's p95 is known
 
     class Config:
         env_prefix = ""
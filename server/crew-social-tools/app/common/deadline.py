@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+import threading, time
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+
+class Budget:
+    """Time budget for one request; ``reason`` is set once a tool stops early because of it."""
+
+    def __init__(self, timeout: Optional[float]):
+        self.deadline = None if timeout is None else time.monotonic() + max(0.0, timeout)
+        self.reason: Optional[str] = None
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def extend(self, timeout: Optional[float]) -> None:
+        """Push the deadline back to ``timeout`` seconds from now if that is later; None lifts it."""
+        if self.deadline is None:
+            return
+        if timeout is None:
+            self.deadline = None
+        else:
+            self.deadline = max(self.deadline, time.monotonic() + max(0.0, timeout))
+
+    def stop(self, reason: str) -> None:
+        if self.reason is None:
+            self.reason = reason
+
+
+_budget: ContextVar[Optional[Budget]] = ContextVar("budget", default=None)
+_cancel: ContextVar[Optional[threading.Event]] = ContextVar("cancel", default=None)
+
+
+def current() -> Optional[Budget]:
+    return _budget.get()
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left before the deadline, capped at ``default`` when both are set."""
+    budget = _budget.get()
+    left = budget.remaining() if budget is not None else None
+    if left is None:
+        return default
+    return left if default is None else min(left, default)
+
+
+def expired() -> bool:
+    """Checked by tool modules between items; marks the budget partial when it fires."""
+    budget = _budget.get()
+    if budget is not None and budget.expired():
+        budget.stop("deadline exceeded")
+        return True
+    return False
+
+
+def bind_cancel(event: threading.Event) -> None:
+    """Attach a cancellation flag to the current context (used by ``run_blocking``)."""
+    _cancel.set(event)
+
+
+def should_stop() -> bool:
+    """Checked by blocking tools between items: the caller went away or the deadline passed."""
+    event = _cancel.get()
+    return (event is not None and event.is_set()) or expired()
+
+
+@contextmanager
+def bound(budget: Budget) -> Iterator[Budget]:
+    """Make ``budget`` the current one; it may be shared and extended while bound."""
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+import asyncio, contextvars, threading
+from .config import settings
+from . import deadline
+
+T = TypeVar("T")
+
+# Blocking scraper libraries (instaloader, praw, yt-dlp, DDGS) run here so they never stall
+# the event loop. The caller's context travels with the call, so progress hooks still fire.
+_executor = ThreadPoolExecutor(max_workers=settings.executor_workers, thread_name_prefix="scrape")
+# Short blocking I/O (the shared-state store) gets its own threads, so a pool full of
+# long scrapes never delays a cache lookup or a rate-limit token.
+_io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="state")
+
+
+async def run_blocking(fn: Callable[..., T], *args) -> T:
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    stop = threading.Event()
+    ctx.run(deadline.bind_cancel, stop)
+    try:
+        return await loop.run_in_executor(_executor, ctx.run, fn, *args)
+    except asyncio.CancelledError:
+        # A running thread cannot be interrupted; the tool sees this at its next
+        # deadline.should_stop() check and abandons the remaining items.
+        stop.set()
+        raise
+
+
+async def run_io(fn: Callable[..., T], *args) -> T:
+    return await asyncio.get_running_loop().run_in_executor(_io_executor, fn, *args)
@@ -0,0 +1,118 @@
+"""ETag / If-None-Match and negotiated gzip or zstd compression for /v1 responses."""
+from typing import Dict, List, Optional, Tuple
+import gzip, hashlib
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip only without it
+    zstandard = None
+
+ETAG_HEADER = b"etag"
+
+
+def etag_for(payload: bytes) -> str:
+    # Weak: equality is semantic (same items), not byte-for-byte across encodings.
+    return 'W/"%s"' % hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def _choose_encoding(accept: str) -> Optional[str]:
+    offered: Dict[str, float] = {}
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    for encoding in (("zstd", "gzip") if zstandard is not None else ("gzip",)):
+        if offered.get(encoding, offered.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return gzip.compress(body, compresslevel=5)
+
+
+class ConditionalCompressionMiddleware:
+    """Buffers complete JSON responses under ``prefix`` to add an ETag, answer matching
+    ``If-None-Match`` requests with 304, and compress bodies of at least ``minimum_size``.
+
+    Endpoints may set their own ETag (tool endpoints hash only the items, so the
+    ``cached`` flag does not defeat revalidation); otherwise the body is hashed. Streaming
+    responses (server-sent events) pass through untouched. Written as plain ASGI so
+    request disconnect detection keeps working.
+    """
+
+    def __init__(self, app, prefix: str = "/v1", minimum_size: int = 1024):
+        self.app = app
+        self.prefix = prefix
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+        request_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        start: Optional[dict] = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def wrapped(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start = message
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if message["status"] != 200 or not content_type.startswith(b"application/json"):
+                    passthrough = True
+                    await send(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self._finish(start, b"".join(chunks), request_headers, send)
+            else:
+                await send(message)
+
+        await self.app(scope, receive, wrapped)
+
+    async def _finish(self, start: dict, body: bytes, request_headers: Dict[str, str], send) -> None:
+        headers: List[Tuple[bytes, bytes]] = [
+            (k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"
+        ]
+        etag = next((v.decode("latin-1") for k, v in headers if k.lower() == ETAG_HEADER), None)
+        if etag is None:
+            etag = etag_for(body)
+            headers.append((ETAG_HEADER, etag.encode("latin-1")))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            keep = (ETAG_HEADER, b"vary", b"cache-control")
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": [(k, v) for k, v in headers if k.lower() in keep]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        encoding = _choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is not None and len(body) >= self.minimum_size:
+            body = _compress(body, encoding)
+            headers.append((b"content-encoding", encoding.encode("ascii")))
+        headers.append((b"content-length", str(len(body)).encode("ascii")))
+        await send({"type": "http.response.start", "status": start["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
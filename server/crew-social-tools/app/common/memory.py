@@ -0,0 +1,24 @@
+from typing import Dict, Union
+
+
+def usage(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """Memory of one process in kB: rss, pss and uss (pages no other process shares).
+
+    ``uss`` is what a process would free on exit, so summing it across pre-forked workers
+    (plus the master's rss once) sizes a container. Linux only; empty dict elsewhere.
+    """
+    fields: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[name] = int(parts[0])
+    except OSError:
+        return {}
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+from .schemas import UnifiedItem
+
+ItemCallback = Callable[[UnifiedItem], None]
+
+_on_item: ContextVar[Optional[ItemCallback]] = ContextVar("on_item", default=None)
+
+
+def report(item: UnifiedItem) -> None:
+    """Called by tool modules for every item as soon as it is collected."""
+    cb = _on_item.get()
+    if cb is not None:
+        cb(item)
+
+
+def current() -> Optional[ItemCallback]:
+    """The callback ``report`` routes to in this context, if any."""
+    return _on_item.get()
+
+
+@contextmanager
+def watching(cb: ItemCallback) -> Iterator[None]:
+    """Route ``report`` calls made in this context (and tasks/threads started from it) to cb.
+
+    Nested watchers all see each item, innermost first.
+    """
+    outer = _on_item.get()
+    if outer is not None:
+        inner = cb
+        def cb(item: UnifiedItem) -> None:
+            inner(item)
+            outer(item)
+    token = _on_item.set(cb)
+    try:
+        yield
+    finally:
+        _on_item.reset(token)
@@ -0,0 +1,101 @@
+from typing import Dict, Optional
+import asyncio, threading, time
+from .executor import run_io
+from .shared_state import StateBackend
+
+
+class RateLimited(Exception):
+    def __init__(self, source: str, retry_after: float):
+        super().__init__(f"{source} rate limit exceeded; retry in {retry_after:.1f}s")
+        self.source = source
+        self.retry_after = retry_after
+
+
+class _Bucket:
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute / 6.0)  # allow ~10s worth of burst
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    """Per-source token buckets guarding upstream scrapes.
+
+    Foreground requests wait up to ``max_wait`` for a token; background work uses
+    ``try_acquire`` with a reserve so it only spends capacity the foreground is not using.
+    """
+
+    def __init__(self, limits: Dict[str, float], default_per_minute: float = 60.0, max_wait: float = 5.0):
+        self._limits = limits
+        self._default = default_per_minute
+        self.max_wait = max_wait
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, source: str) -> _Bucket:
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            bucket = self._buckets[source] = _Bucket(self._limits.get(source, self._default))
+        return bucket
+
+    def try_acquire(self, source: str, reserve: float = 0.0) -> Optional[float]:
+        """Take a token if at least ``1 + reserve`` are available; else return seconds to wait."""
+        with self._lock:
+            bucket = self._bucket(source)
+            bucket.refill(time.monotonic())
+            if bucket.tokens >= 1.0 + reserve:
+                bucket.tokens -= 1.0
+                return None
+            return (1.0 + reserve - bucket.tokens) / bucket.rate
+
+    async def atry_acquire(self, source: str, reserve: float = 0.0) -> Optional[float]:
+        """``try_acquire`` for callers on the event loop."""
+        return self.try_acquire(source, reserve)
+
+    def capacity(self, source: str) -> float:
+        with self._lock:
+            return self._bucket(source).capacity
+
+    def available(self, source: str) -> float:
+        with self._lock:
+            bucket = self._bucket(source)
+            bucket.refill(time.monotonic())
+            return bucket.tokens
+
+    async def acquire(self, source: str, max_wait: Optional[float] = None) -> None:
+        budget = self.max_wait if max_wait is None else max_wait
+        while True:
+            wait = await self.atry_acquire(source)
+            if wait is None:
+                return
+            if wait > budget:
+                raise RateLimited(source, wait)
+            budget -= wait
+            await asyncio.sleep(wait)
+
+
+class SharedRateLimiter(RateLimiter):
+    """RateLimiter whose buckets live in a ``StateBackend``, so limits hold across workers."""
+
+    def __init__(self, backend: StateBackend, limits: Dict[str, float], default_per_minute: float = 60.0,
+                 max_wait: float = 5.0):
+        super().__init__(limits, default_per_minute, max_wait)
+        self._backend = backend
+
+    def try_acquire(self, source: str, reserve: float = 0.0) -> Optional[float]:
+        with self._lock:
+            bucket = self._bucket(source)
+        return self._backend.take_token(source, bucket.rate, bucket.capacity, reserve, time.time())
+
+    async def atry_acquire(self, source: str, reserve: float = 0.0) -> Optional[float]:
+        return await run_io(self.try_acquire, source, reserve)
+
+    def available(self, source: str) -> float:
+        with self._lock:
+            bucket = self._bucket(source)
+        return self._backend.tokens(source, bucket.rate, bucket.capacity, time.time())
@@ -6,6 +6,7 @@ class ErrorModel(BaseModel):
     code: str
     retryable: bool = False
     hint: Optional[str] = None
+    retry_after: Optional[float] = None  # seconds
 
 class MetricModel(BaseModel):
     views: Optional[int] = None
@@ -30,7 +31,69 @@ class UnifiedItem(BaseModel):
     lang: Optional[str] = None
     media: Optional[List[MediaItem]] = None
     metrics: Optional[MetricModel] = None
+    score: Optional[float] = None  # cross-platform viral score, 0-100
 
 class UnifiedResponse(BaseModel):
     items: List[UnifiedItem] = Field(default_factory=list)
     error: Optional[ErrorModel] = None
+    cached: bool = False
+    partial: bool = False  # the request deadline cut collection short
+    partial_reason: Optional[str] = None
+
+class RisingItem(BaseModel):
+    source: str
+    id: Optional[str] = None
+    url: Optional[str] = None
+    title: Optional[str] = None
+    metric: str
+    latest: Optional[float] = None
+    velocity: float
+    acceleration: Optional[float] = None
+    samples: int
+
+class RisingResponse(BaseModel):
+    items: List[RisingItem] = Field(default_factory=list)
+    error: Optional[ErrorModel] = None
+
+class TrendingTerm(BaseModel):
+    term: str
+    count: int
+    previous: int = 0  # count in the window immediately before
+    surge: float = 1.0
+
+class TrendingTermsResponse(BaseModel):
+    items: List[TrendingTerm] = Field(default_factory=list)
+    error: Optional[ErrorModel] = None
+
+class TopicCluster(BaseModel):
+    id: int
+    size: int
+    terms: List[str] = Field(default_factory=list)
+    recent_items: int = 0
+    previous_items: int = 0
+    growth: float = 1.0
+    engagement: float = 0.0  # sum of viral scores in the window
+    engagement_growth: float = 1.0
+    representatives: List[UnifiedItem] = Field(default_factory=list)
+
+class ClusterResponse(BaseModel):
+    items: List[TopicCluster] = Field(default_factory=list)
+    error: Optional[ErrorModel] = None
+
+class JobStatus(BaseModel):
+    id: str
+    tool: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    progress: int = 0  # items collected so far
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
+    error: Optional[ErrorModel] = None
+
+class JobResultsResponse(BaseModel):
+    job: JobStatus
+    items: List[UnifiedItem] = Field(default_factory=list)
+    offset: int = 0
+    next_offset: Optional[int] = None
+    total: int = 0
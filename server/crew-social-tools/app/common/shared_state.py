@@ -0,0 +1,220 @@
+"""State shared by all worker processes on a host: result cache, rate-limit buckets, leases
+and the state of asynchronous jobs.
+
+Selected with the ``shared_state`` setting:
+
+* unset: everything stays in-process (single worker).
+* ``sqlite:///path/to/state.db``: a WAL-mode SQLite file every worker opens.
+* ``package.module:factory``: any ``StateBackend`` implementation, e.g. one backed by a
+  network store when workers span several hosts.
+"""
+from typing import Dict, List, Optional, Tuple
+import importlib, os, sqlite3, threading, time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache(expires_at);
+CREATE TABLE IF NOT EXISTS buckets (
+    source TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    cancel INTEGER NOT NULL DEFAULT 0,
+    record TEXT NOT NULL
+);
+"""
+
+_PRUNE_EVERY = 200
+
+
+class StateBackend:
+    """Operations a shared-state store must make atomic across processes."""
+
+    def cache_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        """Return (stored_at, value) for an unexpired entry."""
+        raise NotImplementedError
+
+    def cache_put(self, key: str, value: str, now: float, ttl: float, max_entries: int) -> None:
+        raise NotImplementedError
+
+    def cache_size(self) -> int:
+        raise NotImplementedError
+
+    def take_token(self, source: str, rate: float, capacity: float, reserve: float, now: float) -> Optional[float]:
+        """Token-bucket acquire; None on success, else seconds until ``1 + reserve`` tokens exist."""
+        raise NotImplementedError
+
+    def tokens(self, source: str, rate: float, capacity: float, now: float) -> float:
+        raise NotImplementedError
+
+    def claim(self, key: str, owner: str, lease: float, now: float) -> bool:
+        """Become the single process scraping ``key`` unless another owner holds a live lease."""
+        raise NotImplementedError
+
+    def release(self, key: str, owner: str) -> None:
+        raise NotImplementedError
+
+    def job_put(self, records: Dict[str, Optional[str]], now: float, ttl: float) -> List[str]:
+        """Store jobs this worker runs (a None record: unchanged but still alive) until
+        ``now + ttl``; returns the ids another worker has asked to cancel."""
+        raise NotImplementedError
+
+    def job_get(self, job_id: str, now: float) -> Optional[Tuple[str, float]]:
+        """Return (record, updated_at) for an unexpired job."""
+        raise NotImplementedError
+
+    def job_cancel(self, job_id: str) -> None:
+        """Ask the worker running ``job_id`` to cancel it."""
+        raise NotImplementedError
+
+
+class SQLiteBackend(StateBackend):
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._puts = 0
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # A connection must not cross fork(); each worker opens its own.
+        if self._pid != os.getpid():
+            # Autocommit mode; multi-statement updates use explicit BEGIN IMMEDIATE so the
+            # read-modify-write of a bucket or lease is serialized across processes.
+            self._db = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._pid = os.getpid()
+        return self._db
+
+    def _write(self, fn):
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    def cache_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stored_at, value FROM cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def cache_put(self, key: str, value: str, now: float, ttl: float, max_entries: int) -> None:
+        self._puts += 1
+        prune = self._puts % _PRUNE_EVERY == 0
+
+        def put(conn):
+            conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", (key, now, now + ttl, value))
+            if prune:
+                conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (max_entries,),
+                )
+        self._write(put)
+
+    def cache_size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+
+    def _refill(self, conn, source: str, rate: float, capacity: float, now: float) -> float:
+        row = conn.execute("SELECT tokens, updated FROM buckets WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return capacity
+        return min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+
+    def take_token(self, source: str, rate: float, capacity: float, reserve: float, now: float) -> Optional[float]:
+        def take(conn):
+            tokens = self._refill(conn, source, rate, capacity, now)
+            wait = None
+            if tokens >= 1.0 + reserve:
+                tokens -= 1.0
+            else:
+                wait = (1.0 + reserve - tokens) / rate
+            conn.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (source, tokens, now))
+            return wait
+        return self._write(take)
+
+    def tokens(self, source: str, rate: float, capacity: float, now: float) -> float:
+        with self._lock:
+            return self._refill(self._conn, source, rate, capacity, now)
+
+    def claim(self, key: str, owner: str, lease: float, now: float) -> bool:
+        def claim(conn):
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] != owner and row[1] > now:
+                return False
+            conn.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)", (key, owner, now + lease))
+            return True
+        return self._write(claim)
+
+    def release(self, key: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def job_put(self, records: Dict[str, Optional[str]], now: float, ttl: float) -> List[str]:
+        def put(conn):
+            for job_id, record in records.items():
+                if record is None:
+                    conn.execute("UPDATE jobs SET updated_at = ?, expires_at = ? WHERE id = ?", (now, now + ttl, job_id))
+                else:
+                    conn.execute(
+                        "INSERT INTO jobs (id, updated_at, expires_at, record) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(id) DO UPDATE SET updated_at = excluded.updated_at, "
+                        "expires_at = excluded.expires_at, record = excluded.record",
+                        (job_id, now, now + ttl, record),
+                    )
+            conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,))
+            marks = ",".join("?" * len(records))
+            return [row[0] for row in conn.execute(
+                f"SELECT id FROM jobs WHERE cancel = 1 AND id IN ({marks})", tuple(records))]
+        return self._write(put) if records else []
+
+    def job_get(self, job_id: str, now: float) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record, updated_at FROM jobs WHERE id = ? AND expires_at > ?", (job_id, now)
+            ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def job_cancel(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET cancel = 1 WHERE id = ?", (job_id,))
+
+
+def worker_id() -> str:
+    return f"{os.uname().nodename}:{os.getpid()}"
+
+
+def load_backend(spec: Optional[str]) -> Optional[StateBackend]:
+    if not spec:
+        return None
+    if spec.startswith("sqlite:///"):
+        return SQLiteBackend(spec[len("sqlite:///"):])
+    module, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"shared_state must be sqlite:///path or module:factory, got {spec!r}")
+    return getattr(importlib.import_module(module), attr)()
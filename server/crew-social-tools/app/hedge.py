@@ -0,0 +1,153 @@
+"""Hedged web search: ask the primary backend, and the secondary too if it is slow."""
+from pydantic import BaseModel, Field
+from typing import Callable, Deque, Dict, List, Optional, Set
+from collections import deque
+import asyncio, time
+from .common.config import settings
+from .common.schemas import UnifiedItem
+from .tools import ddg, searxng
+from . import service
+from .service import RunResult
+
+
+class WebSearchArgs(BaseModel):
+    query: str
+    num: int = Field(default=10, ge=1, le=50)
+    merge: bool = False  # wait (within the deadline) for both backends and merge by URL
+
+
+BACKENDS: Dict[str, Callable[[WebSearchArgs], BaseModel]] = {
+    "ddg": lambda a: ddg.DDGArgs(query=a.query, max_results=a.num),
+    "searxng": lambda a: searxng.SearxArgs(query=a.query, num=a.num),
+}
+
+
+class LatencyWindow:
+    """Recent uncached latencies of one backend."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+def _useful(task: "asyncio.Task[RunResult]") -> bool:
+    return task.done() and not task.cancelled() and task.exception() is None and bool(task.result().items)
+
+
+def _merge(results: List[RunResult]) -> List[UnifiedItem]:
+    seen: Set[str] = set()
+    out = []
+    for result in results:
+        for item in result.items:
+            key = searxng.url_key(item.url) if item.url else f"{item.source}:{item.id or item.title}"
+            if key not in seen:
+                seen.add(key)
+                out.append(item)
+    return out
+
+
+class HedgedSearch:
+    """Races ``primary`` against ``secondary``, hedging after the primary's recent p95.
+
+    Until ``min_samples`` uncached latencies exist the hedge fires after
+    ``default_delay``. A primary that fails or comes back empty triggers the secondary at
+    once. The first useful answer wins and the other call is cancelled, which stops its
+    upstream scrape unless another request is sharing it.
+    """
+
+    def __init__(self, primary: str = "ddg", secondary: str = "searxng", default_delay: float = 1.0,
+                 min_delay: float = 0.05, max_delay: float = 5.0, min_samples: int = 20):
+        self.primary = primary
+        self.secondary = secondary
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.latency = {name: LatencyWindow() for name in BACKENDS}
+        self.requests = 0
+        self.hedged = 0
+        self.wins = {name: 0 for name in BACKENDS}
+
+    def delay(self) -> float:
+        window = self.latency[self.primary]
+        if len(window) < self.min_samples:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, window.quantile(0.95)))
+
+    async def _call(self, name: str, args: WebSearchArgs, timeout: Optional[float]) -> RunResult:
+        started = time.monotonic()
+        result = await service.run(name, BACKENDS[name](args), timeout=timeout)
+        if not result.cached and result.partial is None:
+            self.latency[name].record(time.monotonic() - started)
+        return result
+
+    async def search(self, args: WebSearchArgs, timeout: Optional[float] = None) -> RunResult:
+        started = time.monotonic()
+
+        def left() -> Optional[float]:
+            return None if timeout is None else max(0.0, timeout - (time.monotonic() - started))
+
+        self.requests += 1
+        tasks: Dict["asyncio.Task[RunResult]", str] = {
+            asyncio.ensure_future(self._call(self.primary, args, left())): self.primary,
+        }
+        try:
+            delay = self.delay()
+            if left() is not None:
+                delay = min(delay, left())
+            await asyncio.wait(list(tasks), timeout=0 if args.merge else delay)
+            if args.merge or not any(_useful(t) for t in tasks):
+                self.hedged += 1
+                tasks[asyncio.ensure_future(self._call(self.secondary, args, left()))] = self.secondary
+            while not all(t.done() for t in tasks):
+                if not args.merge and any(_useful(t) for t in tasks):
+                    break
+                done, _ = await asyncio.wait([t for t in tasks if not t.done()], timeout=left(),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break  # deadline
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        answered = [t for t in tasks if _useful(t)]
+        for t in answered:
+            self.wins[tasks[t]] += 1
+        if args.merge and answered:
+            results = [t.result() for t in sorted(answered, key=lambda t: tasks[t] != self.primary)]
+            missing = [name for t, name in tasks.items() if t.cancelled()]
+            reason = next((r.partial for r in results if r.partial), None)
+            if missing:
+                reason = f"deadline exceeded before {', '.join(missing)} answered"
+            return RunResult(_merge(results), all(r.cached for r in results), reason)
+        if answered:
+            return answered[0].result()
+        failed = [t for t in tasks if not t.cancelled() and t.exception() is not None]
+        if failed and len(failed) == len(tasks):
+            raise failed[0].exception()
+        empty = [t.result() for t in tasks if t.done() and not t.cancelled() and t.exception() is None]
+        return empty[0] if empty else RunResult([], False, "deadline exceeded")
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests, "hedged": self.hedged, "wins": dict(self.wins),
+            "delay": round(self.delay(), 3),
+            "p95": {name: w.quantile(0.95) for name, w in self.latency.items()},
+        }
+
+
+web_search = HedgedSearch(primary=settings.hedge_primary, secondary=settings.hedge_secondary,
+                          default_delay=settings.hedge_default_delay)
@@ -0,0 +1,260 @@
+"""Asynchronous scrape jobs for calls that outlast a client's request timeout."""
+from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio, math, time, uuid
+from loguru import logger
+from .common.schemas import UnifiedItem, ErrorModel, JobStatus
+from .common.config import settings
+from .common.executor import run_io
+from .common.progress import watching
+from .common.shared_state import StateBackend
+from . import service
+
+TERMINAL = ("succeeded", "failed", "cancelled")
+
+
+class JobArgs(BaseModel):
+    tool: str
+    args: Dict[str, Any] = Field(default_factory=dict)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class _JobRecord(BaseModel):
+    """A job as other worker processes see it through the shared state."""
+    job: JobStatus
+    args: Dict[str, Any]
+    items: List[UnifiedItem] = Field(default_factory=list)
+
+
+class Job:
+    def __init__(self, tool: str, args: BaseModel):
+        self.id = uuid.uuid4().hex
+        self.tool = tool
+        self.args = args
+        self.source = service.TOOLS[tool].source
+        self.status = "queued"
+        self.items: List[UnifiedItem] = []
+        self.error: Optional[ErrorModel] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.expires_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def _on_item(self, item: UnifiedItem) -> None:
+        # May run on an executor thread; list.append is atomic.
+        self.items.append(item)
+
+    def status_model(self) -> JobStatus:
+        return JobStatus(
+            id=self.id, tool=self.tool, status=self.status, progress=len(self.items),
+            created_at=self.created_at, started_at=self.started_at, finished_at=self.finished_at,
+            expires_at=self.expires_at, error=self.error,
+        )
+
+    def record(self) -> str:
+        return _JobRecord(job=self.status_model(), args=self.args.model_dump(), items=list(self.items)).model_dump_json()
+
+    @classmethod
+    def restore(cls, record: str) -> "Job":
+        """Read-only copy of a job another worker process runs."""
+        data = _JobRecord.model_validate_json(record)
+        status = data.job
+        job = cls(status.tool, service.TOOLS[status.tool].args(**data.args))
+        job.id, job.status, job.error, job.items = status.id, status.status, status.error, data.items
+        job.created_at, job.started_at = status.created_at, status.started_at
+        job.finished_at, job.expires_at = status.finished_at, status.expires_at
+        return job
+
+
+class JobManager:
+    """Bounded worker pool with one FIFO queue per source.
+
+    Each source gets ``workers_per_source`` consumers so a slow Instagram backlog never
+    delays Reddit jobs, while ``max_concurrency`` caps scrapes running at once. Finished
+    jobs keep their results until ``ttl`` seconds after completion.
+
+    A job runs in the worker process that accepted it. With a shared-state ``backend`` that
+    worker publishes its jobs every ``publish_interval`` seconds, so any worker can answer
+    status, results and events; a cancel received by another worker takes effect at the
+    owner's next publish, and a job whose owner stops publishing is reported as failed.
+    """
+
+    def __init__(self, ttl: float = 3600.0, workers_per_source: int = 1, max_concurrency: int = 4,
+                 queue_size: int = 100, backend: Optional[StateBackend] = None,
+                 publish_interval: float = 1.0):
+        self.ttl = ttl
+        self.workers_per_source = workers_per_source
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.publish_interval = publish_interval
+        self._backend = backend
+        self._jobs: Dict[str, Job] = {}
+        self._published: Dict[str, Tuple[str, int]] = {}  # job id -> (status, progress) last published
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: List[asyncio.Task] = []
+        self._sem: Optional[asyncio.Semaphore] = None
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        for source in sorted({spec.source for spec in service.TOOLS.values()}):
+            queue = self._queues[source] = asyncio.Queue(maxsize=self.queue_size)
+            for _ in range(self.workers_per_source):
+                self._workers.append(loop.create_task(self._worker(queue)))
+        if self._backend is not None:
+            self._workers.append(loop.create_task(self._publish_loop()))
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    def _sweep(self) -> None:
+        now = time.time()
+        for job_id in [j.id for j in self._jobs.values() if j.expires_at is not None and j.expires_at <= now]:
+            del self._jobs[job_id]
+            self._published.pop(job_id, None)
+
+    async def _publish(self, jobs: List[Job]) -> List[str]:
+        """Write changed jobs (and a heartbeat for the rest); returns ids to cancel."""
+        states = {job.id: (job.status, len(job.items)) for job in jobs}
+        records = {job.id: None if self._published.get(job.id) == states[job.id] else job.record() for job in jobs}
+        cancel = await run_io(self._backend.job_put, records, time.time(), self.ttl)
+        self._published.update(states)
+        return cancel
+
+    async def _publish_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            jobs = [j for j in self._jobs.values()
+                    if j.status not in TERMINAL or self._published.get(j.id) != (j.status, len(j.items))]
+            try:
+                for job_id in await self._publish(jobs):
+                    if job_id in self._jobs:
+                        self._cancel(self._jobs[job_id])
+            except Exception:
+                logger.exception("publishing job state failed")
+
+    async def submit(self, tool: str, args: BaseModel) -> Job:
+        self._sweep()
+        job = Job(tool, args)
+        try:
+            self._queues[job.source].put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull(f"{job.source} job queue is full")
+        self._jobs[job.id] = job
+        if self._backend is not None:
+            # The client's next request may land on any worker.
+            try:
+                await self._publish([job])
+            except Exception:
+                logger.exception(f"publishing job {job.id} failed")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        self._sweep()
+        job = self._jobs.get(job_id)
+        if job is not None or self._backend is None:
+            return job
+        found = await run_io(self._backend.job_get, job_id, time.time())
+        if found is None:
+            return None
+        record, updated_at = found
+        job = Job.restore(record)
+        if job.status not in TERMINAL and time.time() - updated_at > 10 * self.publish_interval:
+            job.status = "failed"
+            job.error = ErrorModel(error="the worker running this job exited", code="JOB_LOST", retryable=True)
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        job = await self.get(job_id)
+        if job is None or job.status in TERMINAL:
+            return job
+        if job.id in self._jobs:
+            self._cancel(job)
+        else:
+            await run_io(self._backend.job_cancel, job_id)
+        return job
+
+    def _cancel(self, job: Job) -> None:
+        if job.status in TERMINAL:
+            return
+        if job.task is not None:
+            job.task.cancel()
+        else:
+            self._finish(job, "cancelled")
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        job.expires_at = job.finished_at + self.ttl
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                if job.status != "queued":
+                    continue
+                async with self._sem:
+                    job.task = asyncio.ensure_future(self._execute(job))
+                    try:
+                        await job.task
+                    except asyncio.CancelledError:
+                        if not job.task.cancelled():
+                            raise
+                        self._finish(job, "cancelled")
+            finally:
+                queue.task_done()
+
+    async def _execute(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        spec = service.TOOLS[job.tool]
+        try:
+            cached = await service.result_cache.aget(service.cache_key(job.tool, job.args))
+            if cached is not None:
+                job.items = list(cached)
+            else:
+                with watching(job._on_item):
+                    # Jobs are not latency-bound, so they wait for rate-limit capacity.
+                    job.items = await service.collect(job.tool, job.args, max_wait=math.inf)
+            self._finish(job, "succeeded")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"job {job.id} ({spec.label}) failed")
+            job.error = ErrorModel(error=str(e), code=spec.error_code, retryable=True)
+            self._finish(job, "failed")
+
+    async def events(self, job: Job, interval: float = 0.5) -> AsyncIterator[str]:
+        """Server-sent events with the job status whenever progress or state changes."""
+        last = None
+        while True:
+            if job.id not in self._jobs:
+                # Owned by another worker: follow its published state.
+                job = await self.get(job.id) or job
+            status = job.status_model()
+            snapshot = (status.status, status.progress)
+            if snapshot != last:
+                last = snapshot
+                yield f"event: progress\ndata: {status.model_dump_json()}\n\n"
+            if status.status in TERMINAL:
+                return
+            await asyncio.sleep(interval)
+
+
+job_manager = JobManager(
+    ttl=settings.job_ttl_seconds,
+    workers_per_source=settings.job_workers_per_source,
+    max_concurrency=settings.job_max_concurrency,
+    queue_size=settings.job_queue_size,
+    backend=service.shared_state,
+)
@@ -1,74 +1,218 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from typing import Awaitable, Optional, TypeVar, Union
+import asyncio
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from loguru import logger
-from .common.schemas import UnifiedResponse, ErrorModel
+from pydantic import BaseModel, ValidationError
+from .common.schemas import (
+    UnifiedResponse, ErrorModel, RisingResponse, TrendingTermsResponse, ClusterResponse, JobStatus, JobResultsResponse,
+)
+from .common.config import settings
+from .common.ratelimit import RateLimited
+from .common.deadline import DEADLINE_HEADER
+from .common.memory import usage
+from .common.http_cache import ConditionalCompressionMiddleware, etag_for
 from .tools import ddg, searxng, twitter_snscrape, instagram_instaloader, tiktok_playwright, youtube_ytdlp, reddit_praw
+from .analytics import velocity
+from .analytics.scoring import RankMode, rank_items
+from .analytics.snapshots import snapshot_store
+from .analytics.heavy_hitters import heavy_hitters, TrendingTermsArgs
+from .analytics.search_index import search_index, LocalSearchArgs
+from .analytics.clustering import topic_clusterer, ClusterArgs
+from . import service
+from .prewarm import prewarmer, load_seeds
+from .jobs import job_manager, JobArgs, QueueFull
+from .hedge import web_search, WebSearchArgs
 
-app = FastAPI(title="crew-social-tools", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_manager.start()
+    if settings.prewarm_enabled:
+        load_seeds(settings.prewarm_seeds)
+        prewarmer.start()
+    yield
+    await prewarmer.stop()
+    await job_manager.stop()
+    await searxng.aclose()
+
+app = FastAPI(title="crew-social-tools", version="1.0.0", lifespan=lifespan)
+app.add_middleware(ConditionalCompressionMiddleware)
+
+def request_timeout(
+    timeout: Optional[float] = Query(None, gt=0, description="Seconds before returning partial results"),
+    header: Optional[float] = Header(None, alias=DEADLINE_HEADER, gt=0),
+) -> Optional[float]:
+    """Per-request deadline from the ``timeout`` argument or the caller's propagated header."""
+    if timeout is None or header is None:
+        return timeout if header is None else header
+    return min(timeout, header)
+
+T = TypeVar("T")
+
+class ClientDisconnected(Exception):
+    pass
+
+async def _unless_disconnected(request: Request, aw: Awaitable[T]) -> T:
+    """Await ``aw`` but cancel it as soon as the client hangs up."""
+    task = asyncio.ensure_future(aw)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=settings.disconnect_poll_seconds)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            service.waste.disconnected()
+            raise ClientDisconnected()
+
+async def _respond(request: Request, aw: Awaitable[service.RunResult], rank: RankMode, label: str,
+                   source: str, error_code: str) -> Union[UnifiedResponse, Response]:
+    try:
+        result = await _unless_disconnected(request, aw)
+        resp = UnifiedResponse(items=rank_items(result.items, rank), cached=result.cached,
+                               partial=result.partial is not None, partial_reason=result.partial)
+        # ETag over the items alone: a cache hit and the scrape that filled it match.
+        etag = etag_for(resp.model_dump_json(include={"items", "partial"}).encode())
+        return Response(resp.model_dump_json(), media_type="application/json", headers={"ETag": etag})
+    except ClientDisconnected:
+        logger.info(f"{label} cancelled: client disconnected")
+        return UnifiedResponse(error=ErrorModel(error="client disconnected", code="CLIENT_DISCONNECTED"))
+    except RateLimited as e:
+        return UnifiedResponse(error=service.error_model(e, source, error_code))
+    except Exception as e:
+        logger.exception(f"{label} failed")
+        return UnifiedResponse(error=service.error_model(e, source, error_code))
+
+async def _run_tool(request: Request, name: str, payload: BaseModel, rank: RankMode,
+                    timeout: Optional[float] = None) -> Union[UnifiedResponse, Response]:
+    spec = service.TOOLS[name]
+    return await _respond(request, service.run(name, payload, timeout=timeout), rank, spec.label, spec.source,
+                          spec.error_code)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/v1/stats")
+def stats():
+    return {"cache": service.result_cache.stats(), "prewarm": prewarmer.stats(), "wasted": service.waste.stats(),
+            "hedge": web_search.stats(), "memory_kb": usage()}
+
+@app.post("/v1/search/web", response_model=UnifiedResponse)
+async def search_web(request: Request, payload: WebSearchArgs, rank: RankMode = "source",
+                     timeout: Optional[float] = Depends(request_timeout)):
+    """DDG and SearxNG hedged: whichever answers first, or both merged with ``merge``."""
+    return await _respond(request, web_search.search(payload, timeout=timeout), rank, "web search", "web",
+                          "WEB_SEARCH_ERROR")
+
 @app.post("/v1/search/ddg", response_model=UnifiedResponse)
-async def search_ddg(payload: ddg.DDGArgs):
-    try:
-        items = await ddg.search(payload)
-        return UnifiedResponse(items=items)
-    except Exception as e:
-        logger.exception("ddg search failed")
-        return UnifiedResponse(error=ErrorModel(error=str(e), code="DDG_ERROR", retryable=True))
+async def search_ddg(request: Request, payload: ddg.DDGArgs, rank: RankMode = "source",
+                     timeout: Optional[float] = Depends(request_timeout)):
+    return await _run_tool(request, "ddg", payload, rank, timeout)
 
 @app.post("/v1/search/searxng", response_model=UnifiedResponse)
-async def search_searxng(payload: searxng.SearxArgs):
-    try:
-        items = await searxng.search(payload)
-        return UnifiedResponse(items=items)
-    except Exception as e:
-        logger.exception("searxng search failed")
-        return UnifiedResponse(error=ErrorModel(error=str(e), code="SEARXNG_ERROR", retryable=True))
+async def search_searxng(request: Request, payload: searxng.SearxArgs, rank: RankMode = "source",
+                         timeout: Optional[float] = Depends(request_timeout)):
+    return await _run_tool(request, "searxng", payload, rank, timeout)
 
 @app.post("/v1/twitter/search", response_model=UnifiedResponse)
-async def twitter_search(payload: twitter_snscrape.TwitterArgs):
-    try:
-        items = await twitter_snscrape.search(payload)
-        return UnifiedResponse(items=items)
-    except Exception as e:
-        logger.exception("twitter snscrape failed")
-        return UnifiedResponse(error=ErrorModel(error=str(e), code="TWITTER_ERROR", retryable=True))
+async def twitter_search(request: Request, payload: twitter_snscrape.TwitterArgs, rank: RankMode = "source",
+                         timeout: Optional[float] = Depends(request_timeout)):
+    return await _run_tool(request, "twitter", payload, rank, timeout)
 
 @app.post("/v1/instagram/fetch", response_model=UnifiedResponse)
-async def instagram_fetch(payload: instagram_instaloader.InstagramArgs):
+async def instagram_fetch(request: Request, payload: instagram_instaloader.InstagramArgs, rank: RankMode = "source",
+                          timeout: Optional[float] = Depends(request_timeout)):
+    return await _run_tool(request, "instagram", payload, rank, timeout)
+
+@app.post("/v1/tiktok/search", response_model=UnifiedResponse)
+async def tiktok_search(request: Request, payload: tiktok_playwright.TikTokArgs, rank: RankMode = "source",
+                        timeout: Optional[float] = Depends(request_timeout)):
+    return await _run_tool(request, "tiktok", payload, rank, timeout)
+
+@app.post("/v1/youtube/lookup", response_model=UnifiedResponse)
+async def youtube_lookup(request: Request, payload: youtube_ytdlp.YouTubeArgs, rank: RankMode = "source",
+                         timeout: Optional[float] = Depends(request_timeout)):
+    return await _run_tool(request, "youtube", payload, rank, timeout)
+
+@app.post("/v1/reddit/scan", response_model=UnifiedResponse)
+async def reddit_scan(request: Request, payload: reddit_praw.RedditArgs, rank: RankMode = "source",
+                      timeout: Optional[float] = Depends(request_timeout)):
+    return await _run_tool(request, "reddit", payload, rank, timeout)
+
+@app.post("/v1/trending/rising", response_model=RisingResponse)
+async def trending_rising(payload: velocity.RisingArgs):
     try:
-        items = await instagram_instaloader.fetch(payload)
-        return UnifiedResponse(items=items)
+        return RisingResponse(items=velocity.rising(snapshot_store, payload))
     except Exception as e:
-        logger.exception("instagram fetch failed")
-        return UnifiedResponse(error=ErrorModel(error=str(e), code="INSTAGRAM_ERROR", retryable=True))
+        logger.exception("rising computation failed")
+        return RisingResponse(error=ErrorModel(error=str(e), code="RISING_ERROR"))
 
-@app.post("/v1/tiktok/search", response_model=UnifiedResponse)
-async def tiktok_search(payload: tiktok_playwright.TikTokArgs):
+@app.post("/v1/trending/hashtags", response_model=TrendingTermsResponse)
+async def trending_hashtags(payload: TrendingTermsArgs):
     try:
-        items = await tiktok_playwright.search(payload)
-        return UnifiedResponse(items=items)
+        return TrendingTermsResponse(items=heavy_hitters.top(**payload.model_dump()))
     except Exception as e:
-        logger.exception("tiktok search failed")
-        return UnifiedResponse(error=ErrorModel(error=str(e), code="TIKTOK_ERROR", retryable=True))
+        logger.exception("trending terms lookup failed")
+        return TrendingTermsResponse(error=ErrorModel(error=str(e), code="TRENDING_ERROR"))
 
-@app.post("/v1/youtube/lookup", response_model=UnifiedResponse)
-async def youtube_lookup(payload: youtube_ytdlp.YouTubeArgs):
+@app.post("/v1/local/search", response_model=UnifiedResponse)
+async def local_search(payload: LocalSearchArgs):
     try:
-        items = await youtube_ytdlp.lookup(payload)
-        return UnifiedResponse(items=items)
+        return UnifiedResponse(items=search_index.search(payload))
     except Exception as e:
-        logger.exception("youtube lookup failed")
-        return UnifiedResponse(error=ErrorModel(error=str(e), code="YOUTUBE_ERROR", retryable=True))
+        logger.exception("local search failed")
+        return UnifiedResponse(error=ErrorModel(error=str(e), code="LOCAL_SEARCH_ERROR"))
 
-@app.post("/v1/reddit/scan", response_model=UnifiedResponse)
-async def reddit_scan(payload: reddit_praw.RedditArgs):
+@app.post("/v1/trending/clusters", response_model=ClusterResponse)
+async def trending_clusters(payload: ClusterArgs):
     try:
-        items = await reddit_praw.scan(payload)
-        return UnifiedResponse(items=items)
+        return ClusterResponse(items=topic_clusterer.top(**payload.model_dump()))
     except Exception as e:
-        logger.exception("reddit scan failed")
-        return UnifiedResponse(error=ErrorModel(error=str(e), code="REDDIT_ERROR", retryable=True))
+        logger.exception("topic cluster lookup failed")
+        return ClusterResponse(error=ErrorModel(error=str(e), code="CLUSTER_ERROR"))
+
+async def _get_job(job_id: str):
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found or expired")
+    return job
+
+@app.post("/v1/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(payload: JobArgs):
+    spec = service.TOOLS.get(payload.tool)
+    if spec is None:
+        raise HTTPException(status_code=400, detail=f"unknown tool: {payload.tool}")
+    try:
+        args = spec.args(**payload.args)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    try:
+        return (await job_manager.submit(payload.tool, args)).status_model()
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+
+@app.get("/v1/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str):
+    return (await _get_job(job_id)).status_model()
+
+@app.get("/v1/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    job = await _get_job(job_id)
+    return StreamingResponse(job_manager.events(job), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+@app.get("/v1/jobs/{job_id}/results", response_model=JobResultsResponse)
+async def job_results(job_id: str, offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500)):
+    job = await _get_job(job_id)
+    items = list(job.items)
+    page = items[offset:offset + limit]
+    next_offset = offset + len(page) if offset + len(page) < len(items) or job.status in ("queued", "running") else None
+    return JobResultsResponse(job=job.status_model(), items=page, offset=offset,
+                              next_offset=next_offset, total=len(items))
+
+@app.delete("/v1/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    await _get_job(job_id)
+    return (await job_manager.cancel(job_id)).status_model()
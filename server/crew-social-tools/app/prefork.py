@@ -0,0 +1,150 @@
+"""Pre-fork launcher: import the heavy modules once, then fork workers that share them.
+
+    python -m app.prefork --host 0.0.0.0 --port 8000 --workers 4 [--uds /run/cst.sock]
+
+The master imports the app (FastAPI, numpy, Playwright, instaloader, praw, yt-dlp, DDGS)
+and anything listed with ``--preload``, freezes the GC so collections in the children do
+not dirty the inherited pages, binds the listening socket and forks. Workers serve the
+inherited app object with uvicorn; the master restarts any that die and logs a per-worker
+memory report (also on SIGUSR1) so containers can be sized from the unique RSS.
+"""
+from typing import Dict, Iterable, List
+import argparse, gc, importlib, os, signal, socket, sys, time
+from loguru import logger
+from .common.config import settings
+from .common.memory import usage
+
+# Beyond app.main's own imports: yt-dlp loads its ~1800 extractor classes lazily on first use.
+PRELOAD = ("app.main", "yt_dlp.extractor.extractors")
+
+
+def preload(modules: Iterable[str]) -> None:
+    started = time.monotonic()
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            logger.warning(f"preload of {name} failed")
+    logger.info(f"preloaded in {time.monotonic() - started:.2f}s")
+
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _bind_unix(path: str, backlog: int = 2048) -> socket.socket:
+    if os.path.exists(path):
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    os.chmod(path, 0o660)
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve(socks: List[socket.socket], log_level: str) -> None:
+    import uvicorn
+    from .main import app
+    uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=socks)
+
+
+def _fork(socks: List[socket.socket], log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGUSR1):
+            signal.signal(signum, signal.SIG_DFL)
+        code = 0
+        try:
+            _serve(socks, log_level)
+        except BaseException:
+            logger.exception("worker crashed")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def report(workers: List[int]) -> Dict[str, Dict[str, int]]:
+    """Log rss/pss/uss (kB) for the master and each worker, and the estimated total."""
+    rows = {"master": usage(os.getpid())}
+    rows.update({f"worker {pid}": usage(pid) for pid in workers})
+    for label, mem in rows.items():
+        logger.info(f"{label:>14}: rss={mem.get('rss', 0)}kB pss={mem.get('pss', 0)}kB uss={mem.get('uss', 0)}kB")
+    total = rows["master"].get("rss", 0) + sum(mem.get("uss", 0) for label, mem in rows.items() if label != "master")
+    logger.info(f"estimated footprint (master rss + worker uss): {total / 1024:.1f}MB")
+    return rows
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.prefork", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--uds", help="also listen on this Unix domain socket (for co-located clients)")
+    parser.add_argument("--no-tcp", action="store_true", help="listen only on --uds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--preload", action="append", default=[], help="extra module to import before forking")
+    parser.add_argument("--report-interval", type=float, default=300.0, help="seconds between memory reports; 0 disables")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    if args.workers > 1 and not settings.shared_state:
+        logger.warning("several workers without SHARED_STATE: cache, rate limits and jobs are per worker, "
+                       "so job status requests may not find their job")
+    preload(PRELOAD + tuple(args.preload))
+    socks = [] if args.no_tcp and args.uds else [_bind(args.host, args.port)]
+    if args.uds:
+        socks.append(_bind_unix(args.uds))
+    # Objects surviving to here are long-lived; keep the collector from touching (and
+    # so copying) their pages in every worker.
+    gc.collect()
+    gc.freeze()
+
+    workers = [_fork(socks, args.log_level) for _ in range(args.workers)]
+    where = ", ".join(str(s.getsockname()) for s in socks)
+    logger.info(f"master {os.getpid()} serving on {where} with workers {workers}")
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, lambda signum, frame: report(workers))
+
+    # First report once workers have settled; afterwards every report_interval.
+    next_report = time.monotonic() + min(10.0, args.report_interval) if args.report_interval else None
+    while workers:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid == 0:
+            if next_report is not None and time.monotonic() >= next_report:
+                report(workers)
+                next_report = time.monotonic() + args.report_interval
+            time.sleep(0.5)
+            continue
+        if pid in workers:
+            workers.remove(pid)
+            if not stopping:
+                logger.warning(f"worker {pid} exited with status {status}; restarting")
+                time.sleep(1.0)
+                workers.append(_fork(socks, args.log_level))
+    for sock in socks:
+        sock.close()
+    if args.uds and os.path.exists(args.uds):
+        os.unlink(args.uds)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Background collectors that keep popular tool calls warm in the result cache."""
+from typing import List, Optional, Tuple
+import asyncio, json, time
+from loguru import logger
+from pydantic import BaseModel
+from .common.config import settings
+from . import service
+
+
+class Prewarmer:
+    """Periodically refreshes the top-N queries per source before their cache entries expire.
+
+    Candidates come from ``service.popularity`` (decayed request counts plus pinned seeds).
+    A query is refreshed when its cache entry is missing or older than ``refresh_fraction``
+    of the TTL, and only while the source's rate limiter keeps ``reserve`` of its burst
+    capacity spare, so background work never starves foreground requests. The reserve is
+    capped at all but one token, so a source whose bucket holds fewer than two tokens is
+    still warmed once its bucket is full.
+
+    Popularity is counted per process, so every worker process warms the queries it has
+    served itself. With shared state a query is not scraped twice: a fresh entry written
+    by another worker is no longer due, and refreshes go through ``service.refresh``,
+    which coalesces with foreground scrapes and takes the cross-worker scrape lease.
+    """
+
+    def __init__(self, interval: float = 60.0, top_n: int = 5, refresh_fraction: float = 0.8,
+                 reserve: float = 0.5):
+        self.interval = interval
+        self.top_n = top_n
+        self.refresh_after = settings.cache_ttl_seconds * refresh_fraction
+        self.reserve = reserve
+        self._task: Optional[asyncio.Task] = None
+        self.refreshed = 0
+        self.skipped = 0
+        self.failed = 0
+
+    async def due(self, source: str) -> List[Tuple[str, BaseModel]]:
+        out = []
+        for name, args in service.popularity.top(source, self.top_n):
+            age = await service.result_cache.aage(service.cache_key(name, args))
+            if age is None or age >= self.refresh_after:
+                out.append((name, args))
+        return out
+
+    async def _refresh_source(self, source: str) -> None:
+        capacity = service.rate_limiter.capacity(source)
+        # Never ask for more than a full bucket holds, or slow sources are never warmed.
+        reserve = min(self.reserve * capacity, capacity - 1.0)
+        for name, args in await self.due(source):
+            # Joining a scrape already under way costs no token
+            if (not service.in_flight(name, args)
+                    and await service.rate_limiter.atry_acquire(source, reserve=reserve) is not None):
+                self.skipped += 1
+                break
+            try:
+                await service.refresh(name, args)
+                self.refreshed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception(f"prewarm of {name} failed")
+
+    async def tick(self) -> None:
+        sources = {spec.source for spec in service.TOOLS.values()}
+        await asyncio.gather(*(self._refresh_source(s) for s in sources))
+
+    async def _loop(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("prewarm tick failed")
+            await asyncio.sleep(max(1.0, self.interval - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"refreshed": self.refreshed, "skipped": self.skipped, "failed": self.failed,
+                "running": self._task is not None and not self._task.done()}
+
+
+def load_seeds(raw: Optional[str]) -> int:
+    """Pin seed queries from a JSON list of {"tool": ..., "args": {...}}; returns count."""
+    if not raw:
+        return 0
+    count = 0
+    for entry in json.loads(raw):
+        spec = service.TOOLS.get(entry.get("tool"))
+        if spec is None:
+            logger.warning(f"unknown prewarm tool: {entry.get('tool')}")
+            continue
+        service.popularity.pin(entry["tool"], spec.args(**entry.get("args", {})))
+        count += 1
+    return count
+
+
+prewarmer = Prewarmer(interval=settings.prewarm_interval_seconds, top_n=settings.prewarm_top_n)
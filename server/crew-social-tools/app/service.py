@@ -0,0 +1,376 @@
+"""Tool execution layer shared by the HTTP endpoints and background collectors.
+
+Every upstream scrape goes through ``collect``: it is rate limited per source, the results
+are scored and fed to the analytics stores, and the item list is cached. ``run`` serves
+from that cache, coalesces identical in-flight requests and records query popularity.
+
+With the ``shared_state`` setting the cache and rate limits live outside the process, and
+identical calls are coalesced across worker processes as well as within one.
+
+Callers may give ``run`` a timeout. They still share the in-flight scrape, which runs
+until the latest of its callers' deadlines (to completion if any caller has none); a caller
+whose deadline passes first gets whatever has been collected so far as a partial result.
+Partial results are never cached.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+import asyncio, contextvars, json, math, threading, time
+from loguru import logger
+from pydantic import BaseModel
+from .common.schemas import ErrorModel, UnifiedItem
+from .common.config import settings
+from .common.cache import TTLCache, SharedTTLCache
+from .common.ratelimit import RateLimited, RateLimiter, SharedRateLimiter
+from .common.shared_state import load_backend, worker_id
+from .common import progress
+from .common.progress import ItemCallback, watching
+from .common import deadline
+from .common.executor import run_blocking, run_io
+from .tools import ddg, searxng, twitter_snscrape, instagram_instaloader, tiktok_playwright, youtube_ytdlp, reddit_praw
+from .analytics.scoring import score_items
+from .analytics.snapshots import snapshot_store
+from .analytics.heavy_hitters import heavy_hitters
+from .analytics.search_index import search_index
+from .analytics.clustering import topic_clusterer
+
+
+class RunResult(NamedTuple):
+    items: List[UnifiedItem]
+    cached: bool
+    partial: Optional[str] = None  # reason collection stopped early
+
+
+class ToolSpec(NamedTuple):
+    source: str
+    args: Type[BaseModel]
+    fn: Callable[[Any], Awaitable[List[UnifiedItem]]]
+    error_code: str
+    label: str
+
+
+TOOLS: Dict[str, ToolSpec] = {
+    "ddg": ToolSpec("ddg", ddg.DDGArgs, ddg.search, "DDG_ERROR", "ddg search"),
+    "searxng": ToolSpec("searxng", searxng.SearxArgs, searxng.search, "SEARXNG_ERROR", "searxng search"),
+    "twitter": ToolSpec("twitter", twitter_snscrape.TwitterArgs, twitter_snscrape.search, "TWITTER_ERROR", "twitter snscrape"),
+    "instagram": ToolSpec("instagram", instagram_instaloader.InstagramArgs, instagram_instaloader.fetch, "INSTAGRAM_ERROR", "instagram fetch"),
+    "tiktok": ToolSpec("tiktok", tiktok_playwright.TikTokArgs, tiktok_playwright.search, "TIKTOK_ERROR", "tiktok search"),
+    "youtube": ToolSpec("youtube", youtube_ytdlp.YouTubeArgs, youtube_ytdlp.lookup, "YOUTUBE_ERROR", "youtube lookup"),
+    "reddit": ToolSpec("reddit", reddit_praw.RedditArgs, reddit_praw.scan, "REDDIT_ERROR", "reddit scan"),
+}
+
+
+def error_model(e: Exception, source: str, error_code: str) -> ErrorModel:
+    """How a failed call is reported to clients, over HTTP or MCP alike."""
+    if isinstance(e, RateLimited):
+        return ErrorModel(
+            error=str(e), code="RATE_LIMITED", retryable=True, retry_after=round(e.retry_after, 1),
+            hint=f"{source} upstream budget exhausted; retry later",
+        )
+    return ErrorModel(error=str(e), code=error_code, retryable=True)
+
+
+def cache_key(name: str, args: BaseModel) -> str:
+    return name + ":" + json.dumps(args.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+
+
+class QueryPopularity:
+    """Exponentially decayed request counts per distinct tool call."""
+
+    def __init__(self, half_life: float = 3600.0, max_queries: int = 2000):
+        self._decay = math.log(2) / half_life
+        self._max = max_queries
+        self._queries: Dict[str, Tuple[float, float, str, BaseModel]] = {}
+        self._pinned: Dict[str, Tuple[str, BaseModel]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, args: BaseModel, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        key = cache_key(name, args)
+        with self._lock:
+            score, updated, _, _ = self._queries.get(key, (0.0, now, name, args))
+            self._queries[key] = (score * math.exp(-self._decay * (now - updated)) + 1.0, now, name, args)
+            if len(self._queries) > self._max:
+                ranked = sorted(self._queries.items(), key=lambda kv: self._score(kv[1], now))
+                for k, _ in ranked[: len(ranked) - self._max // 2]:
+                    del self._queries[k]
+
+    def pin(self, name: str, args: BaseModel) -> None:
+        """Always keep a query warm regardless of request traffic."""
+        with self._lock:
+            self._pinned[cache_key(name, args)] = (name, args)
+
+    def _score(self, entry, now: float) -> float:
+        score, updated, _, _ = entry
+        return score * math.exp(-self._decay * (now - updated))
+
+    def top(self, source: str, n: int, min_score: float = 1.0, now: Optional[float] = None) -> List[Tuple[str, BaseModel]]:
+        now = time.time() if now is None else now
+        with self._lock:
+            pinned = [(name, args) for name, args in self._pinned.values() if TOOLS[name].source == source]
+            ranked = sorted(
+                ((self._score(e, now), e[2], e[3]) for e in self._queries.values() if TOOLS[e[2]].source == source),
+                key=lambda t: t[0], reverse=True,
+            )
+        seen = {cache_key(name, args) for name, args in pinned}
+        out = list(pinned)
+        for score, name, args in ranked:
+            if len(out) >= n or score < min_score:
+                break
+            if cache_key(name, args) not in seen:
+                out.append((name, args))
+        return out[:max(n, len(pinned))]
+
+
+class UpstreamWaste:
+    """Scrapes abandoned before finishing because every caller went away."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_source: Dict[str, Dict[str, float]] = {}
+        self.disconnects = 0
+
+    def record(self, source: str, seconds: float, items: int) -> None:
+        with self._lock:
+            entry = self._by_source.setdefault(source, {"cancelled": 0, "seconds": 0.0, "items": 0})
+            entry["cancelled"] += 1
+            entry["seconds"] += seconds
+            entry["items"] += items
+
+    def disconnected(self) -> None:
+        with self._lock:
+            self.disconnects += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "disconnects": self.disconnects,
+                "sources": {src: {k: round(v, 3) for k, v in e.items()} for src, e in self._by_source.items()},
+            }
+
+
+class _Flight:
+    """A shared in-flight scrape, the callers still waiting on it and what it has collected.
+
+    Items the tool reports are kept and forwarded to each waiter's progress callback, so a
+    caller that joins late or gives up at its deadline still sees every item so far.
+    """
+
+    __slots__ = ("task", "waiters", "collected", "budget", "_followers", "_lock")
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.task: Optional["asyncio.Future[List[UnifiedItem]]"] = None
+        self.waiters = 0
+        self.collected: List[UnifiedItem] = []
+        # The scrape's own deadline: the latest of its waiters', extended as they join
+        self.budget = deadline.Budget(timeout)
+        self._followers: List[ItemCallback] = []
+        self._lock = threading.Lock()  # report() may run on executor threads
+
+    def report(self, item: UnifiedItem) -> None:
+        with self._lock:
+            self.collected.append(item)
+            followers = tuple(self._followers)
+        for cb in followers:
+            cb(item)
+
+    def follow(self, cb: ItemCallback) -> None:
+        with self._lock:
+            seen = list(self.collected)
+            self._followers.append(cb)
+        for item in seen:
+            cb(item)
+
+    def unfollow(self, cb: ItemCallback) -> None:
+        with self._lock:
+            self._followers.remove(cb)
+
+    def snapshot(self) -> List[UnifiedItem]:
+        with self._lock:
+            return list(self.collected)
+
+
+def _dump_items(items: List[UnifiedItem]) -> str:
+    return json.dumps([item.model_dump(mode="json") for item in items], separators=(",", ":"))
+
+
+def _load_items(raw: str) -> List[UnifiedItem]:
+    return [UnifiedItem.model_validate(obj) for obj in json.loads(raw)]
+
+
+shared_state = load_backend(settings.shared_state)
+if shared_state is None:
+    result_cache = TTLCache(max_entries=settings.cache_max_entries, ttl=settings.cache_ttl_seconds)
+    rate_limiter = RateLimiter(settings.rate_limits, default_per_minute=settings.rate_limit_default)
+else:
+    result_cache = SharedTTLCache(shared_state, _dump_items, _load_items,
+                                  max_entries=settings.cache_max_entries, ttl=settings.cache_ttl_seconds)
+    rate_limiter = SharedRateLimiter(shared_state, settings.rate_limits, default_per_minute=settings.rate_limit_default)
+popularity = QueryPopularity(half_life=settings.prewarm_half_life_seconds)
+waste = UpstreamWaste()
+_inflight: Dict[str, _Flight] = {}
+
+
+def ingest(items: List[UnifiedItem], region: Optional[str] = None) -> None:
+    """Score freshly scraped items and feed the analytics stores; never raises."""
+    try:
+        score_items(items)
+    except Exception:
+        logger.exception("viral scoring failed")
+    for label, fn in (
+        ("snapshot", lambda: snapshot_store.record(items)),
+        ("heavy hitter", lambda: heavy_hitters.add(items, region=region)),
+        ("search index", lambda: search_index.add(items)),
+        ("topic clustering", lambda: topic_clusterer.add(items)),
+    ):
+        try:
+            fn()
+        except Exception:
+            logger.exception(f"{label} ingest failed")
+
+
+async def _until_deadline(spec: ToolSpec, args: BaseModel, budget: deadline.Budget,
+                          collected: List[UnifiedItem]) -> List[UnifiedItem]:
+    task = asyncio.ensure_future(spec.fn(args))
+    try:
+        # A caller joining the flight may push the deadline back; re-check before giving up.
+        while not task.done() and not budget.expired():
+            await asyncio.wait({task}, timeout=budget.remaining())
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    if not task.cancelled():
+        try:
+            return task.result()
+        except Exception:
+            # Past the deadline any failure yields what we have.
+            if not budget.expired():
+                raise
+    budget.stop("deadline exceeded")
+    return list(collected)
+
+
+async def collect(name: str, args: BaseModel, background: bool = False,
+                  max_wait: Optional[float] = None) -> List[UnifiedItem]:
+    """Scrape upstream now, bypassing the cache, and store the fresh result.
+
+    Background callers have already taken their rate-limit token; foreground callers wait
+    up to ``max_wait`` seconds for one (the limiter default when None), never past the
+    current deadline (the flight's, when called through ``run``). Cancelling the call stops
+    the scrape and counts as waste.
+    """
+    spec = TOOLS[name]
+    if not background:
+        await rate_limiter.acquire(spec.source, max_wait=deadline.remaining(
+            rate_limiter.max_wait if max_wait is None else max_wait))
+    budget = deadline.current()
+    collected: List[UnifiedItem] = []
+    started = time.monotonic()
+    try:
+        with watching(collected.append):
+            if budget is None or budget.deadline is None:
+                items = await spec.fn(args)
+            else:
+                items = await _until_deadline(spec, args, budget, collected)
+    except asyncio.CancelledError:
+        waste.record(spec.source, time.monotonic() - started, len(collected))
+        raise
+    # Vectorising and sketching a large batch is CPU work; keep it off the event loop.
+    await run_blocking(ingest, items, getattr(args, "region", None))
+    if budget is None or budget.reason is None:
+        await result_cache.aput(cache_key(name, args), items)
+    return items
+
+
+async def _collect_once(name: str, args: BaseModel, key: str, background: bool = False) -> List[UnifiedItem]:
+    """``collect``, but with shared state only one worker process scrapes a given call."""
+    if shared_state is None:
+        return await collect(name, args, background=background)
+    owner = worker_id()
+    while not await run_io(shared_state.claim, key, owner, settings.shared_lease_seconds, time.time()):
+        # Another worker holds the lease; its result lands in the shared cache. If it
+        # fails or dies, the lease is released or expires and we claim it ourselves.
+        await asyncio.sleep(settings.shared_poll_seconds)
+        if await result_cache.aage(key) is not None:
+            cached = await result_cache.aget(key)
+            if cached is not None:
+                return cached
+    try:
+        return await collect(name, args, background=background)
+    finally:
+        await run_io(shared_state.release, key, owner)
+
+
+async def _scrape(flight: _Flight, name: str, args: BaseModel, key: str, background: bool) -> List[UnifiedItem]:
+    with watching(flight.report), deadline.bound(flight.budget):
+        return await _collect_once(name, args, key, background)
+
+
+def _flight(name: str, args: BaseModel, key: str, timeout: Optional[float] = None,
+            background: bool = False) -> _Flight:
+    """The in-flight scrape for ``key``, started if there is none, lasting at least ``timeout``."""
+    flight = _inflight.get(key)
+    if flight is None:
+        flight = _inflight[key] = _Flight(timeout)
+        # A fresh context: the scrape belongs to no single caller, so it must not stop at
+        # the first caller's deadline or report only to its progress callback.
+        flight.task = asyncio.get_running_loop().create_task(
+            _scrape(flight, name, args, key, background), context=contextvars.Context())
+        flight.task.add_done_callback(lambda t: _inflight.pop(key, None) if _inflight.get(key) is flight else None)
+    else:
+        flight.budget.extend(timeout)
+    return flight
+
+
+async def _join(flight: _Flight, timeout: Optional[float] = None) -> List[UnifiedItem]:
+    flight.waiters += 1
+    cb = progress.current()
+    if cb is not None:
+        flight.follow(cb)
+    timed_out = False
+    try:
+        # Shielded so one caller giving up does not cancel the scrape other callers share.
+        return list(await asyncio.wait_for(asyncio.shield(flight.task), timeout))
+    except asyncio.TimeoutError:
+        timed_out = True
+        raise
+    finally:
+        if cb is not None:
+            flight.unfollow(cb)
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.task.done() and not timed_out:
+            # Nobody is left to read the result (e.g. every client disconnected); wait for
+            # the tool to release its browser, subprocess or thread before returning. A
+            # caller that merely ran out of time leaves the scrape to the flight's deadline.
+            flight.task.cancel()
+            await asyncio.gather(flight.task, return_exceptions=True)
+
+
+async def run(name: str, args: BaseModel, timeout: Optional[float] = None) -> RunResult:
+    """Serve a tool call from cache when warm, otherwise scrape within ``timeout`` seconds."""
+    popularity.record(name, args)
+    key = cache_key(name, args)
+    cached = await result_cache.aget(key)
+    if cached is not None:
+        return RunResult(list(cached), True)
+    flight = _flight(name, args, key, timeout)
+    try:
+        items = await _join(flight, timeout)
+        # The scrape itself may have stopped at the latest caller's deadline
+        return RunResult(items, False, flight.budget.reason)
+    except asyncio.TimeoutError:
+        # Only this caller gets the partial list; the scrape goes on while a later deadline allows.
+        return RunResult(flight.snapshot(), False, "deadline exceeded")
+
+
+def in_flight(name: str, args: BaseModel) -> bool:
+    """Whether this process is scraping the call right now."""
+    return cache_key(name, args) in _inflight
+
+
+async def refresh(name: str, args: BaseModel) -> List[UnifiedItem]:
+    """Scrape a call again for the cache, joining the scrape already in flight for it if any.
+
+    Like ``collect(background=True)``, the caller holds the rate-limit token a new scrape
+    needs; unlike it, identical calls are coalesced within and across worker processes.
+    """
+    return await _join(_flight(name, args, cache_key(name, args), background=True))
@@ -0,0 +1,53 @@
+"""Argument models of the scraping tools.
+
+Kept apart from the tool modules, which import the scraping libraries, so clients such as
+the MCP server can build schemas and validate calls with nothing but pydantic installed.
+"""
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+
+class TwitterArgs(BaseModel):
+    query: str = Field(description="Search query, e.g. 'AI trends' or '#viral'")
+    since: Optional[str] = Field(default=None, description="Start date (YYYY-MM-DD)")
+    until: Optional[str] = Field(default=None, description="End date (YYYY-MM-DD)")
+    limit: int = Field(default=100, ge=1, le=1000, description="Maximum tweets")
+
+
+class YouTubeArgs(BaseModel):
+    mode: Literal["video","channel_recent","search"] = "video"
+    id_or_query: str = Field(description="Video ID, channel ID or URL, or search query, depending on mode")
+    limit: int = Field(default=25, ge=1, le=100, description="Maximum results")
+
+
+class RedditArgs(BaseModel):
+    subreddit: str = Field(description="Subreddit name (without r/)")
+    sort: Literal["hot","new","top","rising"] = "hot"
+    time_filter: Literal["hour","day","week","month","year","all"] = Field(default="day", description="Time window for 'top'")
+    limit: int = Field(default=50, ge=1, le=200, description="Maximum posts")
+
+
+class InstagramArgs(BaseModel):
+    mode: Literal["profile", "hashtag", "post"]
+    target: str = Field(description="Username, hashtag (without #), or post shortcode, depending on mode")
+    max_items: int = Field(default=50, ge=1, le=500, description="Maximum items to fetch")
+
+
+class TikTokArgs(BaseModel):
+    mode: Literal["trending","hashtag","user","search"]
+    query_or_id: Optional[str] = Field(default=None, description="Hashtag, username or query; unused for 'trending'")
+    region: str = Field(default="GB", description="Region code for 'trending', e.g. 'US'")
+    limit: int = Field(default=50, ge=1, le=200, description="Maximum videos")
+
+
+class DDGArgs(BaseModel):
+    query: str = Field(description="Search query")
+    max_results: int = Field(default=10, ge=1, le=50, description="Maximum results")
+
+
+class SearxArgs(BaseModel):
+    query: str = Field(description="Search query")
+    categories: Optional[list[str]] = Field(default=None, description="SearxNG categories, e.g. ['general', 'news']")
+    engines: Optional[list[str]] = Field(default=None, description="Restrict to these SearxNG engines")
+    num: int = Field(default=10, ge=1, le=50, description="Unique results, merged across categories and pages")
+    max_pages: int = Field(default=3, ge=1, le=10, description="Result pages per category at most")
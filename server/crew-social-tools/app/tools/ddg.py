@@ -1,21 +1,28 @@
-from pydantic import BaseModel, Field
+from .args import DDGArgs
 from typing import List
 from ..common.schemas import UnifiedItem
+from ..common.executor import run_blocking
+from ..common.progress import report
+from ..common import deadline
 from duckduckgo_search import DDGS
 
-class DDGArgs(BaseModel):
-    query: str
-    max_results: int = Field(default=10, ge=1, le=50)
 
-async def search(args: DDGArgs) -> List[UnifiedItem]:
+def _search(args: DDGArgs) -> List[UnifiedItem]:
     results = []
     with DDGS() as ddg:
         for r in ddg.text(args.query, max_results=args.max_results):
-            results.append(UnifiedItem(
+            item = UnifiedItem(
                 source="ddg",
                 id=r.get("id") if isinstance(r.get("id"), str) else None,
                 url=r.get("href"),
                 title=r.get("title"),
                 text=r.get("body")
-            ))
+            )
+            results.append(item)
+            report(item)
+            if deadline.should_stop():
+                break
     return results
+
+async def search(args: DDGArgs) -> List[UnifiedItem]:
+    return await run_blocking(_search, args)
@@ -1,15 +1,14 @@
-from pydantic import BaseModel, Field
-from typing import List, Literal
+from .args import InstagramArgs
+from typing import List
 from ..common.schemas import UnifiedItem, MetricModel
 from ..common.config import settings
+from ..common.executor import run_blocking
+from ..common.progress import report
+from ..common import deadline
 import instaloader
 
-class InstagramArgs(BaseModel):
-    mode: Literal["profile", "hashtag", "post"]
-    target: str
-    max_items: int = Field(default=50, ge=1, le=500)
 
-async def fetch(args: InstagramArgs) -> List[UnifiedItem]:
+def _fetch(args: InstagramArgs) -> List[UnifiedItem]:
     L = instaloader.Instaloader(dirname_pattern="/tmp/insta")
     if settings.instaloader_session_file:
         try:
@@ -32,7 +31,8 @@ async def fetch(args: InstagramArgs) -> List[UnifiedItem]:
                 published_at=str(post.date_utc),
                 metrics=MetricModel(likes=post.likes, comments=post.comments),
             ))
-            if len(items) >= args.max_items:
+            report(items[-1])
+            if len(items) >= args.max_items or deadline.should_stop():
                 break
     elif args.mode == "hashtag":
         hashtag = instaloader.Hashtag.from_name(L.context, args.target)
@@ -45,7 +45,8 @@ async def fetch(args: InstagramArgs) -> List[UnifiedItem]:
                 published_at=str(post.date_utc),
                 metrics=MetricModel(likes=post.likes, comments=post.comments),
             ))
-            if len(items) >= args.max_items:
+            report(items[-1])
+            if len(items) >= args.max_items or deadline.should_stop():
                 break
     else:  # post
         shortcode = args.target.strip().replace("https://www.instagram.com/p/", "").strip("/")
@@ -58,4 +59,8 @@ async def fetch(args: InstagramArgs) -> List[UnifiedItem]:
             published_at=str(post.date_utc),
             metrics=MetricModel(likes=post.likes, comments=post.comments),
         ))
+        report(items[-1])
     return items
+
+async def fetch(args: InstagramArgs) -> List[UnifiedItem]:
+    return await run_blocking(_fetch, args)
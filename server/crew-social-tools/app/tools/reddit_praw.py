@@ -1,14 +1,12 @@
-from pydantic import BaseModel, Field
-from typing import List, Literal
+from .args import RedditArgs
+from typing import List
 from ..common.schemas import UnifiedItem, MetricModel
 from ..common.config import settings
+from ..common.executor import run_blocking
+from ..common.progress import report
+from ..common import deadline
 import praw
 
-class RedditArgs(BaseModel):
-    subreddit: str
-    sort: Literal["hot","new","top","rising"] = "hot"
-    time_filter: Literal["hour","day","week","month","year","all"] = "day"
-    limit: int = Field(default=50, ge=1, le=200)
 
 def _client():
     return praw.Reddit(
@@ -17,7 +15,7 @@ def _client():
         user_agent=settings.reddit_user_agent,
     )
 
-async def scan(args: RedditArgs) -> List[UnifiedItem]:
+def _scan(args: RedditArgs) -> List[UnifiedItem]:
     reddit = _client()
     sub = reddit.subreddit(args.subreddit)
     if args.sort == "hot":
@@ -31,7 +29,7 @@ async def scan(args: RedditArgs) -> List[UnifiedItem]:
 
     items: List[UnifiedItem] = []
     for post in gen:
-        items.append(UnifiedItem(
+        item = UnifiedItem(
             source="reddit",
             id=post.id,
             url=f"https://www.reddit.com{post.permalink}",
@@ -40,5 +38,12 @@ async def scan(args: RedditArgs) -> List[UnifiedItem]:
             author=str(post.author) if post.author else None,
             published_at=str(post.created_utc),
             metrics=MetricModel(views=None, likes=post.score, comments=post.num_comments)
-        ))
+        )
+        items.append(item)
+        report(item)
+        if deadline.should_stop():
+            break
     return items
+
+async def scan(args: RedditArgs) -> List[UnifiedItem]:
+    return await run_blocking(_scan, args)
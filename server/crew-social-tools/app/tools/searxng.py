@@ -1,28 +1,105 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from .args import SearxArgs
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
 from ..common.schemas import UnifiedItem
-import httpx
+import asyncio, httpx, math
 from ..common.config import settings
+from ..common import deadline
 
-class SearxArgs(BaseModel):
-    query: str
-    categories: Optional[list[str]] = None
-    num: int = Field(default=10, ge=1, le=50)
 
-async def search(args: SearxArgs) -> List[UnifiedItem]:
-    async with httpx.AsyncClient(timeout=7.0) as client:
-        resp = await client.get(
-            f"{settings.searxng_url}/search",
-            params={"q": args.query, "format": "json", "categories": ",".join(args.categories or [])}
+_PAGE_SIZE = 10  # SearxNG results per page and category
+_client: Optional[httpx.AsyncClient] = None
+
+def _get_client() -> httpx.AsyncClient:
+    # One pooled client per process; keep-alive connections are reused across calls.
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=7.0,
+            limits=httpx.Limits(max_connections=settings.searxng_concurrency * 4, max_keepalive_connections=8),
         )
-        resp.raise_for_status()
-        data = resp.json()
-    items = []
-    for r in data.get("results", [])[:args.num]:
-        items.append(UnifiedItem(
-            source="searxng",
-            url=r.get("url"),
-            title=r.get("title"),
-            text=r.get("content")
-        ))
-    return items
+    return _client
+
+async def aclose() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def url_key(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+async def _fetch(client: httpx.AsyncClient, args: SearxArgs, category: Optional[str], page: int) -> List[dict]:
+    params = {"q": args.query, "format": "json", "pageno": page}
+    if category:
+        params["categories"] = category
+    if args.engines:
+        params["engines"] = ",".join(args.engines)
+    resp = await client.get(f"{settings.searxng_url}/search", params=params, timeout=deadline.remaining(7.0))
+    resp.raise_for_status()
+    return resp.json().get("results", [])
+
+def _merge(merged: Dict[str, Tuple[float, int, dict]], results: List[dict]) -> None:
+    for position, r in enumerate(results):
+        if not r.get("url"):
+            continue
+        key = url_key(r["url"])
+        # SearxNG already sums engine votes into "score"; the same URL found under another
+        # category or page adds to it. Rank by position when an instance omits scores.
+        score = r.get("score") or 1.0 / (position + 1)
+        if key in merged:
+            total, order, best = merged[key]
+            merged[key] = (total + score, order, best if len(best.get("content") or "") >= len(r.get("content") or "") else r)
+        else:
+            merged[key] = (score, len(merged), r)
+
+async def _wave(client: httpx.AsyncClient, args: SearxArgs, jobs: List[Tuple[Optional[str], int]],
+                merged: Dict[str, Tuple[float, int, dict]], errors: List[Exception]) -> None:
+    sem = asyncio.Semaphore(settings.searxng_concurrency)
+
+    async def fetch(category: Optional[str], page: int) -> List[dict]:
+        async with sem:
+            return await _fetch(client, args, category, page)
+
+    tasks = [asyncio.ensure_future(fetch(category, page)) for category, page in jobs]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            try:
+                _merge(merged, await fut)
+            except httpx.HTTPError as e:
+                errors.append(e)
+                continue
+            if len(merged) >= args.num:
+                break
+    finally:
+        # Enough unique results: drop requests still queued or in flight.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def search(args: SearxArgs) -> List[UnifiedItem]:
+    """Fan out over categories and pages concurrently, merging results by URL.
+
+    Each wave requests as many pages as ``num`` still needs (at ~10 results per page and
+    category) and stops early once ``num`` unique URLs are in hand.
+    """
+    client = _get_client()
+    categories = args.categories or [None]
+    merged: Dict[str, Tuple[float, int, dict]] = {}
+    errors: List[Exception] = []
+    page = 1
+    while page <= args.max_pages and len(merged) < args.num:
+        before = len(merged)
+        depth = math.ceil((args.num - before) / (_PAGE_SIZE * len(categories)))
+        last = min(args.max_pages, page + depth - 1)
+        # Page-major order, so with a FIFO semaphore earlier pages are requested first.
+        await _wave(client, args, [(c, p) for p in range(page, last + 1) for c in categories], merged, errors)
+        if len(merged) == before or deadline.expired():
+            break  # results exhausted (or every request failed)
+        page = last + 1
+    if not merged and errors:
+        raise errors[0]
+    ranked = sorted(merged.values(), key=lambda e: (-e[0], e[1]))[:args.num]
+    return [UnifiedItem(source="searxng", url=r.get("url"), title=r.get("title"), text=r.get("content"))
+            for _, _, r in ranked]
@@ -1,19 +1,17 @@
-from pydantic import BaseModel, Field
-from typing import List, Literal, Optional
+from .args import TikTokArgs
+from typing import List
 from ..common.schemas import UnifiedItem, MetricModel
+from ..common.progress import report
+from ..common import deadline
+from playwright.async_api import TimeoutError as PlaywrightTimeout
 from playwright.async_api import async_playwright
 import asyncio, json
 
-class TikTokArgs(BaseModel):
-    mode: Literal["trending","hashtag","user","search"]
-    query_or_id: Optional[str] = None
-    region: str = "GB"
-    limit: int = Field(default=50, ge=1, le=200)
 
 async def _collect_json(page) -> list[dict]:
     # This is a placeholder; TikTok changes frequently.
     # Strategy: wait for network idle, evaluate global JSON state.
-    await page.wait_for_timeout(3000)
+    await page.wait_for_timeout(deadline.remaining(3.0) * 1000)
     content = await page.content()
     # You would parse scripts containing JSON initial state here.
     return []
@@ -24,33 +22,46 @@ async def search(args: TikTokArgs) -> List[UnifiedItem]:
         browser = await p.chromium.launch(headless=True)
         context = await browser.new_context(locale=f"en-{args.region}", user_agent=None)
         page = await context.new_page()
+        try:
+            if args.mode == "trending":
+                url = "https://www.tiktok.com/explore"
+            elif args.mode == "hashtag":
+                url = f"https://www.tiktok.com/tag/{args.query_or_id}"
+            elif args.mode == "user":
+                url = f"https://www.tiktok.com/@{args.query_or_id}"
+            else:
+                url = f"https://www.tiktok.com/search?q={args.query_or_id}"
 
-        if args.mode == "trending":
-            url = "https://www.tiktok.com/explore"
-        elif args.mode == "hashtag":
-            url = f"https://www.tiktok.com/tag/{args.query_or_id}"
-        elif args.mode == "user":
-            url = f"https://www.tiktok.com/@{args.query_or_id}"
-        else:
-            url = f"https://www.tiktok.com/search?q={args.query_or_id}"
+            left = deadline.remaining()
+            try:
+                # Playwright treats timeout=0 as "no timeout", so keep at least 1ms.
+                await page.goto(url, wait_until="networkidle", timeout=None if left is None else max(1.0, left * 1000))
+                data = await _collect_json(page)
+            except PlaywrightTimeout:
+                if not deadline.expired():
+                    raise
+                data = []
 
-        await page.goto(url, wait_until="networkidle")
-        data = await _collect_json(page)
-
-        for obj in data[:args.limit]:
-            items.append(UnifiedItem(
-                source="tiktok",
-                id=str(obj.get("id")) if obj.get("id") else None,
-                url=obj.get("url"),
-                title=obj.get("desc"),
-                text=obj.get("desc"),
-                author=(obj.get("author") or {}).get("uniqueId"),
-                metrics=MetricModel(
-                    playCount=obj.get("stats",{}).get("playCount"),
-                    likes=obj.get("stats",{}).get("diggCount"),
-                    comments=obj.get("stats",{}).get("commentCount"),
-                    shares=obj.get("stats",{}).get("shareCount"),
-                )
-            ))
-        await browser.close()
+            for obj in data[:args.limit]:
+                items.append(UnifiedItem(
+                    source="tiktok",
+                    id=str(obj.get("id")) if obj.get("id") else None,
+                    url=obj.get("url"),
+                    title=obj.get("desc"),
+                    text=obj.get("desc"),
+                    author=(obj.get("author") or {}).get("uniqueId"),
+                    metrics=MetricModel(
+                        playCount=obj.get("stats",{}).get("playCount"),
+                        likes=obj.get("stats",{}).get("diggCount"),
+                        comments=obj.get("stats",{}).get("commentCount"),
+                        shares=obj.get("stats",{}).get("shareCount"),
+                    )
+                ))
+                report(items[-1])
+                if deadline.expired():
+                    break
+        finally:
+            # Runs on cancellation too, so a disconnected client never leaves a browser behind.
+            await page.close()
+            await browser.close()
     return items
@@ -1,13 +1,10 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from .args import TwitterArgs
+from typing import List
 from ..common.schemas import UnifiedItem, MetricModel
+from ..common.progress import report
+from ..common import deadline
 import asyncio, json, subprocess, shlex
 
-class TwitterArgs(BaseModel):
-    query: str
-    since: Optional[str] = None  # YYYY-MM-DD
-    until: Optional[str] = None  # YYYY-MM-DD
-    limit: int = Field(default=100, ge=1, le=1000)
 
 def _build_cmd(args: TwitterArgs) -> str:
     q = args.query
@@ -20,36 +17,51 @@ def _build_cmd(args: TwitterArgs) -> str:
 
 async def search(args: TwitterArgs) -> List[UnifiedItem]:
     cmd = _build_cmd(args)
-    proc = await asyncio.create_subprocess_shell(
-        cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    # exec rather than a shell so kill() reaches snscrape itself, not just /bin/sh
+    proc = await asyncio.create_subprocess_exec(
+        *shlex.split(cmd), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
     )
     items: List[UnifiedItem] = []
     count = 0
-    while True:
-        line = await proc.stdout.readline()
-        if not line:
-            break
-        try:
-            obj = json.loads(line.decode("utf-8"))
-            items.append(UnifiedItem(
-                source="twitter",
-                id=str(obj.get("id")),
-                url=obj.get("url"),
-                title=None,
-                text=obj.get("content"),
-                author=(obj.get("user") or {}).get("username"),
-                published_at=obj.get("date"),
-                metrics=MetricModel(
-                    likes=obj.get("likeCount"),
-                    retweets=obj.get("retweetCount"),
-                    comments=obj.get("replyCount")
-                ),
-                lang=obj.get("lang")
-            ))
-            count += 1
-            if count >= args.limit:
+    try:
+        while True:
+            try:
+                line = await asyncio.wait_for(proc.stdout.readline(), timeout=deadline.remaining())
+            except asyncio.TimeoutError:
+                deadline.expired()
                 break
-        except Exception:
-            continue
-    await proc.wait()
+            if not line:
+                break
+            try:
+                obj = json.loads(line.decode("utf-8"))
+                items.append(UnifiedItem(
+                    source="twitter",
+                    id=str(obj.get("id")),
+                    url=obj.get("url"),
+                    title=None,
+                    text=obj.get("content"),
+                    author=(obj.get("user") or {}).get("username"),
+                    published_at=obj.get("date"),
+                    metrics=MetricModel(
+                        likes=obj.get("likeCount"),
+                        retweets=obj.get("retweetCount"),
+                        comments=obj.get("replyCount")
+                    ),
+                    lang=obj.get("lang")
+                ))
+                report(items[-1])
+                count += 1
+                if count >= args.limit:
+                    break
+            except Exception:
+                continue
+    finally:
+        # Stopped early (limit, deadline or cancellation): snscrape would otherwise keep
+        # scraping, and block on a full pipe, for nobody.
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        await proc.wait()
     return items
@@ -1,12 +1,11 @@
-from pydantic import BaseModel, Field
-from typing import List, Literal
+from .args import YouTubeArgs
+from typing import List
 from ..common.schemas import UnifiedItem, MetricModel
+from ..common.executor import run_blocking
+from ..common.progress import report
+from ..common import deadline
 import yt_dlp
 
-class YouTubeArgs(BaseModel):
-    mode: Literal["video","channel_recent","search"] = "video"
-    id_or_query: str
-    limit: int = Field(default=25, ge=1, le=100)
 
 def _format(entry) -> UnifiedItem:
     return UnifiedItem(
@@ -19,7 +18,7 @@ def _format(entry) -> UnifiedItem:
         metrics=MetricModel(views=entry.get("view_count"), likes=entry.get("like_count")),
     )
 
-async def lookup(args: YouTubeArgs) -> List[UnifiedItem]:
+def _lookup(args: YouTubeArgs) -> List[UnifiedItem]:
     ydl_opts = {
         "quiet": True,
         "skip_download": True,
@@ -31,12 +30,22 @@ async def lookup(args: YouTubeArgs) -> List[UnifiedItem]:
         if args.mode == "video":
             info = ydl.extract_info(args.id_or_query, download=False)
             items.append(_format(info))
+            report(items[-1])
         elif args.mode == "channel_recent":
             info = ydl.extract_info(f"https://www.youtube.com/channel/{args.id_or_query}/videos", download=False)
             for e in (info.get("entries") or [])[:args.limit]:
                 items.append(_format(e))
+                report(items[-1])
+                if deadline.should_stop():
+                    break
         else:  # search
             info = ydl.extract_info(f"ytsearch{args.limit}:{args.id_or_query}", download=False)
             for e in (info.get("entries") or [])[:args.limit]:
                 items.append(_format(e))
+                report(items[-1])
+                if deadline.should_stop():
+                    break
     return items
+
+async def lookup(args: YouTubeArgs) -> List[UnifiedItem]:
+    return await run_blocking(_lookup, args)
@@ -0,0 +1,99 @@
+"""TCP vs Unix domain socket latency against a local crew-social-tools server.
+
+    python benchmarks/transport.py [--requests 2000] [--url http://127.0.0.1:8001 --uds /run/cst.sock]
+
+Without --url/--uds a single-worker server is started on a free port and a temporary
+socket. Requests are sequential over one keep-alive connection per transport, so the
+numbers isolate per-request transport overhead rather than server throughput.
+"""
+from typing import Dict, List, Optional
+import argparse, os, socket, statistics, subprocess, sys, tempfile, time
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = (
+    ("GET", "/health", None),
+    ("POST", "/v1/trending/hashtags", {"limit": 20}),
+    ("POST", "/v1/local/search", {"query": "viral video", "limit": 20}),
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int, uds: str) -> subprocess.Popen:
+    env = dict(os.environ, PREWARM_ENABLED="false")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.prefork", "--port", str(port), "--uds", uds, "--workers", "1",
+         "--report-interval", "0", "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200 and os.path.exists(uds):
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError("server did not start")
+
+
+def _measure(client: httpx.Client, base: str, method: str, path: str, body: Optional[dict], n: int) -> List[float]:
+    for _ in range(min(50, n)):  # warm up the connection and server-side caches
+        client.request(method, base + path, json=body)
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        client.request(method, base + path, json=body).raise_for_status()
+        out.append((time.perf_counter() - t0) * 1e6)
+    return out
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    q = statistics.quantiles(samples, n=100)
+    return {"p50": q[49], "p95": q[94], "mean": statistics.fmean(samples)}
+
+
+def run(url: str, uds: str, n: int) -> None:
+    tcp = httpx.Client(timeout=10)
+    unix = httpx.Client(timeout=10, transport=httpx.HTTPTransport(uds=uds))
+    print(f"{'endpoint':<24}{'transport':<10}{'p50 us':>10}{'p95 us':>10}{'mean us':>10}")
+    for method, path, body in ENDPOINTS:
+        results = {
+            "tcp": _summary(_measure(tcp, url, method, path, body, n)),
+            "uds": _summary(_measure(unix, "http://crew-social-tools", method, path, body, n)),
+        }
+        for name, r in results.items():
+            print(f"{path:<24}{name:<10}{r['p50']:>10.0f}{r['p95']:>10.0f}{r['mean']:>10.0f}")
+        print(f"{'':<24}{'uds/tcp':<10}{results['uds']['p50'] / results['tcp']['p50']:>10.2f}")
+    tcp.close()
+    unix.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--url", help="TCP base URL of a running server")
+    parser.add_argument("--uds", help="Unix socket of the same running server")
+    args = parser.parse_args()
+    if args.url and args.uds:
+        run(args.url.rstrip("/"), args.uds, args.requests)
+        return
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        uds = os.path.join(tmp, "cst.sock")
+        proc = _start_server(port, uds)
+        try:
+            run(f"http://127.0.0.1:{port}", uds, args.requests)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
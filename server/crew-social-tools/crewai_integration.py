@@ -7,43 +7,603 @@ Custom CrewAI tools that wrap the crew-social-tools FastAPI endpoints.
 These tools can be used directly by CrewAI agents in viral_crew.py
 """
 
+import asyncio
+import atexit
+from abc import abstractmethod
 import httpx
 import json
-from typing import Any, Dict, List, Optional
+import random
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, copy_context
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Tuple
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+# Tool results remembered per config for If-None-Match revalidation
+ETAG_CACHE_SIZE = 128
+POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=16, keepalive_expiry=30.0)
+# Rough size of a token in compact JSON; no tokenizer is needed to stay near a budget.
+CHARS_PER_TOKEN = 4
+DEFAULT_FIELDS = ("id", "url", "title", "text", "author", "published_at", "metrics", "score")
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# time.monotonic() by which the current tool call must return. Set by the aggregator so
+# concurrent platform calls share one budget; None means config.timeout alone applies.
+_deadline: ContextVar[Optional[float]] = ContextVar("crew_social_tools_deadline", default=None)
+
+
+@contextmanager
+def within(seconds: float) -> Iterator[None]:
+    """Bound every tool call made in this context (and copies of it) to ``seconds`` from now
+
+    An enclosing, earlier deadline still applies.
+    """
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class ToolMemo:
+    """Server responses of identical tool calls, reused instead of another round trip
+
+    Error and partial responses are never stored. Without a ``ttl`` entries live as long as
+    the memo, which ``memoized`` scopes to one crew run; with one, a memo can be shared
+    across runs and entries expire.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class MemoRun:
+    """One run's use of a ToolMemo that other, possibly concurrent, runs may share
+
+    Lookups and stores go to the memo; ``stats`` counts only the hits and misses of this run.
+    """
+
+    def __init__(self, memo: ToolMemo):
+        self.memo = memo
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self.memo.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        self.memo.put(key, data)
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.memo.stats()["entries"]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "entries": entries,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_memo: ContextVar[Optional[MemoRun]] = ContextVar("crew_social_tools_memo", default=None)
+
+
+@contextmanager
+def memoized(memo: Optional[ToolMemo] = None, ttl: Optional[float] = None) -> Iterator[MemoRun]:
+    """Reuse results of identical tool calls made in this context (and copies of it)
+
+    Wrap a crew kickoff to dedupe the agents' repeated calls within that run; pass the same
+    ``memo`` to several runs to share results across them. The yielded ``MemoRun`` reports
+    this run's hits and misses even when the memo is shared.
+    """
+    run = MemoRun(memo if memo is not None else ToolMemo(ttl=ttl))
+    token = _memo.set(run)
+    try:
+        yield run
+    finally:
+        _memo.reset(token)
+
+
+class _ClientPool:
+    """Keep-alive clients shared by every tool instance in the process, one per socket path
+
+    The sync client serves ``_run`` from any thread. An AsyncClient's connections belong to
+    the event loop that opened them, so async clients are kept per running loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync: Dict[Optional[str], httpx.Client] = {}
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Optional[str], httpx.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def client(self, uds: Optional[str]) -> httpx.Client:
+        with self._lock:
+            client = self._sync.get(uds)
+            if client is None or client.is_closed:
+                client = self._sync[uds] = httpx.Client(transport=httpx.HTTPTransport(uds=uds, limits=POOL_LIMITS))
+            return client
+
+    def aclient(self, uds: Optional[str]) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async.setdefault(loop, {})
+            client = clients.get(uds)
+            if client is None or client.is_closed:
+                client = clients[uds] = httpx.AsyncClient(
+                    transport=httpx.AsyncHTTPTransport(uds=uds, limits=POOL_LIMITS)
+                )
+            return client
+
+    def close(self) -> None:
+        """Close the sync clients; async ones on loops that are gone are dropped"""
+        with self._lock:
+            clients, self._sync = list(self._sync.values()), {}
+            for loop in [loop for loop in self._async if loop.is_closed()]:
+                del self._async[loop]
+        for client in clients:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close the running loop's async clients, then the sync ones"""
+        with self._lock:
+            clients = list(self._async.pop(asyncio.get_running_loop(), {}).values())
+        for client in clients:
+            await client.aclose()
+        self.close()
+
+
+_pool = _ClientPool()
+atexit.register(_pool.close)
+
+
+def close_clients() -> None:
+    """Close the shared connection pool (sync callers; also runs at interpreter exit)"""
+    _pool.close()
+
+
+async def aclose_clients() -> None:
+    """Close the shared connection pool from the event loop the async tools ran on"""
+    await _pool.aclose()
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _engagement(item: Dict[str, Any]) -> Tuple[float, int, int]:
+    """Sort key: server viral score if ranked, then interactions, then reach"""
+    metrics = item.get("metrics") or {}
+    interactions = sum(metrics.get(k) or 0 for k in ("likes", "comments", "shares", "retweets"))
+    reach = max(metrics.get("views") or 0, metrics.get("playCount") or 0)
+    score = item.get("score")
+    return (score if score is not None else -1.0, interactions, reach)
+
+
+class OutputShape(BaseModel):
+    """How tool results are cut down before they reach the LLM
+
+    Items are ordered by engagement, projected onto ``fields`` (empty values dropped),
+    long strings cut to ``text_chars``, and added until the output would exceed the token
+    budget. ``total`` and ``omitted`` tell the agent how much was left out.
+    """
+    max_tokens: Optional[int] = Field(default=1500, description="Budget for one tool output; None for no limit")
+    top_k: Optional[int] = Field(default=None, description="At most this many items, highest engagement first")
+    fields: List[str] = Field(default_factory=lambda: list(DEFAULT_FIELDS), description="Item fields to keep")
+    text_chars: int = Field(default=280, description="Longer string values are cut to this many characters")
+    compact: bool = Field(default=True, description="Serialize without indentation or spaces")
+
+    def dumps(self, data: Any) -> str:
+        return json.dumps(data, separators=(",", ":")) if self.compact else json.dumps(data, indent=2)
+
+    def project(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        out = {}
+        for field in self.fields:
+            value = item.get(field)
+            if isinstance(value, dict):
+                value = {k: v for k, v in value.items() if v is not None}
+            if value is None or value == "" or value == [] or value == {}:
+                continue
+            if isinstance(value, str) and len(value) > self.text_chars:
+                value = value[:self.text_chars - 1] + "\u2026"
+            out[field] = value
+        return out
+
+    def shape(self, items: List[Dict[str, Any]], key: str, max_tokens: Optional[int] = None, **extra: Any) -> str:
+        """A success payload holding the highest-engagement items that fit the budget"""
+        ranked = sorted(items, key=_engagement, reverse=True)  # stable: unscored items keep source order
+        if self.top_k is not None:
+            ranked = ranked[:self.top_k]
+        kept = [self.project(item) for item in ranked]
+        budget = self.max_tokens if max_tokens is None else max_tokens
+
+        def payload(selected: List[Dict[str, Any]]) -> Dict[str, Any]:
+            return {"success": True, "count": len(selected), "total": len(items),
+                    "omitted": len(items) - len(selected), **extra, key: selected}
+
+        if budget is not None:
+            used = estimate_tokens(self.dumps(payload([])))
+            for n, item in enumerate(kept):
+                used += estimate_tokens(self.dumps(item)) + 1
+                if used > budget:
+                    kept = kept[:n]
+                    break
+        return self.dumps(payload(kept))
+
+
+def _retry_signal(data: Optional[Dict[str, Any]], error: Optional[Exception]) -> Tuple[bool, Optional[float]]:
+    """(worth retrying, server-requested wait) for one attempt's outcome"""
+    if isinstance(error, httpx.HTTPStatusError):
+        if error.response.status_code not in RETRY_STATUSES:
+            return False, None
+        try:
+            return True, float(error.response.headers.get("retry-after", ""))
+        except ValueError:
+            return True, None
+    if isinstance(error, httpx.ReadTimeout):
+        # The server had the request and used our whole timeout; asking again would too.
+        return False, None
+    if isinstance(error, httpx.TransportError):
+        return True, None
+    if data and data.get("error"):
+        return bool(data["error"].get("retryable")), data["error"].get("retry_after")
+    return False, None
+
+
+def _status_error(error: httpx.HTTPStatusError, attempts: int) -> Dict[str, Any]:
+    """An error status as a server error body, so the agent gets one error shape"""
+    response = error.response
+    status = response.status_code
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    detail = body.get("detail") if isinstance(body, dict) else None
+    if detail is not None and not isinstance(detail, str):
+        detail = json.dumps(detail)
+    retryable, retry_after = _retry_signal(None, error)
+    if retryable:
+        hint = "crew-social-tools is busy or restarting; retry later"
+    elif status < 500:
+        hint = "the request was rejected; check the arguments"
+    else:
+        hint = None
+    return {
+        "error": {
+            "error": f"HTTP {status}: {detail or response.reason_phrase}", "code": f"HTTP_{status}",
+            "retryable": retryable, "retry_after": retry_after, "hint": hint,
+        },
+        "attempts": attempts,
+    }
+
+
+class RetryPolicy(BaseModel):
+    """Retries of transient failures, so agents don't spend an iteration calling again
+
+    Retried: connection errors, 429/502/503/504, and error responses the server marks
+    ``retryable``; read timeouts are not. Waits use full jitter, or the server's
+    ``retry_after`` when given. The first attempt has the full request timeout; each retry
+    only what is left of ``budget``, and a retry is skipped once its wait would overrun
+    ``budget`` (or the aggregator's deadline). The agent then gets the error with its hint
+    and ``retry_after``.
+    """
+    max_attempts: int = Field(default=3, ge=1)
+    base_delay: float = Field(default=0.5, description="Seconds; doubles per attempt before jitter")
+    max_delay: float = Field(default=8.0, description="Cap on one jittered backoff")
+    budget: float = Field(
+        default=20.0, description="Seconds from the first request within which retries and their waits must end"
+    )
+
+    def next_delay(self, attempt: int, started: float, retry_after: Optional[float]) -> Optional[float]:
+        """Seconds to wait before retrying after ``attempt`` (0-based), or None to give up"""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, self.base_delay)
+        else:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        left = self.budget - (time.monotonic() - started)
+        deadline = _deadline.get()
+        if deadline is not None:
+            left = min(left, deadline - time.monotonic())
+        return delay if delay < left else None
 
 
 class CrewSocialToolsConfig(BaseModel):
     """Configuration for crew-social-tools connection"""
-    base_url: str = Field(default="http://localhost:8001", description="Base URL for crew-social-tools API")
+    base_url: str = Field(
+        default="http://localhost:8001",
+        description="Base URL for crew-social-tools API"
+    )
+    uds: Optional[str] = Field(
+        default=None, description="Unix domain socket of a co-located server; requests for base_url go over it"
+    )
     timeout: float = Field(default=60.0, description="Request timeout in seconds")
+    deadline_margin: float = Field(
+        default=5.0, description="Seconds before the timeout at which the server should return partial results"
+    )
+    output: Optional[OutputShape] = Field(
+        default_factory=OutputShape, description="Shaping of tool output for the LLM; None returns every item in full"
+    )
+    retry: Optional[RetryPolicy] = Field(default_factory=RetryPolicy, description="None disables retries")
+
+    _etags: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = PrivateAttr(default_factory=OrderedDict)
+    # The aggregator's fan-out threads share one config
+    _etags_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def request_timeout(self) -> float:
+        deadline = _deadline.get()
+        if deadline is None:
+            return self.timeout
+        return max(0.1, min(self.timeout, deadline - time.monotonic()))
+
+    def deadline_headers(self) -> Dict[str, str]:
+        """Propagate our timeout so the server stops scraping before we give up on it"""
+        budget = max(1.0, self.timeout - self.deadline_margin)
+        deadline = _deadline.get()
+        if deadline is not None:
+            # Leave a tenth of what remains for the partial response to reach us.
+            budget = max(0.1, min(budget, 0.9 * (deadline - time.monotonic())))
+        return {"X-Request-Timeout": f"{budget:.3g}"}
+
+    def _revalidation(self, url: str, payload: Dict[str, Any]) -> Tuple[str, Dict[str, str], Optional[Tuple[str, Dict[str, Any]]]]:
+        key = url + "\n" + json.dumps(payload, sort_keys=True)
+        headers = self.deadline_headers()
+        with self._etags_lock:
+            previous = self._etags.get(key)
+        if previous is not None:
+            headers["If-None-Match"] = previous[0]
+        return key, headers, previous
+
+    def _receive(self, key: str, previous: Optional[Tuple[str, Dict[str, Any]]], response: httpx.Response) -> Dict[str, Any]:
+        if response.status_code == 304 and previous is not None:
+            with self._etags_lock:
+                if key in self._etags:
+                    self._etags.move_to_end(key)
+            return previous[1]
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get("etag")
+        if etag and not data.get("error"):
+            with self._etags_lock:
+                self._etags[key] = (etag, data)
+                self._etags.move_to_end(key)
+                while len(self._etags) > ETAG_CACHE_SIZE:
+                    self._etags.popitem(last=False)
+        return data
+
+    def post_json(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a tool call, revalidating the last identical call's result with If-None-Match
+
+        Unchanged results come back as a bodiless 304 and are served from the stored copy.
+        """
+        key, headers, previous = self._revalidation(url, payload)
+        response = _pool.client(self.uds).post(url, json=payload, headers=headers, timeout=self.request_timeout())
+        return self._receive(key, previous, response)
+
+    async def apost_json(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Async post_json over the running loop's shared client"""
+        key, headers, previous = self._revalidation(url, payload)
+        response = await _pool.aclient(self.uds).post(
+            url, json=payload, headers=headers, timeout=self.request_timeout()
+        )
+        return self._receive(key, previous, response)
+
+
+class SocialTool(BaseTool):
+    """Base for the tools below: ``_run`` and ``_arun`` share one payload and result shape
+
+    Subclasses set ``endpoint`` and ``result_key``, define ``_payload`` with their
+    arguments' defaults, and a ``_run`` whose signature CrewAI turns into the args schema.
+    All instances share the process-wide connection pool; see ``close_clients``.
+    """
+
+    endpoint: ClassVar[str]
+    result_key: ClassVar[str] = "items"
+    # Arguments compared case-insensitively when memoizing
+    case_insensitive: ClassVar[Tuple[str, ...]] = ()
+
+    config: CrewSocialToolsConfig = Field(default_factory=CrewSocialToolsConfig)
+    max_output_tokens: Optional[int] = Field(default=None, description="Overrides config.output.max_tokens")
+
+    @abstractmethod
+    def _payload(self, **kwargs: Any) -> Dict[str, Any]:
+        """The request body for these arguments, with the tool's defaults filled in"""
+
+    def _format(self, data: Dict[str, Any], max_tokens: Optional[int] = None) -> str:
+        if data.get("error"):
+            error_info = data["error"]
+            return json.dumps({
+                "success": False,
+                "error": error_info.get("error", str(error_info)),
+                "code": error_info.get("code"),
+                "retryable": error_info.get("retryable", False),
+                "hint": error_info.get("hint"),
+                "retry_after": error_info.get("retry_after"),
+                "attempts": data.get("attempts", 1)
+            })
+
+        if self.config.output is None:
+            return json.dumps({
+                "success": True,
+                "count": len(data.get("items", [])),
+                "partial": data.get("partial", False),
+                "partial_reason": data.get("partial_reason"),
+                self.result_key: data.get("items", [])
+            }, indent=2)
+
+        extra = {"partial": True, "partial_reason": data.get("partial_reason")} if data.get("partial") else {}
+        return self.config.output.shape(
+            data.get("items", []), self.result_key,
+            max_tokens if max_tokens is not None else self.max_output_tokens, **extra
+        )
 
+    def _memo_key(self, payload: Dict[str, Any]) -> str:
+        normalized = {}
+        for name, value in payload.items():
+            if isinstance(value, str):
+                value = " ".join(value.split())
+                if name in self.case_insensitive:
+                    value = value.casefold()
+            normalized[name] = value
+        return self.config.base_url + self.endpoint + "\n" + json.dumps(normalized, sort_keys=True)
+
+    @staticmethod
+    def _memoize(memo: Optional[MemoRun], key: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        if memo is not None and not data.get("error") and not data.get("partial"):
+            memo.put(key, data)
+        return data
+
+    @staticmethod
+    def _settle(data: Optional[Dict[str, Any]], error: Optional[Exception], attempt: int) -> Dict[str, Any]:
+        if isinstance(error, httpx.HTTPStatusError):
+            return _status_error(error, attempt + 1)
+        if error is not None:
+            raise error
+        return dict(data, attempts=attempt + 1) if attempt and data.get("error") else data
+
+    def _attempt(self, started: float, attempt: int):
+        """Bound a retry, request timeout and server deadline alike, by the budget left"""
+        if not attempt or self.config.retry is None:
+            return nullcontext()
+        return within(self.config.retry.budget - (time.monotonic() - started))
+
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            data, error = None, None
+            try:
+                with self._attempt(started, attempt):
+                    data = self.config.post_json(f"{self.config.base_url}{self.endpoint}", payload)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                error = e
+            retryable, retry_after = _retry_signal(data, error)
+            delay = self.config.retry.next_delay(attempt, started, retry_after) if retryable and self.config.retry else None
+            if delay is None:
+                return self._settle(data, error, attempt)
+            time.sleep(delay)
+            attempt += 1
+
+    async def _apost(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            data, error = None, None
+            try:
+                with self._attempt(started, attempt):
+                    data = await self.config.apost_json(f"{self.config.base_url}{self.endpoint}", payload)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                error = e
+            retryable, retry_after = _retry_signal(data, error)
+            delay = self.config.retry.next_delay(attempt, started, retry_after) if retryable and self.config.retry else None
+            if delay is None:
+                return self._settle(data, error, attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _fetch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        memo = _memo.get()
+        key = self._memo_key(payload)
+        cached = memo.get(key) if memo is not None else None
+        if cached is not None:
+            return cached
+        return self._memoize(memo, key, self._post(payload))
+
+    async def _afetch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        memo = _memo.get()
+        key = self._memo_key(payload)
+        cached = memo.get(key) if memo is not None else None
+        if cached is not None:
+            return cached
+        return self._memoize(memo, key, await self._apost(payload))
+
+    def _call(self, payload: Dict[str, Any], max_tokens: Optional[int] = None) -> str:
+        try:
+            return self._format(self._fetch(payload), max_tokens)
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    async def _acall(self, payload: Dict[str, Any], max_tokens: Optional[int] = None) -> str:
+        try:
+            return self._format(await self._afetch(payload), max_tokens)
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
 
-class TwitterSearchTool(BaseTool):
+    async def _arun(self, **kwargs: Any) -> str:
+        return await self._acall(self._payload(**kwargs))
+
+
+class TwitterSearchTool(SocialTool):
     name: str = "Twitter Search Tool"
     description: str = (
         "Search Twitter for tweets matching a query. Returns tweets with engagement metrics "
         "(likes, retweets, comments), author info, URLs, and content. "
         "Use this to discover trending topics, viral tweets, and audience sentiment."
     )
-
-    config: CrewSocialToolsConfig = Field(default_factory=CrewSocialToolsConfig)
-    _client: Optional[httpx.Client] = None
-
-    def model_post_init(self, __context):
-        """Initialize after Pydantic model creation"""
-        super().model_post_init(__context)
-
-    def _get_client(self) -> httpx.Client:
-        """Get or create HTTP client"""
-        if self._client is None or self._client.is_closed:
-            object.__setattr__(self, '_client', httpx.Client(timeout=self.config.timeout))
-        return self._client
-
-    def __del__(self):
-        if self._client is not None and not self._client.is_closed:
-            self._client.close()
+    endpoint: ClassVar[str] = "/v1/twitter/search"
+    result_key: ClassVar[str] = "tweets"
+    case_insensitive: ClassVar[Tuple[str, ...]] = ("query",)
+
+    def _payload(
+        self, query: str, since: Optional[str] = None, until: Optional[str] = None, limit: int = 50
+    ) -> Dict[str, Any]:
+        payload = {
+            "query": query,
+            "limit": limit
+        }
+        if since:
+            payload["since"] = since
+        if until:
+            payload["until"] = until
+        return payload
 
     def _run(
         self,
@@ -61,70 +621,25 @@ class TwitterSearchTool(BaseTool):
             until: End date (YYYY-MM-DD) - optional
             limit: Maximum tweets to return (default: 50)
         """
-        try:
-            payload = {
-                "query": query,
-                "limit": limit
-            }
-            if since:
-                payload["since"] = since
-            if until:
-                payload["until"] = until
-
-            response = self._get_client().post(
-                f"{self.config.base_url}/v1/twitter/search",
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("error"):
-                error_info = data["error"]
-                return json.dumps({
-                    "success": False,
-                    "error": error_info.get("error", str(error_info)),
-                    "code": error_info.get("code"),
-                    "retryable": error_info.get("retryable", False),
-                    "hint": error_info.get("hint")
-                })
-
-            return json.dumps({
-                "success": True,
-                "count": len(data.get("items", [])),
-                "tweets": data.get("items", [])
-            }, indent=2)
-
-        except Exception as e:
-            return json.dumps({
-                "success": False,
-                "error": str(e)
-            })
+        return self._call(self._payload(query=query, since=since, until=until, limit=limit))
 
 
-class YouTubeSearchTool(BaseTool):
+class YouTubeSearchTool(SocialTool):
     name: str = "YouTube Search Tool"
     description: str = (
-        "Search YouTube for videos or get video/channel details. Returns video metadata, "
+        "Search YouTube, get a video's details or a channel's recent videos. Returns video metadata, "
         "view counts, likes, comments, and engagement metrics. "
         "Use this to find trending videos, analyze viral content, and discover successful channels."
     )
-
-    config: CrewSocialToolsConfig = Field(default_factory=CrewSocialToolsConfig)
-    _client: Optional[httpx.Client] = None
-
-    def model_post_init(self, __context):
-        """Initialize after Pydantic model creation"""
-        super().model_post_init(__context)
-
-    def _get_client(self) -> httpx.Client:
-        """Get or create HTTP client"""
-        if self._client is None or self._client.is_closed:
-            object.__setattr__(self, '_client', httpx.Client(timeout=self.config.timeout))
-        return self._client
-
-    def __del__(self):
-        if self._client is not None and not self._client.is_closed:
-            self._client.close()
+    endpoint: ClassVar[str] = "/v1/youtube/lookup"
+    result_key: ClassVar[str] = "videos"
+
+    def _payload(self, mode: str, id_or_query: str, limit: int = 25) -> Dict[str, Any]:
+        return {
+            "mode": mode,
+            "id_or_query": id_or_query,
+            "limit": limit
+        }
 
     def _run(
         self,
@@ -133,64 +648,35 @@ class YouTubeSearchTool(BaseTool):
         limit: int = 25
     ) -> str:
         """
-        Search YouTube or get video/channel details.
+        Search YouTube, get a video's details or a channel's recent videos.
 
         Args:
-            mode: "search", "video", or "channel"
-            id_or_query: Video ID, channel ID, or search query
+            mode: "video", "channel_recent", or "search"
+            id_or_query: Video ID, channel ID or URL, or search query, depending on mode
             limit: Maximum results (default: 25)
         """
-        try:
-            response = self._get_client().post(
-                f"{self.config.base_url}/v1/youtube/lookup",
-                json={
-                    "mode": mode,
-                    "id_or_query": id_or_query,
-                    "limit": limit
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("error"):
-                return json.dumps({
-                    "success": False,
-                    "error": data["error"]["error"]
-                })
+        return self._call(self._payload(mode=mode, id_or_query=id_or_query, limit=limit))
 
-            return json.dumps({
-                "success": True,
-                "count": len(data.get("items", [])),
-                "videos": data.get("items", [])
-            }, indent=2)
 
-        except Exception as e:
-            return json.dumps({"success": False, "error": str(e)})
-
-
-class RedditScanTool(BaseTool):
+class RedditScanTool(SocialTool):
     name: str = "Reddit Scan Tool"
     description: str = (
         "Scan Reddit subreddit for posts. Returns posts with upvotes, comments, awards, and content. "
         "Use this to discover trending discussions, viral posts, and community sentiment."
     )
-
-    config: CrewSocialToolsConfig = Field(default_factory=CrewSocialToolsConfig)
-    _client: Optional[httpx.Client] = None
-
-    def model_post_init(self, __context):
-        """Initialize after Pydantic model creation"""
-        super().model_post_init(__context)
-
-    def _get_client(self) -> httpx.Client:
-        """Get or create HTTP client"""
-        if self._client is None or self._client.is_closed:
-            object.__setattr__(self, '_client', httpx.Client(timeout=self.config.timeout))
-        return self._client
-
-    def __del__(self):
-        if self._client is not None and not self._client.is_closed:
-            self._client.close()
+    endpoint: ClassVar[str] = "/v1/reddit/scan"
+    result_key: ClassVar[str] = "posts"
+    case_insensitive: ClassVar[Tuple[str, ...]] = ("subreddit", "sort", "time_filter")
+
+    def _payload(
+        self, subreddit: str, sort: str = "hot", time_filter: str = "day", limit: int = 50
+    ) -> Dict[str, Any]:
+        return {
+            "subreddit": subreddit,
+            "sort": sort,
+            "time_filter": time_filter,
+            "limit": limit
+        }
 
     def _run(
         self,
@@ -208,59 +694,25 @@ class RedditScanTool(BaseTool):
             time_filter: "hour", "day", "week", "month", "year", "all" (default: "day")
             limit: Maximum posts (default: 50)
         """
-        try:
-            response = self._get_client().post(
-                f"{self.config.base_url}/v1/reddit/scan",
-                json={
-                    "subreddit": subreddit,
-                    "sort": sort,
-                    "time_filter": time_filter,
-                    "limit": limit
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("error"):
-                return json.dumps({
-                    "success": False,
-                    "error": data["error"]["error"]
-                })
+        return self._call(self._payload(subreddit=subreddit, sort=sort, time_filter=time_filter, limit=limit))
 
-            return json.dumps({
-                "success": True,
-                "count": len(data.get("items", [])),
-                "posts": data.get("items", [])
-            }, indent=2)
-
-        except Exception as e:
-            return json.dumps({"success": False, "error": str(e)})
 
-
-class InstagramFetchTool(BaseTool):
+class InstagramFetchTool(SocialTool):
     name: str = "Instagram Fetch Tool"
     description: str = (
         "Fetch Instagram content from profiles, hashtags, or posts. Returns posts with likes, "
         "comments, media URLs, and engagement data. "
         "Use this to analyze influencer content, trending hashtags, and viral posts."
     )
-
-    config: CrewSocialToolsConfig = Field(default_factory=CrewSocialToolsConfig)
-    _client: Optional[httpx.Client] = None
-
-    def model_post_init(self, __context):
-        """Initialize after Pydantic model creation"""
-        super().model_post_init(__context)
-
-    def _get_client(self) -> httpx.Client:
-        """Get or create HTTP client"""
-        if self._client is None or self._client.is_closed:
-            object.__setattr__(self, '_client', httpx.Client(timeout=self.config.timeout))
-        return self._client
-
-    def __del__(self):
-        if self._client is not None and not self._client.is_closed:
-            self._client.close()
+    endpoint: ClassVar[str] = "/v1/instagram/fetch"
+    result_key: ClassVar[str] = "posts"
+
+    def _payload(self, mode: str, target: str, max_items: int = 30) -> Dict[str, Any]:
+        return {
+            "mode": mode,
+            "target": target,
+            "max_items": max_items
+        }
 
     def _run(
         self,
@@ -276,57 +728,25 @@ class InstagramFetchTool(BaseTool):
             target: Username, hashtag (without #), or post shortcode
             max_items: Maximum items to fetch (default: 30)
         """
-        try:
-            response = self._get_client().post(
-                f"{self.config.base_url}/v1/instagram/fetch",
-                json={
-                    "mode": mode,
-                    "target": target,
-                    "max_items": max_items
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
+        return self._call(self._payload(mode=mode, target=target, max_items=max_items))
 
-            if data.get("error"):
-                return json.dumps({
-                    "success": False,
-                    "error": data["error"]["error"]
-                })
 
-            return json.dumps({
-                "success": True,
-                "count": len(data.get("items", [])),
-                "posts": data.get("items", [])
-            }, indent=2)
-
-        except Exception as e:
-            return json.dumps({"success": False, "error": str(e)})
-
-
-class DDGSearchTool(BaseTool):
+class DDGSearchTool(SocialTool):
     name: str = "DuckDuckGo Search Tool"
     description: str = (
         "Search DuckDuckGo for web content. No API key required. "
         "Use this as a fallback for general web search, news, and content discovery."
     )
-
-    config: CrewSocialToolsConfig = Field(default_factory=CrewSocialToolsConfig)
-    _client: Optional[httpx.Client] = None
-
-    def model_post_init(self, __context):
-        """Initialize after Pydantic model creation"""
-        super().model_post_init(__context)
-
-    def _get_client(self) -> httpx.Client:
-        """Get or create HTTP client"""
-        if self._client is None or self._client.is_closed:
-            object.__setattr__(self, '_client', httpx.Client(timeout=self.config.timeout))
-        return self._client
-
-    def __del__(self):
-        if self._client is not None and not self._client.is_closed:
-            self._client.close()
+    endpoint: ClassVar[str] = "/v1/search/ddg"
+    result_key: ClassVar[str] = "results"
+    case_insensitive: ClassVar[Tuple[str, ...]] = ("query", "region")
+
+    def _payload(self, query: str, region: str = "us-en", max_results: int = 20) -> Dict[str, Any]:
+        return {
+            "query": query,
+            "region": region,
+            "max_results": max_results
+        }
 
     def _run(
         self,
@@ -342,32 +762,11 @@ class DDGSearchTool(BaseTool):
             region: Region code (e.g., "us-en", "uk-en")
             max_results: Maximum results (default: 20)
         """
-        try:
-            response = self._get_client().post(
-                f"{self.config.base_url}/v1/search/ddg",
-                json={
-                    "query": query,
-                    "region": region,
-                    "max_results": max_results
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("error"):
-                return json.dumps({
-                    "success": False,
-                    "error": data["error"]["error"]
-                })
+        return self._call(self._payload(query=query, region=region, max_results=max_results))
 
-            return json.dumps({
-                "success": True,
-                "count": len(data.get("items", [])),
-                "results": data.get("items", [])
-            }, indent=2)
 
-        except Exception as e:
-            return json.dumps({"success": False, "error": str(e)})
+# Sync platform calls from SocialMediaAggregator run here; the shared httpx.Client is thread-safe.
+_fanout_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="crew-social-fanout")
 
 
 class SocialMediaAggregator(BaseTool):
@@ -379,6 +778,12 @@ class SocialMediaAggregator(BaseTool):
     )
 
     config: CrewSocialToolsConfig = Field(default_factory=CrewSocialToolsConfig)
+    deadline: float = Field(
+        default=30.0, description="Seconds for the whole fan-out; platforms still running then are left out"
+    )
+    max_output_tokens: Optional[int] = Field(
+        default=None, description="Budget for the combined output, split evenly across platforms"
+    )
 
     def model_post_init(self, __context):
         """Initialize sub-tools after Pydantic model creation"""
@@ -387,35 +792,27 @@ class SocialMediaAggregator(BaseTool):
         object.__setattr__(self, 'youtube', YouTubeSearchTool(config=self.config))
         object.__setattr__(self, 'reddit', RedditScanTool(config=self.config))
 
-    def _run(
-        self,
-        query: str,
-        platforms: List[str] = None,
-        limit_per_platform: int = 20
-    ) -> str:
-        """
-        Aggregate trends across multiple platforms.
-
-        Args:
-            query: Search query
-            platforms: List of platforms ["twitter", "youtube", "reddit"] (default: all)
-            limit_per_platform: Items per platform (default: 20)
-        """
+    def _calls(self, query: str, platforms: Optional[List[str]], limit: int) -> Dict[str, Tuple[SocialTool, Dict[str, Any]]]:
+        calls = {
+            "twitter": (self.twitter, {"query": query, "limit": limit}),
+            "youtube": (self.youtube, {"mode": "search", "id_or_query": query, "limit": limit}),
+            # For Reddit, try to find relevant subreddit or use 'all'
+            "reddit": (self.reddit, {"subreddit": "all", "limit": limit}),
+        }
         platforms = platforms or ["twitter", "youtube", "reddit"]
-        results = {"query": query, "platforms": {}}
+        return {p: call for p, call in calls.items() if p in platforms}
 
-        if "twitter" in platforms:
-            twitter_result = self.twitter._run(query=query, limit=limit_per_platform)
-            results["platforms"]["twitter"] = json.loads(twitter_result)
-
-        if "youtube" in platforms:
-            youtube_result = self.youtube._run(mode="search", id_or_query=query, limit=limit_per_platform)
-            results["platforms"]["youtube"] = json.loads(youtube_result)
-
-        if "reddit" in platforms:
-            # For Reddit, try to find relevant subreddit or use 'all'
-            reddit_result = self.reddit._run(subreddit="all", limit=limit_per_platform)
-            results["platforms"]["reddit"] = json.loads(reddit_result)
+    def _summarize(self, query: str, platforms: List[str], finished: Dict[str, str],
+                   timings: Dict[str, float], started: float) -> str:
+        results = {"query": query, "platforms": {}}
+        timed_out = [p for p in platforms if p not in finished]
+        for platform in platforms:
+            if platform in finished:
+                results["platforms"][platform] = json.loads(finished[platform])
+            else:
+                results["platforms"][platform] = {
+                    "success": False, "error": f"no response within {self.deadline:g}s", "timed_out": True
+                }
 
         # Calculate aggregate metrics
         total_items = sum(
@@ -426,17 +823,112 @@ class SocialMediaAggregator(BaseTool):
         results["summary"] = {
             "total_items": total_items,
             "platforms_searched": len(platforms),
+            "platforms_completed": len(finished),
+            "timed_out": timed_out,
+            "timings": {p: timings.get(p) for p in platforms},
+            "elapsed": round(time.monotonic() - started, 3),
             "query": query
         }
 
-        return json.dumps(results, indent=2)
+        return self.config.output.dumps(results) if self.config.output else json.dumps(results, indent=2)
+
+    def _share(self, platforms: int) -> Optional[int]:
+        budget = self.max_output_tokens
+        if budget is None and self.config.output is not None:
+            budget = self.config.output.max_tokens
+        return None if budget is None else budget // max(1, platforms)
+
+    def _run(
+        self,
+        query: str,
+        platforms: List[str] = None,
+        limit_per_platform: int = 20
+    ) -> str:
+        """
+        Aggregate trends across multiple platforms.
+
+        Platforms are queried concurrently under one shared deadline; the server is asked
+        for partial results in time, and any platform still running at the deadline is
+        reported as timed out rather than waited for.
+
+        Args:
+            query: Search query
+            platforms: List of platforms ["twitter", "youtube", "reddit"] (default: all)
+            limit_per_platform: Items per platform (default: 20)
+        """
+        calls = self._calls(query, platforms, limit_per_platform)
+        share = self._share(len(calls))
+        timings: Dict[str, float] = {}
+        started = time.monotonic()
+
+        def timed(platform: str, tool: SocialTool, kwargs: Dict[str, Any]) -> str:
+            try:
+                return tool._call(tool._payload(**kwargs), share)
+            finally:
+                timings[platform] = round(time.monotonic() - started, 3)
+
+        with within(self.deadline):
+            # Each call gets its own copy of the context, deadline included.
+            futures = {
+                platform: _fanout_pool.submit(copy_context().run, timed, platform, tool, kwargs)
+                for platform, (tool, kwargs) in calls.items()
+            }
+        wait(futures.values(), timeout=self.deadline)
+        finished = {}
+        for platform, future in futures.items():
+            if future.done():
+                finished[platform] = future.result()
+            else:
+                future.cancel()
+        return self._summarize(query, list(calls), finished, timings, started)
+
+    async def _arun(
+        self,
+        query: str,
+        platforms: List[str] = None,
+        limit_per_platform: int = 20
+    ) -> str:
+        """Async ``_run``: platforms still running at the deadline are cancelled, which
+        closes their connections so the server stops those scrapes too."""
+        calls = self._calls(query, platforms, limit_per_platform)
+        share = self._share(len(calls))
+        timings: Dict[str, float] = {}
+        started = time.monotonic()
+
+        async def timed(platform: str, tool: SocialTool, kwargs: Dict[str, Any]) -> str:
+            try:
+                return await tool._acall(tool._payload(**kwargs), share)
+            finally:
+                timings[platform] = round(time.monotonic() - started, 3)
+
+        with within(self.deadline):
+            tasks = {
+                platform: asyncio.ensure_future(timed(platform, tool, kwargs))
+                for platform, (tool, kwargs) in calls.items()
+            }
+        await asyncio.wait(tasks.values(), timeout=self.deadline)
+        finished = {}
+        for platform, task in tasks.items():
+            if task.done():
+                finished[platform] = task.result()
+            else:
+                task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return self._summarize(query, list(calls), finished, timings, started)
 
 
 # Convenience function to get all tools
-def get_crew_social_tools(base_url: str = "http://localhost:8001") -> Dict[str, BaseTool]:
+def get_crew_social_tools(
+    base_url: str = "http://localhost:8001", output_tokens: Optional[Dict[str, int]] = None,
+    uds: Optional[str] = None,
+) -> Dict[str, BaseTool]:
     """
     Get all crew-social-tools as CrewAI tools.
 
+    ``output_tokens`` sets per-tool output budgets by key (e.g. {"twitter": 2500,
+    "aggregator": 4000}); others use CrewSocialToolsConfig.output.max_tokens. ``uds``
+    sends the requests over that Unix socket instead of TCP.
+
     Usage:
         tools = get_crew_social_tools()
         agent = Agent(
@@ -444,13 +936,14 @@ def get_crew_social_tools(base_url: str = "http://localhost:8001") -> Dict[str,
             ...
         )
     """
-    config = CrewSocialToolsConfig(base_url=base_url)
-
-    return {
-        "twitter": TwitterSearchTool(config=config),
-        "youtube": YouTubeSearchTool(config=config),
-        "reddit": RedditScanTool(config=config),
-        "instagram": InstagramFetchTool(config=config),
-        "ddg": DDGSearchTool(config=config),
-        "aggregator": SocialMediaAggregator(config=config),
+    config = CrewSocialToolsConfig(base_url=base_url, uds=uds)
+    budgets = output_tokens or {}
+    classes = {
+        "twitter": TwitterSearchTool,
+        "youtube": YouTubeSearchTool,
+        "reddit": RedditScanTool,
+        "instagram": InstagramFetchTool,
+        "ddg": DDGSearchTool,
+        "aggregator": SocialMediaAggregator,
     }
+    return {key: cls(config=config, max_output_tokens=budgets.get(key)) for key, cls in classes.items()}
@@ -5,249 +5,370 @@ Exposes social media scraping tools via Model Context Protocol
 """
 import asyncio
 import json
-import sys
-from typing import Any, Dict, List, Optional
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Type
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 
 import httpx
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
-# Configuration
-CREW_TOOLS_URL = "http://localhost:8001"
+# Only the argument models: the scraper modules (and their libraries) are imported by the
+# in-process backend alone, so the http backend needs just mcp, httpx and pydantic.
+from app.tools.args import DDGArgs, InstagramArgs, RedditArgs, SearxArgs, TikTokArgs, TwitterArgs, YouTubeArgs
 
+# stdout carries the protocol; log records go to stderr
+logger = logging.getLogger("crew-social-tools")
+
+# Backend: "http" forwards calls to the FastAPI server at CREW_TOOLS_URL; "inprocess" runs
+# the tools in this process and needs no server.
+CREW_TOOLS_BACKEND = os.getenv("CREW_TOOLS_BACKEND", "http")
+# Configuration: the server's http(s) URL; when co-located, also CREW_TOOLS_UDS=/path/to.sock
+# to send those requests over the Unix socket instead of TCP
+CREW_TOOLS_URL = os.getenv("CREW_TOOLS_URL", "http://localhost:8001")
+CREW_TOOLS_UDS = os.getenv("CREW_TOOLS_UDS") or None
+ETAG_CACHE_SIZE = 128
+CALL_TIMEOUT = 60.0
+# Tools are asked to return partial results this long before CALL_TIMEOUT
+DEADLINE_MARGIN = 5.0
+# Calls of one tool allowed in flight at once; the rest wait their turn. Browser-driven and
+# heavily rate-limited scrapers get fewer. Override with e.g. CREW_TOOLS_CONCURRENCY='{"tiktok_search": 2}'
+DEFAULT_CONCURRENCY = 4
+TOOL_CONCURRENCY: Dict[str, int] = {"tiktok_search": 1, "instagram_fetch": 2}
+TOOL_CONCURRENCY.update(json.loads(os.getenv("CREW_TOOLS_CONCURRENCY", "{}")))
+# Items found so far are streamed to clients that send a progressToken, in batches of
+# BATCH_SIZE or every BATCH_INTERVAL seconds, whichever comes first
+BATCH_SIZE = 25
+BATCH_INTERVAL = 1.0
+LIMIT_FIELDS = ("limit", "max_items", "max_results", "num")
+TERMINAL = ("succeeded", "failed", "cancelled")
+
+
+class MCPTool(NamedTuple):
+    service_name: str  # key in app.service.TOOLS
+    endpoint: str
+    args: Type[BaseModel]  # what the server validates; also the source of the inputSchema
+    description: str
+
+
+TOOLS: Dict[str, MCPTool] = {
+    "twitter_search": MCPTool(
+        "twitter", "/v1/twitter/search", TwitterArgs,
+        "Search Twitter for tweets matching a query. Returns tweets with metrics (likes, retweets), author info, and content.",
+    ),
+    "youtube_search": MCPTool(
+        "youtube", "/v1/youtube/lookup", YouTubeArgs,
+        "Look up a YouTube video, a channel's recent uploads, or search results. Returns video metadata, view counts, and engagement metrics.",
+    ),
+    "reddit_scan": MCPTool(
+        "reddit", "/v1/reddit/scan", RedditArgs,
+        "Scan Reddit subreddit for posts. Returns posts with upvotes, comments, and content.",
+    ),
+    "instagram_fetch": MCPTool(
+        "instagram", "/v1/instagram/fetch", InstagramArgs,
+        "Fetch Instagram content from profiles, hashtags, or posts. Returns posts with likes, comments, and media.",
+    ),
+    "tiktok_search": MCPTool(
+        "tiktok", "/v1/tiktok/search", TikTokArgs,
+        "Fetch trending TikTok videos, or videos for a hashtag, user or query. Note: May return limited results due to TikTok's anti-scraping measures.",
+    ),
+    "ddg_search": MCPTool(
+        "ddg", "/v1/search/ddg", DDGArgs,
+        "Search DuckDuckGo for web content. Good fallback for general web search without API keys.",
+    ),
+    "searxng_search": MCPTool(
+        "searxng", "/v1/search/searxng", SearxArgs,
+        "Search using SearxNG meta-search engine (if configured). Aggregates results from multiple search engines.",
+    ),
+}
+
+
+def input_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema of a tool's arguments exactly as the server validates them."""
+    schema = model.model_json_schema()
+    schema.pop("title", None)
+    for prop in schema.get("properties", {}).values():
+        prop.pop("title", None)
+    return schema
+
+
+def invalid_arguments(e: ValidationError) -> Dict[str, Any]:
+    problems = "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'arguments'}: {err['msg']}" for err in e.errors())
+    return {"error": {"error": problems, "code": "INVALID_ARGUMENTS", "retryable": False,
+                      "hint": "fix the arguments to match the tool's inputSchema"}}
+
+
+def expected_items(args: BaseModel) -> Optional[int]:
+    """The most items a call can return, as the ``total`` of its progress notifications."""
+    return next((getattr(args, f) for f in LIMIT_FIELDS if isinstance(getattr(args, f, None), int)), None)
+
+
+Emit = Callable[[List[Dict[str, Any]], int], Awaitable[None]]
+
+
+class ItemStream:
+    """Collects items as a tool finds them and hands them to ``emit`` in batches.
+
+    ``push`` may be called from executor threads. Whatever is left is emitted on exit.
+    """
+
+    def __init__(self, emit: Emit, size: int = BATCH_SIZE, interval: float = BATCH_INTERVAL):
+        self.emit = emit
+        self.size = size
+        self.interval = interval
+        self.sent = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._wake = asyncio.Event()
+        self._closed = False
+
+    def push(self, item: Dict[str, Any]) -> None:
+        self._loop.call_soon_threadsafe(self._add, item)
+
+    def _add(self, item: Dict[str, Any]) -> None:
+        self._pending.append(item)
+        if len(self._pending) >= self.size:
+            self._wake.set()
+
+    async def _flush(self) -> None:
+        if self._pending:
+            batch, self._pending = self._pending, []
+            self.sent += len(batch)
+            await self.emit(batch, self.sent)
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._flush()
+
+    async def __aenter__(self) -> "ItemStream":
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        # Items pushed from threads before the call returned are already queued on the loop
+        await asyncio.sleep(0)
+        self._closed = True
+        self._wake.set()
+        await self._task
+
+
+class HTTPBackend:
+    """Forwards tool calls to a crew-social-tools server (remote deployments)."""
+
+    def __init__(self, url: str = CREW_TOOLS_URL, uds: Optional[str] = CREW_TOOLS_UDS):
+        self.url = url
+        transport = httpx.AsyncHTTPTransport(uds=uds) if uds else None
+        self.client = httpx.AsyncClient(timeout=CALL_TIMEOUT, transport=transport)
+        # (url, arguments) -> (etag, body) of the last successful call, for revalidation
+        self._etags: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        # Cancellations of abandoned jobs still in flight; the loop only keeps weak references
+        self._deletes: Set[asyncio.Task] = set()
+
+    async def call(self, tool: str, args: BaseModel, stream: Optional[ItemStream] = None) -> Dict[str, Any]:
+        if stream is not None:
+            return await self.follow_job(tool, args, stream)
+        return await self.post_json(f"{self.url}{TOOLS[tool].endpoint}", args.model_dump(mode="json"))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def follow_job(self, tool: str, args: BaseModel, stream: ItemStream) -> Dict[str, Any]:
+        """Run the call as a background job and stream its items as the job collects them.
+
+        Falls back to a plain call when the job queue is full or the job is gone (404). At the
+        deadline the job is cancelled and the items collected so far are returned as a partial result.
+        """
+        response = await self.client.post(f"{self.url}/v1/jobs", json={
+            "tool": TOOLS[tool].service_name, "args": args.model_dump(mode="json"),
+        })
+        if response.status_code == 429:
+            return await self.call(tool, args)
+        response.raise_for_status()
+        job_url = f"{self.url}/v1/jobs/{response.json()['id']}"
+        items: List[Dict[str, Any]] = []
+
+        async def collect() -> None:
+            while True:
+                response = await self.client.get(f"{job_url}/results", params={"offset": len(items), "limit": 500})
+                response.raise_for_status()
+                page = response.json()
+                items.extend(page["items"])
+                for item in page["items"]:
+                    stream.push(item)
+                if not page["items"] or page["next_offset"] is None:
+                    return
+
+        async def follow() -> Dict[str, Any]:
+            async with self.client.stream("GET", f"{job_url}/events", timeout=None) as events:
+                events.raise_for_status()
+                async for line in events.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    status = json.loads(line[len("data:"):])
+                    if status["progress"] > len(items) or status["status"] in TERMINAL:
+                        await collect()
+                    if status["status"] in TERMINAL:
+                        return status
+            raise httpx.ReadError("job event stream ended early")
+
+        try:
+            status = await asyncio.wait_for(follow(), CALL_TIMEOUT - DEADLINE_MARGIN)
+        except asyncio.TimeoutError:
+            await self.client.delete(job_url)
+            return {"items": items, "partial": True, "partial_reason": "deadline exceeded"}
+        except asyncio.CancelledError:
+            task = asyncio.ensure_future(self.client.delete(job_url))
+            self._deletes.add(task)
+            task.add_done_callback(self._deletes.discard)
+            raise
+        except httpx.HTTPStatusError as e:
+            # The job expired (or was evicted) before all its results were read
+            if e.response.status_code != 404:
+                raise
+            return await self.post_json(f"{self.url}{TOOLS[tool].endpoint}", args.model_dump(mode="json"))
+        if status["status"] == "failed":
+            return {"error": status["error"]}
+        if status["status"] == "cancelled":
+            return {"items": items, "partial": True, "partial_reason": "job cancelled"}
+        return {"items": items}
+
+    async def post_json(self, url: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a tool call; an unchanged result comes back as a 304 and is served locally."""
+        key = url + "\n" + json.dumps(arguments, sort_keys=True)
+        # Ask the backend to return partial results before our own timeout fires
+        headers = {"X-Request-Timeout": f"{CALL_TIMEOUT - DEADLINE_MARGIN:g}"}
+        previous = self._etags.get(key)
+        if previous is not None:
+            headers["If-None-Match"] = previous[0]
+        response = await self.client.post(url, json=arguments, headers=headers)
+        if response.status_code == 304 and previous is not None:
+            self._etags.move_to_end(key)
+            return previous[1]
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get("etag")
+        if etag and not data.get("error"):
+            self._etags[key] = (etag, data)
+            self._etags.move_to_end(key)
+            while len(self._etags) > ETAG_CACHE_SIZE:
+                self._etags.popitem(last=False)
+        return data
+
+
+class InProcessBackend:
+    """Runs the app's tools in this process through ``app.service``.
+
+    Calls get the server's result cache, rate limits, deadlines and blocking-call executor,
+    without the HTTP hop or a second service to run. The prewarmer and job queue are not
+    started.
+    """
 
-class MCPServer:
     def __init__(self):
+        # Imported here: the service layer and analytics are only needed in this mode.
+        from app import service
+        from app.common import progress
+        from app.common.schemas import UnifiedResponse
+        from app.tools import searxng
+        self.service = service
+        self.response_model = UnifiedResponse
+        self.searxng = searxng
+        self.progress = progress
+
+    async def call(self, tool: str, args: BaseModel, stream: Optional[ItemStream] = None) -> Dict[str, Any]:
+        name = TOOLS[tool].service_name
+        spec = self.service.TOOLS[name]
+        try:
+            if stream is None:
+                result = await self.service.run(name, args, timeout=CALL_TIMEOUT - DEADLINE_MARGIN)
+            else:
+                # Tools report items as they collect them, from worker threads too
+                with self.progress.watching(lambda item: stream.push(item.model_dump(mode="json"))):
+                    result = await self.service.run(name, args, timeout=CALL_TIMEOUT - DEADLINE_MARGIN)
+        except Exception as e:
+            resp = self.response_model(error=self.service.error_model(e, spec.source, spec.error_code))
+        else:
+            resp = self.response_model(items=result.items, cached=result.cached,
+                                       partial=result.partial is not None, partial_reason=result.partial)
+        return resp.model_dump(mode="json")
+
+    async def aclose(self) -> None:
+        await self.searxng.aclose()
+
+
+def make_backend(kind: str = CREW_TOOLS_BACKEND):
+    if kind == "inprocess":
+        return InProcessBackend()
+    if kind == "http":
+        return HTTPBackend()
+    raise ValueError(f"CREW_TOOLS_BACKEND must be 'http' or 'inprocess', not {kind!r}")
+
+
+class MCPServer:
+    def __init__(self, backend=None):
         self.server = Server("crew-social-tools")
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.backend = backend if backend is not None else make_backend()
+        # Generated once from the argument models, so they cannot drift from the server
+        self.tools = [
+            Tool(name=name, description=tool.description, inputSchema=input_schema(tool.args))
+            for name, tool in TOOLS.items()
+        ]
+        # The lowlevel server runs each request in its own task; these bound each tool
+        self.limits = {name: asyncio.Semaphore(TOOL_CONCURRENCY.get(name, DEFAULT_CONCURRENCY)) for name in TOOLS}
         self.setup_handlers()
 
+    async def call_backend(self, name: str, args: BaseModel) -> Dict[str, Any]:
+        """Call the backend, streaming items to the client if it asked for progress."""
+        ctx = self.server.request_context
+        token = ctx.meta.progressToken if ctx.meta else None
+        if token is None:
+            return await self.backend.call(name, args)
+        total = expected_items(args)
+
+        async def emit(batch: List[Dict[str, Any]], sent: int) -> None:
+            try:
+                await ctx.session.send_progress_notification(
+                    token, sent, total=total, message=f"{sent} items so far", related_request_id=ctx.request_id)
+                await ctx.session.send_log_message(
+                    "info", {"tool": name, "items": batch}, logger="crew-social-tools", related_request_id=ctx.request_id)
+            except Exception as e:
+                # The full result still goes out; a lost notification is not worth failing for
+                logger.warning("progress notification failed: %s", e)
+
+        async with ItemStream(emit) as stream:
+            return await self.backend.call(name, args, stream)
+
     def setup_handlers(self):
         @self.server.list_tools()
         async def list_tools() -> List[Tool]:
-            return [
-                Tool(
-                    name="twitter_search",
-                    description="Search Twitter for tweets matching a query. Returns tweets with metrics (likes, retweets), author info, and content.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Search query (e.g., 'AI trends', '#viral')"
-                            },
-                            "since": {
-                                "type": "string",
-                                "description": "Start date (YYYY-MM-DD) - optional"
-                            },
-                            "until": {
-                                "type": "string",
-                                "description": "End date (YYYY-MM-DD) - optional"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum tweets to return (default: 50)",
-                                "default": 50
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                ),
-                Tool(
-                    name="youtube_search",
-                    description="Search YouTube for videos or get channel/video details. Returns video metadata, view counts, and engagement metrics.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "mode": {
-                                "type": "string",
-                                "enum": ["search", "video", "channel"],
-                                "description": "Search mode: 'search' for query, 'video' for video ID, 'channel' for channel ID"
-                            },
-                            "id_or_query": {
-                                "type": "string",
-                                "description": "Video ID, channel ID, or search query depending on mode"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum results to return (default: 25)",
-                                "default": 25
-                            }
-                        },
-                        "required": ["mode", "id_or_query"]
-                    }
-                ),
-                Tool(
-                    name="reddit_scan",
-                    description="Scan Reddit subreddit for posts. Returns posts with upvotes, comments, and content.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "subreddit": {
-                                "type": "string",
-                                "description": "Subreddit name (without r/)"
-                            },
-                            "sort": {
-                                "type": "string",
-                                "enum": ["hot", "new", "top", "rising"],
-                                "description": "Sort order (default: 'hot')",
-                                "default": "hot"
-                            },
-                            "time_filter": {
-                                "type": "string",
-                                "enum": ["hour", "day", "week", "month", "year", "all"],
-                                "description": "Time filter for 'top' sort (default: 'day')",
-                                "default": "day"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum posts to return (default: 50)",
-                                "default": 50
-                            }
-                        },
-                        "required": ["subreddit"]
-                    }
-                ),
-                Tool(
-                    name="instagram_fetch",
-                    description="Fetch Instagram content from profiles, hashtags, or posts. Returns posts with likes, comments, and media.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "mode": {
-                                "type": "string",
-                                "enum": ["profile", "hashtag", "post"],
-                                "description": "Fetch mode: 'profile', 'hashtag', or 'post'"
-                            },
-                            "target": {
-                                "type": "string",
-                                "description": "Username, hashtag (without #), or post shortcode"
-                            },
-                            "max_items": {
-                                "type": "integer",
-                                "description": "Maximum items to fetch (default: 30)",
-                                "default": 30
-                            }
-                        },
-                        "required": ["mode", "target"]
-                    }
-                ),
-                Tool(
-                    name="tiktok_search",
-                    description="Search TikTok for trending videos or specific queries. Note: May return limited results due to TikTok's anti-scraping measures.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "mode": {
-                                "type": "string",
-                                "enum": ["trending", "search"],
-                                "description": "Search mode: 'trending' or 'search'"
-                            },
-                            "query": {
-                                "type": "string",
-                                "description": "Search query (required for 'search' mode)"
-                            },
-                            "region": {
-                                "type": "string",
-                                "description": "Region code (e.g., 'US', 'GB') - for trending",
-                                "default": "US"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum results (default: 20)",
-                                "default": 20
-                            }
-                        },
-                        "required": ["mode"]
-                    }
-                ),
-                Tool(
-                    name="ddg_search",
-                    description="Search DuckDuckGo for web content. Good fallback for general web search without API keys.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Search query"
-                            },
-                            "region": {
-                                "type": "string",
-                                "description": "Region code (e.g., 'us-en', 'uk-en') - default: 'us-en'",
-                                "default": "us-en"
-                            },
-                            "max_results": {
-                                "type": "integer",
-                                "description": "Maximum results (default: 20)",
-                                "default": 20
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                ),
-                Tool(
-                    name="searxng_search",
-                    description="Search using SearxNG meta-search engine (if configured). Aggregates results from multiple search engines.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Search query"
-                            },
-                            "categories": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "Search categories (e.g., ['general', 'news', 'videos'])",
-                                "default": ["general"]
-                            },
-                            "engines": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "Specific search engines to use",
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum results (default: 20)",
-                                "default": 20
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                )
-            ]
+            return self.tools
 
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Any) -> List[TextContent]:
             """Handle tool calls"""
             try:
-                # Map tool names to API endpoints
-                endpoint_map = {
-                    "twitter_search": "/v1/twitter/search",
-                    "youtube_search": "/v1/youtube/lookup",
-                    "reddit_scan": "/v1/reddit/scan",
-                    "instagram_fetch": "/v1/instagram/fetch",
-                    "tiktok_search": "/v1/tiktok/search",
-                    "ddg_search": "/v1/search/ddg",
-                    "searxng_search": "/v1/search/searxng"
-                }
-
-                if name not in endpoint_map:
+                if name not in TOOLS:
                     return [TextContent(
                         type="text",
                         text=json.dumps({"error": f"Unknown tool: {name}"})
                     )]
 
-                endpoint = endpoint_map[name]
-                url = f"{CREW_TOOLS_URL}{endpoint}"
-
-                # Make request to FastAPI backend
-                response = await self.client.post(url, json=arguments)
-                response.raise_for_status()
-                data = response.json()
+                # Validate here: a bad call costs no round trip and gets a precise message.
+                try:
+                    args = TOOLS[name].args.model_validate(arguments or {})
+                except ValidationError as e:
+                    data = invalid_arguments(e)
+                else:
+                    async with self.limits[name]:
+                        data = await self.call_backend(name, args)
 
                 # Format response
                 if data.get("error"):
@@ -257,12 +378,15 @@ class MCPServer:
                         "error": error_info.get("error"),
                         "code": error_info.get("code"),
                         "retryable": error_info.get("retryable", False),
-                        "hint": error_info.get("hint")
+                        "hint": error_info.get("hint"),
+                        "retry_after": error_info.get("retry_after")
                     }
                 else:
                     result = {
                         "success": True,
                         "count": len(data.get("items", [])),
+                        "partial": data.get("partial", False),
+                        "partial_reason": data.get("partial_reason"),
                         "items": data.get("items", [])
                     }
 
@@ -277,7 +401,7 @@ class MCPServer:
                     text=json.dumps({
                         "success": False,
                         "error": f"HTTP error: {str(e)}",
-                        "hint": "Ensure crew-social-tools FastAPI server is running on localhost:8001"
+                        "hint": f"Ensure crew-social-tools FastAPI server is running at {CREW_TOOLS_UDS or CREW_TOOLS_URL}"
                     })
                 )]
             except Exception as e:
@@ -291,12 +415,15 @@ class MCPServer:
 
     async def run(self):
         """Run the MCP server"""
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                self.server.create_initialization_options()
-            )
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    self.server.create_initialization_options()
+                )
+        finally:
+            await self.backend.aclose()
 
 
 async def main():
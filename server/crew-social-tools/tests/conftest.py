@@ -0,0 +1,5 @@
+import os, sys
+
+# The app and the client modules are imported from this directory, as when the service runs.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PREWARM_ENABLED", "false")
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from app.analytics.clustering import ClusterArgs, TopicClusterer, topic_clusterer
+from app.common.schemas import UnifiedItem
+
+_TOPICS = (
+    "electric car battery charging range",
+    "sourdough bread starter flour baking",
+)
+
+
+def _item(i: int, text: str) -> UnifiedItem:
+    return UnifiedItem(source="reddit", id=f"p{i}", title=f"{text} post{i}", score=10.0)
+
+
+def test_batches_split_by_topic_and_stay_sparse():
+    tc = TopicClusterer()
+    now = 1_000_000 * 900.0
+    items = [_item(i, _TOPICS[i % 2]) for i in range(40)]
+    assert tc.add(items[:20], ts=now) == 20
+    assert tc.add(items[20:], ts=now) == 20
+    top = tc.top(window_minutes=30, order_by="size", now=now)
+    assert [c.size for c in top] == [20, 20]
+    assert {frozenset(c.terms[:5]) for c in top} == {frozenset(t.split()) for t in _TOPICS}
+    for idx, val in filter(None, tc._centroids):
+        assert idx.shape == val.shape and idx.shape[0] < 64
+        assert np.isclose(np.linalg.norm(val), 1.0)
+
+
+def test_seeds_beyond_capacity_never_recycle_this_batchs_clusters():
+    tc = TopicClusterer(max_clusters=2)
+    now = 1_000_000 * 900.0
+    texts = [_TOPICS[0]] * 3 + [_TOPICS[1]] * 3 + ["guitar chords strumming lesson", "marathon training pace"]
+    assert tc.add([_item(i, text) for i, text in enumerate(texts)], ts=now) == 8
+    top = tc.top(window_minutes=30, min_items=1, order_by="size", now=now)
+    # The first two topics keep their clusters; the overflow joins one of them.
+    assert {c.id for c in top} == {1, 2} and sum(c.size for c in top) == 8
+    assert {frozenset(c.terms[:5]) for c in top} == {frozenset(t.split()) for t in _TOPICS}
+
+
+def test_full_day_window_compares_with_the_day_before():
+    tc = TopicClusterer()
+    now = 1_000_000 * 900.0
+    tc.add([_item(i, _TOPICS[0]) for i in range(3)], ts=now - 30 * 3600)
+    tc.add([_item(i, _TOPICS[0]) for i in range(3, 9)], ts=now - 3600)
+    [cluster] = tc.top(window_minutes=24 * 60, now=now)
+    assert (cluster.recent_items, cluster.previous_items) == (6, 3)
+
+
+def test_window_past_ring_is_rejected():
+    tc = TopicClusterer(buckets=16)
+    with pytest.raises(ValueError):
+        tc.top(window_minutes=121)
+    assert ClusterArgs(window_minutes=24 * 60).window_minutes == topic_clusterer.max_window_minutes
+    with pytest.raises(ValidationError):
+        ClusterArgs(window_minutes=topic_clusterer.max_window_minutes + 1)
@@ -0,0 +1,90 @@
+import asyncio
+from app import service
+from app.common import deadline, progress
+from app.common.schemas import UnifiedItem
+from app.tools.reddit_praw import RedditArgs
+
+
+def _slow_reddit(monkeypatch, calls):
+    async def scan(args):
+        calls.append(args)
+        for i in range(4):
+            item = UnifiedItem(source="reddit", id=f"p{i}", title=f"post {i}")
+            progress.report(item)
+            await asyncio.sleep(0.1)
+        return [UnifiedItem(source="reddit", id=f"p{i}", title=f"post {i}") for i in range(4)]
+
+    monkeypatch.setitem(service.TOOLS, "reddit", service.TOOLS["reddit"]._replace(fn=scan))
+    monkeypatch.setattr(service, "ingest", lambda items, region=None: None)
+
+
+def test_deadline_bound_callers_share_one_scrape(monkeypatch):
+    calls = []
+    _slow_reddit(monkeypatch, calls)
+    args = RedditArgs(subreddit="coalesce")
+    key = service.cache_key("reddit", args)
+
+    async def scenario():
+        streamed = []
+
+        async def streaming():
+            with progress.watching(streamed.append):
+                return await service.run("reddit", args, timeout=0.25)
+
+        short, streamed_result, full = await asyncio.gather(
+            service.run("reddit", args, timeout=0.15), streaming(), service.run("reddit", args))
+        assert len(calls) == 1
+        assert short.partial == "deadline exceeded" and 1 <= len(short.items) < 4
+        assert streamed_result.partial and [i.id for i in streamed] == [i.id for i in streamed_result.items]
+        assert full.partial is None and len(full.items) == 4
+        assert [i.id for i in service.result_cache.get(key)] == ["p0", "p1", "p2", "p3"]
+
+    asyncio.run(scenario())
+
+
+def test_scrape_runs_to_the_latest_callers_deadline(monkeypatch):
+    calls = []
+    _slow_reddit(monkeypatch, calls)
+    args = RedditArgs(subreddit="partial")
+    key = service.cache_key("reddit", args)
+
+    async def later():
+        await asyncio.sleep(0.05)
+        return await service.run("reddit", args, timeout=5)
+
+    async def scenario():
+        first, second = await asyncio.gather(service.run("reddit", args, timeout=0.15), later())
+        # The first caller's deadline did not stop the scrape the second caller joined.
+        assert first.partial and len(first.items) < 4
+        assert len(calls) == 1 and second.partial is None and len(second.items) == 4
+        assert len(service.result_cache.get(key)) == 4
+
+    asyncio.run(scenario())
+
+
+def test_scrape_stops_at_the_flight_deadline_and_is_not_cached(monkeypatch):
+    seen = []
+
+    async def scan(args):
+        seen.append(deadline.current())
+        for i in range(10):
+            if deadline.expired():
+                break
+            progress.report(UnifiedItem(source="reddit", id=f"p{i}", title=f"post {i}"))
+            await asyncio.sleep(0.05)
+        return []
+
+    monkeypatch.setitem(service.TOOLS, "reddit", service.TOOLS["reddit"]._replace(fn=scan))
+    monkeypatch.setattr(service, "ingest", lambda items, region=None: None)
+    args = RedditArgs(subreddit="bounded")
+
+    async def scenario():
+        result = await service.run("reddit", args, timeout=0.12)
+        assert result.partial == "deadline exceeded" and 1 <= len(result.items) < 10
+        await asyncio.sleep(0.1)
+        # The tool ran under the flight's budget, which stopped it; nothing was cached.
+        [budget] = seen
+        assert budget is not None and budget.reason == "deadline exceeded"
+        assert service.result_cache.get(service.cache_key("reddit", args)) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,137 @@
+import json, threading, time
+import httpx
+import pytest
+
+crewai_integration = pytest.importorskip("crewai_integration")
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Answers every tool call with one item; records the requests made."""
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"items": [{"id": "1", "title": "hit"}]})
+
+    client = httpx.Client(transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(crewai_integration._pool, "client", lambda uds: client)
+    return requests
+
+
+def test_memo_key_normalizes_whitespace_and_case_insensitive_fields():
+    tools = crewai_integration.get_crew_social_tools()
+    twitter, youtube = tools["twitter"], tools["youtube"]
+    assert twitter._memo_key({"query": "AI  trends ", "limit": 5}) == twitter._memo_key({"query": "ai trends", "limit": 5})
+    assert twitter._memo_key({"query": "ai", "limit": 5}) != twitter._memo_key({"query": "ai", "limit": 6})
+    # YouTube ids are case-sensitive, and the same payload on another endpoint is another call.
+    assert youtube._memo_key({"mode": "video", "id_or_query": "aBc"}) != youtube._memo_key({"mode": "video", "id_or_query": "abc"})
+    assert twitter._memo_key({"query": "x"}) != tools["ddg"]._memo_key({"query": "x"})
+
+
+def test_shared_memo_reports_each_runs_own_stats(server):
+    twitter = crewai_integration.get_crew_social_tools()["twitter"]
+    shared = crewai_integration.ToolMemo(ttl=60)
+    with crewai_integration.memoized(shared) as first:
+        twitter._run(query="AI trends")
+        twitter._run(query="ai  TRENDS")
+    with crewai_integration.memoized(shared) as second:
+        twitter._run(query="AI trends")
+    assert len(server) == 1
+    assert (first.stats()["hits"], first.stats()["misses"]) == (1, 1)
+    assert second.stats() == {"hits": 1, "misses": 0, "entries": 1, "hit_rate": 1.0}
+    assert shared.stats()["hits"] == 2
+
+
+def _tool_over(monkeypatch, handle, **retry):
+    client = httpx.Client(transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(crewai_integration._pool, "client", lambda uds: client)
+    config = crewai_integration.CrewSocialToolsConfig(
+        timeout=60.0, retry=crewai_integration.RetryPolicy(base_delay=0.01, **retry))
+    return crewai_integration.TwitterSearchTool(config=config)
+
+
+def test_retries_only_get_the_budget_left(monkeypatch):
+    timeouts = []
+
+    def handle(request):
+        timeouts.append((request.extensions["timeout"]["read"], float(request.headers["X-Request-Timeout"])))
+        if len(timeouts) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"items": []})
+
+    result = json.loads(_tool_over(monkeypatch, handle, budget=2.0)._run(query="ai"))
+    assert result["success"]
+    (first_read, first_deadline), (retry_read, retry_deadline) = timeouts
+    assert first_read == 60.0 and first_deadline == 55.0
+    assert retry_read <= 2.0 and retry_deadline < 2.0
+
+
+def test_read_timeouts_are_not_retried(monkeypatch):
+    calls = []
+
+    def handle(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    result = json.loads(_tool_over(monkeypatch, handle)._run(query="ai"))
+    assert len(calls) == 1 and result["success"] is False
+
+
+def test_final_error_status_is_reported_like_an_error_body(monkeypatch):
+    def handle(request):
+        return httpx.Response(503, headers={"Retry-After": "0"}, json={"detail": "draining"})
+
+    result = json.loads(_tool_over(monkeypatch, handle, max_attempts=2)._run(query="ai"))
+    assert result == {
+        "success": False, "error": "HTTP 503: draining", "code": "HTTP_503", "retryable": True,
+        "hint": "crew-social-tools is busy or restarting; retry later", "retry_after": 0.0, "attempts": 2,
+    }
+
+
+def test_youtube_tool_documents_the_server_modes():
+    from typing import get_args
+    from app.tools.args import YouTubeArgs
+    doc = crewai_integration.YouTubeSearchTool._run.__doc__
+    modes = get_args(YouTubeArgs.model_fields["mode"].annotation)
+    assert all(f'"{mode}"' in doc for mode in modes) and '"channel"' not in doc
+
+
+def test_aggregator_reports_slow_and_failing_platforms_without_waiting(monkeypatch):
+    release = threading.Event()
+
+    def handle(request):
+        if request.url.path == "/v1/twitter/search":
+            release.wait(5)  # still running at the deadline
+        if request.url.path == "/v1/youtube/lookup":
+            return httpx.Response(400, json={"detail": "bad mode"})
+        return httpx.Response(200, json={"items": [{"id": "r1", "title": "post"}]})
+
+    client = httpx.Client(transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(crewai_integration._pool, "client", lambda uds: client)
+    aggregator = crewai_integration.SocialMediaAggregator(deadline=0.3)
+    started = time.monotonic()
+    try:
+        result = json.loads(aggregator._run(query="ai"))
+    finally:
+        release.set()
+    assert time.monotonic() - started < 2.0
+    platforms, summary = result["platforms"], result["summary"]
+    assert platforms["twitter"]["timed_out"] and summary["timed_out"] == ["twitter"]
+    assert platforms["youtube"]["success"] is False and platforms["youtube"]["code"] == "HTTP_400"
+    assert platforms["reddit"]["success"] and summary["platforms_completed"] == 2 and summary["total_items"] == 1
+
+
+def test_shaping_trims_to_the_budget_and_stays_well_formed():
+    items = [{"id": str(i), "title": f"item {i}", "text": "x" * 1000, "metrics": {"likes": i, "views": None},
+              "raw": {"unused": True}} for i in range(50)]
+    shape = crewai_integration.OutputShape(max_tokens=300, text_chars=100)
+    out = shape.shape(items, "posts", query="ai")
+    data = json.loads(out)
+    assert crewai_integration.estimate_tokens(out) <= 300
+    assert 0 < data["count"] < 50 and data["count"] + data["omitted"] == data["total"] == 50
+    assert data["query"] == "ai" and [p["id"] for p in data["posts"]] == [str(49 - i) for i in range(data["count"])]
+    first = data["posts"][0]
+    assert set(first) == {"id", "title", "text", "metrics"} and first["metrics"] == {"likes": 49}
+    assert len(first["text"]) == 100 and first["text"].endswith("…")
+    assert json.loads(crewai_integration.OutputShape(max_tokens=None).shape(items, "posts"))["count"] == 50
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from app import main, service
+from app.common.schemas import UnifiedItem
+from app.tools.reddit_praw import RedditArgs
+
+
+class Request:
+    """Stands in for a Starlette request whose client hangs up after ``polls`` checks."""
+
+    def __init__(self, polls: int):
+        self.polls = polls
+
+    async def is_disconnected(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+
+def test_scrape_is_cancelled_when_the_client_disconnects(monkeypatch):
+    monkeypatch.setattr(main.settings, "disconnect_poll_seconds", 0.02)
+    state = {"cancelled": False}
+
+    async def scan(args):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        return [UnifiedItem(source="reddit", id="p1")]
+
+    monkeypatch.setitem(service.TOOLS, "reddit", service.TOOLS["reddit"]._replace(fn=scan))
+    disconnects = service.waste.stats()["disconnects"]
+
+    async def scenario():
+        with pytest.raises(main.ClientDisconnected):
+            await main._unless_disconnected(Request(polls=2), service.run("reddit", RedditArgs(subreddit="gone")))
+
+    asyncio.run(scenario())
+    assert state["cancelled"] and service.waste.stats()["disconnects"] == disconnects + 1
+    assert service.waste.stats()["sources"]["reddit"]["cancelled"] >= 1
+
+
+def test_connected_client_gets_the_result(monkeypatch):
+    monkeypatch.setattr(main.settings, "disconnect_poll_seconds", 0.02)
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    assert asyncio.run(main._unless_disconnected(Request(polls=100), slow())) == "done"
@@ -0,0 +1,34 @@
+import pytest
+from pydantic import ValidationError
+from app.analytics.heavy_hitters import HeavyHitters, TrendingTermsArgs, heavy_hitters
+from app.common.schemas import UnifiedItem
+
+
+def _item(i: int, text: str, lang: str = None) -> UnifiedItem:
+    return UnifiedItem(source="youtube", id=f"v{i}", title=text, lang=lang)
+
+
+def test_long_window_counts_every_bucket():
+    hh = HeavyHitters(bucket_seconds=300, buckets=24)
+    now = 1_000_000 * 300
+    # One sighting per bucket across the full two hours before `now`.
+    for step in range(24):
+        hh.add([_item(step, "#launch")], ts=now - step * 300)
+    top = hh.top(window_minutes=hh.max_window_minutes, now=now)
+    assert hh.max_window_minutes == 60
+    assert top[0].term == "launch" and top[0].count == 12 and top[0].previous == 12
+
+
+def test_window_past_ring_is_rejected():
+    hh = HeavyHitters(bucket_seconds=300, buckets=24)
+    with pytest.raises(ValueError):
+        hh.top(window_minutes=61)
+    with pytest.raises(ValidationError):
+        TrendingTermsArgs(window_minutes=heavy_hitters.max_window_minutes + 1)
+
+
+def test_region_is_not_taken_from_language():
+    hh = HeavyHitters()
+    hh.add([_item(0, "#fútbol", lang="es")])
+    assert hh.top(region="es") == []
+    assert [t.term for t in hh.top(region=None)] == ["fútbol"]
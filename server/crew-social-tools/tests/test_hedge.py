@@ -0,0 +1,63 @@
+import asyncio, time
+import pytest
+from app import service
+from app.common.schemas import UnifiedItem
+from app.hedge import HedgedSearch, WebSearchArgs
+from app.service import RunResult
+
+
+def _backends(monkeypatch, behaviour):
+    """Stands in for service.run: ``behaviour[name]`` is (seconds, items or an exception)."""
+    calls = {}
+
+    async def run(name, args, timeout=None):
+        calls[name] = {"started": time.monotonic(), "cancelled": False}
+        seconds, outcome = behaviour[name]
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            calls[name]["cancelled"] = True
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return RunResult([UnifiedItem(source=name, url=f"https://{u}.example") for u in outcome], False)
+
+    monkeypatch.setattr(service, "run", run)
+    return calls
+
+
+def _search(hedger, **kwargs):
+    async def go():
+        started = time.monotonic()
+        result = await hedger.search(WebSearchArgs(query="q", **kwargs))
+        return started, result
+    return asyncio.run(go())
+
+
+def test_fast_primary_never_hedges(monkeypatch):
+    calls = _backends(monkeypatch, {"ddg": (0.01, ["a"]), "searxng": (0.01, ["b"])})
+    hedger = HedgedSearch(default_delay=0.2)
+    _, result = _search(hedger)
+    assert [i.source for i in result.items] == ["ddg"] and list(calls) == ["ddg"] and hedger.hedged == 0
+
+
+def test_hedge_fires_after_the_delay_and_the_first_answer_wins(monkeypatch):
+    calls = _backends(monkeypatch, {"ddg": (1.0, ["a"]), "searxng": (0.05, ["b"])})
+    hedger = HedgedSearch(default_delay=0.15)
+    started, result = _search(hedger)
+    assert [i.source for i in result.items] == ["searxng"]
+    assert calls["searxng"]["started"] - started >= 0.15
+    # The slower primary was cancelled rather than left running.
+    assert calls["ddg"]["cancelled"] and hedger.hedged == 1 and hedger.wins == {"ddg": 0, "searxng": 1}
+
+
+def test_failing_primary_hedges_at_once(monkeypatch):
+    calls = _backends(monkeypatch, {"ddg": (0.0, RuntimeError("ddg down")), "searxng": (0.01, ["b"])})
+    started, result = _search(HedgedSearch(default_delay=5.0))
+    assert [i.source for i in result.items] == ["searxng"] and calls["searxng"]["started"] - started < 1.0
+
+
+def test_both_failing_raises_the_primary_error(monkeypatch):
+    _backends(monkeypatch, {"ddg": (0.0, RuntimeError("ddg down")), "searxng": (0.0, RuntimeError("searx down"))})
+    with pytest.raises(RuntimeError, match="ddg down"):
+        _search(HedgedSearch(default_delay=0.05))
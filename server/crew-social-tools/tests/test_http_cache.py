@@ -0,0 +1,78 @@
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.common import http_cache
+from app.common.http_cache import ConditionalCompressionMiddleware, etag_for
+
+BIG = {"items": ["x" * 40] * 50}
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ConditionalCompressionMiddleware)
+
+    @app.get("/v1/big")
+    def big():
+        return BIG
+
+    @app.get("/v1/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/v1/tagged")
+    def tagged():
+        return JSONResponse(BIG, headers={"ETag": 'W/"items-only"'})
+
+    @app.get("/v1/missing")
+    def missing():
+        return JSONResponse({"detail": "x" * 2000}, status_code=404)
+
+    @app.get("/v1/events")
+    def events():
+        return StreamingResponse(iter([b"data: {}\n\n"] * 100), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+def test_matching_if_none_match_gets_304():
+    client = _client()
+    etag = client.get("/v1/big").headers["etag"]
+    assert etag == etag_for(client.get("/v1/big", headers={"Accept-Encoding": "identity"}).content)
+    strong = etag[2:]  # weak comparison: W/"x" matches "x"
+    for header in (etag, strong, f'"other", {strong}', "*"):
+        response = client.get("/v1/big", headers={"If-None-Match": header})
+        assert response.status_code == 304 and response.content == b"" and response.headers["etag"] == etag
+    assert client.get("/v1/big", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_gzip_without_zstd_and_q_zero_respected(monkeypatch):
+    monkeypatch.setattr(http_cache, "zstandard", None)
+    client = _client()
+    response = client.get("/v1/big", headers={"Accept-Encoding": "zstd, gzip"})
+    assert response.headers["content-encoding"] == "gzip" and response.json() == BIG
+    assert int(response.headers["content-length"]) < len(response.content)  # content is decoded
+    refused = client.get("/v1/big", headers={"Accept-Encoding": "zstd, gzip;q=0"})
+    assert "content-encoding" not in refused.headers and refused.json() == BIG
+    assert "content-encoding" not in client.get("/v1/big", headers={"Accept-Encoding": "*;q=0"}).headers
+
+
+def test_small_bodies_stay_uncompressed():
+    response = _client().get("/v1/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers and response.json() == {"ok": True}
+    assert "etag" in response.headers
+
+
+def test_errors_and_streams_pass_through():
+    client = _client()
+    missing = client.get("/v1/missing", headers={"Accept-Encoding": "gzip"})
+    assert missing.status_code == 404 and "content-encoding" not in missing.headers and "etag" not in missing.headers
+    events = client.get("/v1/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in events.headers and "etag" not in events.headers
+    assert events.text.count("data: {}") == 100
+
+
+def test_endpoint_etag_is_kept():
+    client = _client()
+    response = client.get("/v1/tagged")
+    assert response.headers["etag"] == 'W/"items-only"'
+    assert client.get("/v1/tagged", headers={"If-None-Match": '"items-only"'}).status_code == 304
@@ -0,0 +1,64 @@
+import asyncio
+from app import jobs, service
+from app.common.schemas import UnifiedItem
+from app.common.shared_state import SQLiteBackend
+from app.tools.reddit_praw import RedditArgs
+
+
+def _workers(tmp_path):
+    # Two managers over one state file stand in for two pre-forked workers.
+    backend = SQLiteBackend(str(tmp_path / "state.db"))
+    return [jobs.JobManager(backend=backend, publish_interval=0.05) for _ in range(2)]
+
+
+async def _wait(manager, job_id, status):
+    for _ in range(100):
+        job = await manager.get(job_id)
+        if job is not None and job.status == status:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job never reached {status}")
+
+
+def test_job_is_visible_from_every_worker(tmp_path, monkeypatch):
+    async def collect(name, args, background=False, max_wait=None):
+        await asyncio.sleep(0.1)
+        return [UnifiedItem(source="reddit", id="p1", title="hello")]
+
+    monkeypatch.setattr(service, "collect", collect)
+
+    async def scenario():
+        owner, other = _workers(tmp_path)
+        owner.start()
+        try:
+            job = await owner.submit("reddit", RedditArgs(subreddit="python"))
+            seen = await other.get(job.id)
+            assert seen is not None and seen.status in ("queued", "running")
+            done = await _wait(other, job.id, "succeeded")
+            assert [i.id for i in done.items] == ["p1"]
+            assert await other.get("missing") is None
+        finally:
+            await owner.stop()
+
+    asyncio.run(scenario())
+
+
+def test_cancel_reaches_the_owning_worker(tmp_path, monkeypatch):
+    async def collect(name, args, background=False, max_wait=None):
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(service, "collect", collect)
+
+    async def scenario():
+        owner, other = _workers(tmp_path)
+        owner.start()
+        try:
+            job = await owner.submit("reddit", RedditArgs(subreddit="python"))
+            await _wait(other, job.id, "running")
+            await other.cancel(job.id)
+            await _wait(other, job.id, "cancelled")
+            assert job.status == "cancelled"
+        finally:
+            await owner.stop()
+
+    asyncio.run(scenario())
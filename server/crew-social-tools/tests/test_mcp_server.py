@@ -0,0 +1,99 @@
+import asyncio, json, os, subprocess, sys
+import httpx, pytest
+from pydantic import ValidationError
+
+mcp_server = pytest.importorskip("mcp_server")
+from mcp import types
+from app.tools.args import TikTokArgs
+
+
+class Backend:
+    def __init__(self):
+        self.calls = []
+
+    async def call(self, name, args, stream=None):
+        self.calls.append((name, args))
+        return {"items": [{"id": "v1"}]}
+
+    async def aclose(self):
+        pass
+
+
+def _server():
+    backend = Backend()
+    server = mcp_server.MCPServer(backend=backend)
+    # No MCP session here to read a progress token from; go straight to the backend.
+    server.call_backend = backend.call
+    return server, backend
+
+
+def _call(server, name, arguments):
+    handler = server.server.request_handlers[types.CallToolRequest]
+    request = types.CallToolRequest(method="tools/call", params=types.CallToolRequestParams(name=name, arguments=arguments))
+    return asyncio.run(handler(request)).root
+
+
+def test_http_backend_does_not_import_the_scrapers():
+    code = ("import sys, mcp_server; print([m for m in ('app.service', 'app.common.config', 'playwright', "
+            "'yt_dlp', 'praw', 'instaloader', 'duckduckgo_search') if m in sys.modules])")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_schemas_come_from_the_argument_models():
+    server, _ = _server()
+    listed = asyncio.run(server.server.request_handlers[types.ListToolsRequest](types.ListToolsRequest(method="tools/list")))
+    schemas = {tool.name: tool.inputSchema for tool in listed.root.tools}
+    assert set(schemas) == set(mcp_server.TOOLS)
+    tiktok = schemas["tiktok_search"]
+    assert tiktok["required"] == ["mode"]
+    assert tiktok["properties"]["mode"]["enum"] == ["trending", "hashtag", "user", "search"]
+    assert tiktok["properties"]["limit"]["maximum"] == 200
+    assert "title" not in tiktok and all("title" not in p for p in tiktok["properties"].values())
+
+
+def test_valid_call_reaches_the_backend_with_defaults_filled_in():
+    server, backend = _server()
+    result = _call(server, "tiktok_search", {"mode": "hashtag", "query_or_id": "cats"})
+    assert json.loads(result.content[0].text)["count"] == 1
+    [(name, args)] = backend.calls
+    assert name == "tiktok_search" and args == TikTokArgs(mode="hashtag", query_or_id="cats", region="GB", limit=50)
+
+
+def test_invalid_call_is_rejected_without_a_backend_call():
+    server, backend = _server()
+    result = _call(server, "tiktok_search", {"mode": "dance", "limit": 0})
+    assert result.isError and backend.calls == []
+
+
+def test_invalid_arguments_names_each_field():
+    with pytest.raises(ValidationError) as e:
+        TikTokArgs.model_validate({"mode": "dance", "limit": 0})
+    error = mcp_server.invalid_arguments(e.value)["error"]
+    assert error["code"] == "INVALID_ARGUMENTS" and not error["retryable"]
+    assert error["error"].startswith("mode: ") and "; limit: " in error["error"]
+
+
+def test_follow_job_falls_back_to_a_plain_call_when_the_job_is_gone():
+    posted = []
+
+    def handler(request):
+        path = request.url.path
+        if path == "/v1/jobs":
+            return httpx.Response(202, json={"id": "j1"})
+        if path == "/v1/jobs/j1/events":
+            return httpx.Response(200, text='data: {"status": "running", "progress": 3}\n\n')
+        if path == "/v1/jobs/j1/results":
+            return httpx.Response(404, json={"detail": "job not found"})
+        posted.append(path)
+        return httpx.Response(200, json={"items": [{"id": "v1"}]})
+
+    async def go():
+        backend = mcp_server.HTTPBackend(url="http://tools")
+        backend.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with mcp_server.ItemStream(lambda batch, sent: asyncio.sleep(0)) as stream:
+            return await backend.call("tiktok_search", TikTokArgs(mode="trending"), stream)
+
+    assert asyncio.run(go()) == {"items": [{"id": "v1"}]}
+    assert posted == [mcp_server.TOOLS["tiktok_search"].endpoint]
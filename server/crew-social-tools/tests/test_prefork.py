@@ -0,0 +1,25 @@
+import os, stat, threading, time
+import httpx
+import uvicorn
+from app import prefork
+from app.main import app
+
+
+def test_requests_are_served_over_the_unix_socket(tmp_path):
+    path = str(tmp_path / "cst.sock")
+    open(path, "w").close()  # left behind by a previous run
+    sock = prefork._bind_unix(path)
+    assert stat.S_ISSOCK(os.stat(path).st_mode) and stat.S_IMODE(os.stat(path).st_mode) == 0o660
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not server.started and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with httpx.Client(transport=httpx.HTTPTransport(uds=path), base_url="http://crew-tools") as client:
+            assert client.get("/health").json() == {"status": "ok"}
+    finally:
+        server.should_exit = True
+        thread.join(10)
+        sock.close()
@@ -0,0 +1,81 @@
+import asyncio
+from app import prewarm, service
+from app.common.cache import SharedTTLCache
+from app.common.ratelimit import RateLimiter
+from app.common.schemas import UnifiedItem
+from app.common.shared_state import SQLiteBackend
+from app.tools.instagram_instaloader import InstagramArgs
+
+
+def test_slow_source_is_warmed_from_a_full_bucket(monkeypatch):
+    limiter = RateLimiter({"instagram": 10})
+    monkeypatch.setattr(service, "rate_limiter", limiter)
+    monkeypatch.setattr(service, "popularity", service.QueryPopularity(half_life=3600))
+    collected = []
+
+    async def collect(name, args, background=False, max_wait=None):
+        collected.append((name, args, background))
+        return []
+
+    monkeypatch.setattr(service, "collect", collect)
+    args = InstagramArgs(mode="profile", target="natgeo")
+    service.popularity.pin("instagram", args)
+    warmer = prewarm.Prewarmer(top_n=1, reserve=0.5)
+
+    asyncio.run(warmer._refresh_source("instagram"))
+    assert collected == [("instagram", args, True)] and warmer.refreshed == 1
+    # The bucket is now below its reserve, so the next tick leaves it to foreground requests.
+    asyncio.run(warmer._refresh_source("instagram"))
+    assert warmer.skipped == 1 and len(collected) == 1
+
+
+def _stub_instagram(monkeypatch, scrapes, delay=0.0):
+    async def fetch(args):
+        scrapes.append(args)
+        await asyncio.sleep(delay)
+        return [UnifiedItem(source="instagram", id="p1", title="post")]
+
+    monkeypatch.setitem(service.TOOLS, "instagram", service.TOOLS["instagram"]._replace(fn=fetch))
+    monkeypatch.setattr(service, "ingest", lambda items, region=None: None)
+
+
+def test_refresh_joins_a_foreground_scrape_without_a_token(monkeypatch):
+    limiter = RateLimiter({"instagram": 600})
+    monkeypatch.setattr(service, "rate_limiter", limiter)
+    monkeypatch.setattr(service, "popularity", service.QueryPopularity(half_life=3600))
+    scrapes = []
+    _stub_instagram(monkeypatch, scrapes, delay=0.1)
+    args = InstagramArgs(mode="profile", target="coalesced")
+    service.popularity.pin("instagram", args)
+    warmer = prewarm.Prewarmer(top_n=1)
+
+    async def scenario():
+        foreground = asyncio.ensure_future(service.run("instagram", args))
+        await asyncio.sleep(0)
+        tokens = limiter.available("instagram")
+        await warmer._refresh_source("instagram")
+        assert limiter.available("instagram") >= tokens
+        await foreground
+
+    asyncio.run(scenario())
+    assert len(scrapes) == 1 and warmer.refreshed == 1
+
+
+def test_each_worker_warms_its_own_queries_once_across_workers(tmp_path, monkeypatch):
+    backend = SQLiteBackend(str(tmp_path / "state.db"))
+    monkeypatch.setattr(service, "shared_state", backend)
+    monkeypatch.setattr(service, "result_cache", SharedTTLCache(
+        backend, service._dump_items, service._load_items, max_entries=100, ttl=600))
+    monkeypatch.setattr(service, "rate_limiter", RateLimiter({"instagram": 600}))
+    scrapes = []
+    _stub_instagram(monkeypatch, scrapes)
+    shared, own = InstagramArgs(mode="profile", target="shared"), InstagramArgs(mode="profile", target="own")
+
+    # Each worker process counts its own requests; only the second has seen ``own``.
+    for queries in ([shared], [shared, own]):
+        monkeypatch.setattr(service, "popularity", service.QueryPopularity(half_life=3600))
+        for args in queries:
+            for _ in range(2):
+                service.popularity.record("instagram", args)
+        asyncio.run(prewarm.Prewarmer(top_n=2).tick())
+    assert scrapes == [shared, own]
@@ -0,0 +1,38 @@
+import math
+from app.analytics.scoring import ViralScorer, rank_items, score_items
+from app.common.schemas import MetricModel, UnifiedItem
+
+
+def _item(i: int, views: int, likes: int, source: str = "youtube") -> UnifiedItem:
+    return UnifiedItem(source=source, id=f"v{i}", title=f"video {i}", metrics=MetricModel(views=views, likes=likes))
+
+
+def test_known_batch_ranks_by_viral_score():
+    items = [_item(0, 1000, 10), _item(1, 50_000, 5_000), _item(2, 5000, 100), _item(3, 800, 5)]
+    ranked = rank_items(score_items(items, ViralScorer()))
+    assert [item.id for item in ranked] == ["v1", "v2", "v0", "v3"]
+    assert all(0 < item.score < 100 for item in ranked)
+    assert rank_items(items, mode="source") == items
+
+
+def test_identical_items_score_at_the_midpoint():
+    # Every feature has MAD == 0; the scale falls back to 1 instead of dividing by zero.
+    items = score_items([_item(i, 1000, 100) for i in range(5)], ViralScorer())
+    assert [item.score for item in items] == [50.0] * 5
+    assert [item.id for item in rank_items(items)] == ["v0", "v1", "v2", "v3", "v4"]
+
+
+def test_single_item():
+    [item] = score_items([_item(0, 1000, 100)], ViralScorer())
+    assert item.score == 50.0 and rank_items([item]) == [item]
+
+
+def test_items_without_history_or_metrics():
+    scorer = ViralScorer()
+    # A source never seen before, scored without updating, is judged against its own batch.
+    fresh = scorer.score([_item(0, 100, 1, "reddit"), _item(1, 100_000, 10_000, "reddit")], update=False)
+    assert fresh[1] > 50 > fresh[0] and scorer.stats()["reddit"]["samples"] == 0
+    bare = UnifiedItem(source="reddit", id="bare", title="no metrics")
+    items = score_items([bare, _item(2, 5000, 50, "reddit")], scorer)
+    assert bare.score is None and not math.isnan(items[1].score)
+    assert [item.id for item in rank_items(items)] == ["v2", "bare"]
@@ -0,0 +1,35 @@
+import os
+from app.analytics.search_index import LocalSearchArgs, SearchIndex
+from app.common.schemas import UnifiedItem
+
+
+def _item(i: int, title: str) -> UnifiedItem:
+    return UnifiedItem(source="reddit", id=f"p{i}", title=title)
+
+
+def test_memory_index_is_private_to_each_forked_worker():
+    index = SearchIndex(":memory:")
+    index.add([_item(0, "parent process post")])
+    pid = os.fork()
+    if pid == 0:
+        # A worker must not write through the parent's connection.
+        ok = len(index) == 0
+        index.add([_item(1, "worker process post")])
+        ok = ok and [i.id for i in index.search(LocalSearchArgs(query="worker"))] == ["p1"]
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert [i.id for i in index.search(LocalSearchArgs(query="process"))] == ["p0"]
+
+
+def test_file_index_is_shared_by_forked_workers(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.db"))
+    index.add([_item(0, "before fork")])
+    pid = os.fork()
+    if pid == 0:
+        ok = len(index) == 1
+        index.add([_item(1, "from the worker")])
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert len(index) == 2
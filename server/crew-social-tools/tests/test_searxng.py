@@ -0,0 +1,50 @@
+import asyncio
+import httpx
+from app.tools import searxng
+from app.tools.args import SearxArgs
+
+
+def _serve(monkeypatch, pages):
+    """Answers /search from ``pages[(category, pageno)]``; records the requests made."""
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        category, page = request.url.params.get("categories"), int(request.url.params["pageno"])
+        requests.append((category, page))
+        return httpx.Response(200, json={"results": pages.get((category, page), [])})
+
+    monkeypatch.setattr(searxng, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handle)))
+    return requests
+
+
+def _r(url, score, content=""):
+    return {"url": url, "title": url, "content": content, "score": score}
+
+
+def test_results_merge_by_url_across_pages_and_categories(monkeypatch):
+    _serve(monkeypatch, {
+        ("general", 1): [_r("https://a.example/x", 1.0), _r("https://b.example", 3.0)],
+        ("news", 1): [_r("https://B.example/", 1.0, "longer snippet"), _r("https://c.example", 0.5)],
+        ("general", 2): [_r("https://d.example", 0.2), _r("https://a.example/x/", 2.5)],
+    })
+    items = asyncio.run(searxng.search(SearxArgs(query="q", categories=["general", "news"], num=10, max_pages=2)))
+    # b: 3 + 1, a: 1 + 2.5, then c and d; a duplicate keeps the result with the longest snippet.
+    assert [searxng.url_key(item.url) for item in items] == [
+        "https://b.example", "https://a.example/x", "https://c.example", "https://d.example"]
+    assert items[0].url == "https://B.example/" and items[0].text == "longer snippet"
+
+
+def test_paging_stops_once_a_page_adds_nothing_new(monkeypatch):
+    first = [_r(f"https://site.example/{i}", 1.0) for i in range(3)]
+    requests = _serve(monkeypatch, {(None, page): first for page in range(1, 11)})
+    items = asyncio.run(searxng.search(SearxArgs(query="q", num=20, max_pages=10)))
+    assert len(items) == 3
+    # Two pages per wave for the 20 wanted; the second wave found only repeats.
+    assert sorted(page for _, page in requests) == [1, 2, 3, 4]
+
+
+def test_enough_unique_results_end_the_search(monkeypatch):
+    requests = _serve(monkeypatch, {(None, page): [_r(f"https://p{page}.example/{i}", 1.0) for i in range(10)]
+                                    for page in range(1, 4)})
+    items = asyncio.run(searxng.search(SearxArgs(query="q", num=10, max_pages=3)))
+    assert len(items) == 10 and requests == [(None, 1)]
@@ -0,0 +1,79 @@
+import time
+from app.analytics import velocity
+from app.analytics.snapshots import SnapshotStore
+from app.common.schemas import MetricModel, UnifiedItem
+
+
+def _item(i: int, views: int) -> UnifiedItem:
+    return UnifiedItem(source="youtube", id=f"v{i}", url=f"https://youtu.be/v{i}", title=f"video {i}",
+                       metrics=MetricModel(views=views, likes=views // 10, comments=1))
+
+
+def test_reload_keeps_metadata(tmp_path):
+    now = time.time()
+    store = SnapshotStore(str(tmp_path))
+    for step in range(3):
+        store.record([_item(i, 100 * (i + 1) * (step + 1)) for i in range(3)], ts=now - 600 + step * 300)
+    store.close()
+
+    reloaded = SnapshotStore(str(tmp_path))
+    assert len(reloaded) == 9
+    assert reloaded.item_count == 3
+    top = velocity.rising(reloaded, velocity.RisingArgs(window_minutes=30), now=now)
+    assert [r.id for r in top] == ["v2", "v1", "v0"]
+    assert top[0].url == "https://youtu.be/v2" and top[0].title == "video 2"
+
+
+def test_writers_do_not_interleave(tmp_path):
+    now = time.time()
+    # Two stores in one directory stand in for two pre-forked workers.
+    a, b = SnapshotStore(str(tmp_path)), SnapshotStore(str(tmp_path))
+    a.record([_item(1, 10)], ts=now - 60)
+    b.record([_item(2, 20), _item(3, 30)], ts=now - 50)
+    a.record([_item(1, 15)], ts=now - 40)
+    b.record([_item(3, 35)], ts=now - 30)
+
+    merged = SnapshotStore(str(tmp_path))
+    item, ts, values = merged.columns()
+    assert ts.tolist() == sorted(ts.tolist())
+    got = sorted((merged.key(int(i)), v) for i, v in zip(item, values[0]))
+    assert got == [("youtube:v1", 10), ("youtube:v1", 15), ("youtube:v2", 20), ("youtube:v3", 30), ("youtube:v3", 35)]
+    # Both writers are still live, so nothing was merged away under them.
+    assert len(list((tmp_path / "segments").iterdir())) == 2
+
+
+def test_compaction_drops_rows_past_retention(tmp_path):
+    now = time.time()
+    store = SnapshotStore(str(tmp_path), retention_hours=1.0)
+    store.record([_item(1, 10)], ts=now - 7200)
+    store.record([_item(2, 20)], ts=now - 60)
+    store.close()
+    other = SnapshotStore(str(tmp_path), retention_hours=1.0)
+    other.record([_item(3, 30)])
+    other.close()
+
+    reloaded = SnapshotStore(str(tmp_path), retention_hours=1.0)
+    assert sorted(reloaded.key(int(i)) for i in reloaded.columns()[0]) == ["youtube:v2", "youtube:v3"]
+    # The finished segments were merged into one holding only the retained rows.
+    segments = list((tmp_path / "segments").iterdir())
+    assert len(segments) == 1
+    assert SnapshotStore(str(tmp_path), retention_hours=1.0).meta(0)["url"] == "https://youtu.be/v2"
+
+
+def test_expired_items_are_forgotten_in_memory(tmp_path):
+    now = time.time()
+    store = SnapshotStore(str(tmp_path), retention_hours=1.0)
+    store.record([_item(i, 10) for i in range(50)], ts=now - 7200)
+    store.record([_item(100, 20), _item(101, 30)], ts=now - 60)
+    assert store.item_count == 52
+    assert store.compact(now) == 50
+    assert store.item_count == 2 and sorted(store._index) == ["youtube:v100", "youtube:v101"]
+    # Rows were renumbered with their items, and the segment follows the new numbering.
+    item, _, _, metas = store.window()
+    assert [metas[i]["id"] for i in item] == ["v100", "v101"]
+    store.record([_item(101, 35), _item(102, 40)], ts=now)
+    store.close()
+    reloaded = SnapshotStore(str(tmp_path), retention_hours=1.0)
+    item, _, values = reloaded.columns()
+    got = sorted((reloaded.key(int(i)), v) for i, v in zip(item, values[0]))
+    assert got == [("youtube:v100", 20.0), ("youtube:v101", 30.0), ("youtube:v101", 35.0), ("youtube:v102", 40.0)]
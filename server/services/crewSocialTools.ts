@@ -36,6 +36,7 @@ export interface UnifiedItem {
   lang?: string;
   media?: MediaItem[];
   metrics?: MetricModel;
+  score?: number;  // cross-platform viral score, 0-100
 }
 
 interface ErrorModel {
@@ -48,6 +49,8 @@ interface ErrorModel {
 interface UnifiedResponse {
   items: UnifiedItem[];
   error?: ErrorModel;
+  partial?: boolean;
+  partial_reason?: string;
 }
 
 /**